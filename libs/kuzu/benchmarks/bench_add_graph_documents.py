@@ -0,0 +1,74 @@
+"""Compare `KuzuGraph.add_graph_documents` throughput: per-row MERGE, batched UNWIND, bulk load,
+with auto-commit statements or explicit transactions of `--commit-every` documents.
+
+Usage:
+    python benchmarks/bench_add_graph_documents.py --documents 200 --triples-per-document 20
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import kuzu
+from synthetic import generate_graph_documents
+
+from langchain_kuzu.graphs.graph_document import GraphDocument
+from langchain_kuzu.graphs.kuzu_graph import KuzuGraph
+
+
+def run(documents: List[GraphDocument], **kwargs: Any) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = kuzu.Database(str(Path(tmp) / "bench_db"))
+        graph = KuzuGraph(db, allow_dangerous_requests=True)
+        start = time.perf_counter()
+        graph.add_graph_documents(documents, include_source=True, **kwargs)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--triples-per-document", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--entities", type=int, default=2000, help="Distinct ids per label.")
+    parser.add_argument("--degree-skew", type=float, default=0.0)
+    parser.add_argument("--property-width", type=int, default=0)
+    parser.add_argument(
+        "--commit-every", type=int, default=50, help="Documents per explicit transaction."
+    )
+    args = parser.parse_args()
+
+    documents = generate_graph_documents(
+        num_documents=args.documents,
+        triples_per_document=args.triples_per_document,
+        num_entities=args.entities,
+        degree_skew=args.degree_skew,
+        property_width=args.property_width,
+    )
+    num_triples = args.documents * args.triples_per_document
+    transactions = {"commit_every": args.commit_every}
+    deferred = {**transactions, "defer_checkpoint": True}
+    modes: List[Tuple[str, Dict[str, Any]]] = [
+        ("per-row MERGE", {}),
+        ("per-row MERGE, tx", transactions),
+        ("per-row MERGE, tx + 1 ckpt", deferred),
+        ("batched UNWIND", {"batch_size": args.batch_size}),
+        ("batched UNWIND, tx", {"batch_size": args.batch_size, **transactions}),
+        ("batched UNWIND, tx + 1 ckpt", {"batch_size": args.batch_size, **deferred}),
+        ("bulk load", {"bulk_load": True}),
+        ("bulk load, tx", {"bulk_load": True, **transactions}),
+    ]
+    num_commits = -(-args.documents // args.commit_every)
+    for name, kwargs in modes:
+        elapsed = run(documents, **kwargs)
+        commits = f", {num_commits / elapsed:,.1f} commits/sec" if "commit_every" in kwargs else ""
+        print(
+            f"{name:>27}: {num_triples} triples in {elapsed:.2f}s "
+            f"({num_triples / elapsed:,.0f} triples/sec{commits})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare `KuzuGraph.query` row materialization across result formats.
+
+Usage:
+    python benchmarks/bench_query_result_formats.py --rows 1000000
+"""
+
+import argparse
+import importlib.util
+import time
+
+import kuzu
+
+from langchain_kuzu.graphs.kuzu_graph import KuzuGraph
+
+QUERY = "MATCH (i:Item) RETURN i.id, i.name, i.score"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db = kuzu.Database(":memory:")
+    graph = KuzuGraph(db, allow_dangerous_requests=True)
+    graph.query("CREATE NODE TABLE Item(id INT64 PRIMARY KEY, name STRING, score DOUBLE)")
+    graph.query(
+        "UNWIND range(1, $rows) AS i CREATE (:Item {id: i, name: 'item' + CAST(i, 'STRING'), score: CAST(i, 'DOUBLE') / 3.0})",
+        {"rows": args.rows},
+    )
+
+    formats = ["dicts"] + [
+        result_format
+        for result_format, package in [
+            ("arrow", "pyarrow"),
+            ("pandas", "pandas"),
+            ("polars", "polars"),
+        ]
+        if importlib.util.find_spec(package) is not None
+    ]
+    for result_format in formats:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            graph.query(QUERY, result_format=result_format)  # type: ignore[arg-type]
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(
+            f"{result_format:>7}: {args.rows} rows in {elapsed:.3f}s ({args.rows / elapsed:,.0f} rows/sec)"
+        )
+
+
+if __name__ == "__main__":
+    main()
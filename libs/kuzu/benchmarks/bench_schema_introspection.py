@@ -0,0 +1,75 @@
+"""Compare `KuzuGraph.get_schema_dict` with per-table (N+1) catalog introspection.
+
+"cold" re-reads the whole catalog; "warm" is answered from the schema memoized for
+the current catalog version.
+
+Usage:
+    python benchmarks/bench_schema_introspection.py --node-tables 800 --rel-tables 400
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import kuzu
+
+from langchain_kuzu.graphs.kuzu_graph import KuzuGraph
+
+
+def create_catalog(conn: Any, num_node_tables: int, num_rel_tables: int) -> None:
+    for i in range(num_node_tables):
+        conn.execute(f"CREATE NODE TABLE N{i}(id STRING PRIMARY KEY, name STRING, score DOUBLE)")
+    for i in range(num_rel_tables):
+        src, dst = i % num_node_tables, (i * 7 + 1) % num_node_tables
+        conn.execute(f"CREATE REL TABLE R{i}(FROM N{src} TO N{dst}, weight DOUBLE)")
+
+
+def per_table_introspection(conn: Any) -> None:
+    """One `SHOW_TABLES` call, then one catalog call per table."""
+    tables = conn.execute("CALL SHOW_TABLES() RETURN name, type;").get_all()
+    for name, table_type in tables:
+        conn.execute(f"CALL TABLE_INFO('{name}') RETURN *;").get_all()
+        if table_type == "REL":
+            conn.execute(f"CALL SHOW_CONNECTION('{name}') RETURN *;").get_all()
+
+
+def timed(fn: Any, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--node-tables", type=int, default=800)
+    parser.add_argument("--rel-tables", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = kuzu.Database(str(Path(tmp) / "bench_db"))
+        conn = kuzu.Connection(db)
+        create_catalog(conn, args.node_tables, args.rel_tables)
+        graph = KuzuGraph(db, allow_dangerous_requests=True)
+
+        num_tables = args.node_tables + args.rel_tables
+
+        def cold_get_schema_dict() -> None:
+            graph._introspected = None
+            graph.get_schema_dict()
+
+        for name, fn in [
+            ("per-table", lambda: per_table_introspection(conn)),
+            ("get_schema_dict (cold)", cold_get_schema_dict),
+            ("get_schema_dict (warm)", graph.get_schema_dict),
+            ("refresh_schema (warm)", graph.refresh_schema),
+        ]:
+            elapsed = timed(fn, args.repeat)
+            print(f"{name:>22}: {num_tables} tables in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
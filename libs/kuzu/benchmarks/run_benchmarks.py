@@ -0,0 +1,382 @@
+"""Run the langchain-kuzu benchmark suite offline and store the results as JSON.
+
+Benchmarks:
+    ingest  `add_graph_documents` throughput of the per-row, batched and bulk paths on
+            synthetic documents, with per-phase throughput from a `MetricsRegistry`.
+    query   `query` latency of a point lookup, and row materialization rate of a
+            full scan in every available result format.
+    schema  `refresh_schema` cost as the number of tables grows.
+    chain   End-to-end `KuzuQAChain` latency with `tests/llms/fake_llm.py` standing in
+            for the LLM, and the chain overhead on top of the graph calls.
+
+Every run writes one JSON file with the environment, the arguments and the results.
+`--compare` reports the change of every metric against an earlier file, and
+`--fail-on-regression` exits with status 1 if any metric got worse than
+`--threshold`.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results/main.json
+    python benchmarks/run_benchmarks.py --quick --only ingest chain --compare results/main.json
+"""
+
+import argparse
+import importlib.metadata
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import kuzu
+from bench_schema_introspection import create_catalog
+from synthetic import generate_graph_documents, rel_schema
+
+from langchain_kuzu.chains.graph_qa.kuzu import KuzuQAChain
+from langchain_kuzu.graphs.kuzu_graph import KuzuGraph
+from langchain_kuzu.graphs.metrics import MetricsRegistry
+
+# The fake LLM of the unit tests, importable as in `tests/unit_tests/chains`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+from llms.fake_llm import FakeLLM  # noqa: E402
+
+BENCHMARKS = ("ingest", "query", "schema", "chain")
+PHASES = ("ddl", "chunks", "nodes", "mentions", "relationships")
+
+Result = Dict[str, Any]
+
+
+def repeat_timings(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """Return the duration in seconds of `repeat` calls of `fn`, after `warmup` calls."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def latency_metrics(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "min_ms": ordered[0] * 1000,
+    }
+
+
+@contextmanager
+def temporary_database(on_disk: bool) -> Iterator[Any]:
+    if not on_disk:
+        yield kuzu.Database(":memory:")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        yield kuzu.Database(str(Path(tmp) / "bench_db"))
+
+
+def bench_ingest(args: argparse.Namespace) -> List[Result]:
+    documents = generate_graph_documents(
+        num_documents=args.documents,
+        triples_per_document=args.triples_per_document,
+        num_labels=args.labels,
+        num_rel_types=args.rel_types,
+        num_entities=args.entities,
+        degree_skew=args.degree_skew,
+        property_width=args.property_width,
+        seed=args.seed,
+    )
+    num_triples = args.documents * args.triples_per_document
+    modes = [
+        ("per-row MERGE", {}),
+        ("batched UNWIND", {"batch_size": args.batch_size}),
+        ("batched UNWIND, tx", {"batch_size": args.batch_size, "commit_every": args.commit_every}),
+        ("bulk load", {"bulk_load": True}),
+    ]
+    results = []
+    for case, kwargs in modes:
+        with temporary_database(args.on_disk) as db:
+            registry = MetricsRegistry()
+            graph = KuzuGraph(db, allow_dangerous_requests=True, metrics=registry)
+            start = time.perf_counter()
+            graph.add_graph_documents(documents, include_source=True, **kwargs)
+            elapsed = time.perf_counter() - start
+            metrics = {"seconds": elapsed, "triples_per_sec": num_triples / elapsed}
+            for phase in PHASES:
+                histogram = registry.histogram("kuzu_ingestion_phase_seconds", phase=phase)
+                rows = registry.counter("kuzu_ingestion_rows", phase=phase)
+                if histogram is not None and histogram.sum > 0:
+                    metrics[f"{phase}_seconds"] = histogram.sum
+                    metrics[f"{phase}_rows_per_sec"] = rows / histogram.sum
+            results.append({"benchmark": "ingest", "case": case, "metrics": metrics})
+    return results
+
+
+def bench_query(args: argparse.Namespace) -> List[Result]:
+    results = []
+    with temporary_database(args.on_disk) as db:
+        graph = KuzuGraph(db, allow_dangerous_requests=True)
+        graph.query("CREATE NODE TABLE Item(id INT64 PRIMARY KEY, name STRING, score DOUBLE)")
+        graph.query(
+            """
+            UNWIND range(1, $rows) AS i
+            CREATE (:Item {id: i, name: 'item' + CAST(i, 'STRING'), score: CAST(i, 'DOUBLE') / 3.0})
+            """,
+            {"rows": args.rows},
+        )
+
+        lookups = iter(range(10**9))
+        timings = repeat_timings(
+            lambda: graph.query(
+                "MATCH (i:Item {id: $id}) RETURN i.name, i.score",
+                {"id": next(lookups) % args.rows + 1},
+            ),
+            args.repeat * 20,
+        )
+        results.append(
+            {"benchmark": "query", "case": "point lookup", "metrics": latency_metrics(timings)}
+        )
+
+        formats = ["dicts"] + [
+            result_format
+            for result_format, package in [
+                ("arrow", "pyarrow"),
+                ("pandas", "pandas"),
+                ("polars", "polars"),
+            ]
+            if importlib.util.find_spec(package) is not None
+        ]
+        for result_format in formats:
+            scan = partial(
+                graph.query,
+                "MATCH (i:Item) RETURN i.id, i.name, i.score",
+                result_format=result_format,
+            )
+            seconds = statistics.median(repeat_timings(scan, args.repeat))
+            results.append(
+                {
+                    "benchmark": "query",
+                    "case": f"full scan ({result_format})",
+                    "metrics": {"seconds": seconds, "rows_per_sec": args.rows / seconds},
+                }
+            )
+    return results
+
+
+def bench_schema(args: argparse.Namespace) -> List[Result]:
+    results = []
+    for num_tables in args.schema_tables:
+        with temporary_database(args.on_disk) as db:
+            num_node_tables = max(1, num_tables * 2 // 3)
+            create_catalog(kuzu.Connection(db), num_node_tables, num_tables - num_node_tables)
+            graph = KuzuGraph(db, allow_dangerous_requests=True)
+
+            def cold_refresh_schema(graph: KuzuGraph = graph) -> None:
+                graph._introspected = None
+                graph.refresh_schema()
+
+            cold = statistics.median(repeat_timings(cold_refresh_schema, args.repeat))
+            warm = statistics.median(repeat_timings(graph.refresh_schema, args.repeat))
+            results.append(
+                {
+                    "benchmark": "schema",
+                    "case": f"{num_tables} tables",
+                    "metrics": {
+                        "cold_refresh_ms": cold * 1000,
+                        "warm_refresh_ms": warm * 1000,
+                        "cold_ms_per_table": cold * 1000 / num_tables,
+                    },
+                }
+            )
+    return results
+
+
+def bench_chain(args: argparse.Namespace) -> List[Result]:
+    documents = generate_graph_documents(
+        num_documents=args.documents,
+        triples_per_document=args.triples_per_document,
+        num_labels=args.labels,
+        num_rel_types=args.rel_types,
+        num_entities=args.entities,
+        degree_skew=args.degree_skew,
+        property_width=args.property_width,
+        seed=args.seed,
+    )
+    source_label, rel_type, target_label = rel_schema(args.labels, args.rel_types)[0]
+    cypher = (
+        f"MATCH (a:{source_label})-[:{rel_type}]->(b:{target_label}) RETURN a.id, b.id LIMIT 20"
+    )
+    results = []
+    with temporary_database(args.on_disk) as db:
+        graph = KuzuGraph(db, allow_dangerous_requests=True)
+        graph.add_graph_documents(documents, include_source=True, bulk_load=True)
+        graph_seconds = {
+            "always": statistics.median(repeat_timings(graph.refresh_schema, args.repeat)),
+            "on_change": statistics.median(
+                repeat_timings(
+                    partial(graph.refresh_schema_if_stale, check_catalog=True), args.repeat
+                )
+            ),
+        }
+        query_seconds = statistics.median(repeat_timings(partial(graph.query, cypher), 20))
+        question = {"query": f"Which {source_label} is linked to a {target_label}?"}
+
+        for schema_refresh, refresh_seconds in graph_seconds.items():
+            # Without `queries`, the fake LLM answers "foo"
+            cypher_llm = FakeLLM(queries={"cypher": cypher}, sequential_responses=True)
+            chain = KuzuQAChain.from_llm(
+                cypher_llm=cypher_llm,
+                qa_llm=FakeLLM(),
+                graph=graph,
+                allow_dangerous_requests=True,
+                schema_refresh=schema_refresh,
+            )
+
+            def ask(chain: KuzuQAChain = chain, cypher_llm: FakeLLM = cypher_llm) -> None:
+                cypher_llm.response_index = 0
+                chain.invoke(question)
+
+            seconds = statistics.median(repeat_timings(ask, args.repeat * 5))
+            results.append(
+                {
+                    "benchmark": "chain",
+                    "case": f"schema_refresh={schema_refresh}",
+                    "metrics": {
+                        "ms_per_question": seconds * 1000,
+                        "graph_ms_per_question": (refresh_seconds + query_seconds) * 1000,
+                        "overhead_ms_per_question": max(
+                            0.0, seconds - refresh_seconds - query_seconds
+                        )
+                        * 1000,
+                    },
+                }
+            )
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for package in ("langchain-kuzu", "kuzu", "langchain-core"):
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": versions,
+    }
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_sec")
+
+
+def compare(baseline: Dict[str, Any], results: List[Result], threshold: float) -> bool:
+    """Print the change of every metric found in `baseline`; return True if any metric
+    regressed by more than `threshold` (a fraction)."""
+    previous = {
+        (result["benchmark"], result["case"], metric): value
+        for result in baseline["results"]
+        for metric, value in result["metrics"].items()
+    }
+    regressed = False
+    print(f"\nCompared with {baseline['environment'].get('git_commit') or 'baseline'}:")
+    for result in results:
+        for metric, value in result["metrics"].items():
+            old = previous.get((result["benchmark"], result["case"], metric))
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_is_better(metric) else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            regressed = regressed or bool(flag)
+            print(
+                f"  {result['benchmark']:>6} | {result['case']:<28} | {metric:<26} "
+                f"{old:>12.3f} -> {value:>12.3f} ({change:+.1%}){flag}"
+            )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--output", type=Path, help="JSON file to write the results to.")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Regression tolerance.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--quick", action="store_true", help="Small sizes, for smoke runs.")
+    parser.add_argument("--on-disk", action="store_true", help="Use on-disk databases.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    # Synthetic graph
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--triples-per-document", type=int, default=20)
+    parser.add_argument("--labels", type=int, default=5)
+    parser.add_argument("--rel-types", type=int, default=8)
+    parser.add_argument("--entities", type=int, default=2000, help="Distinct ids per label.")
+    parser.add_argument("--degree-skew", type=float, default=1.0)
+    parser.add_argument("--property-width", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--commit-every", type=int, default=50)
+    # Queries and schema
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--schema-tables", type=int, nargs="+", default=[10, 100, 400])
+    args = parser.parse_args()
+    if args.quick:
+        args.documents, args.rows, args.repeat = 20, 5_000, 2
+        args.schema_tables = [10, 50]
+
+    runners = {
+        "ingest": bench_ingest,
+        "query": bench_query,
+        "schema": bench_schema,
+        "chain": bench_chain,
+    }
+    results: List[Result] = []
+    for name in args.only:
+        for result in runners[name](args):
+            results.append(result)
+            metrics = ", ".join(f"{key}={value:,.3f}" for key, value in result["metrics"].items())
+            print(f"{name:>6} | {result['case']:<28} | {metrics}")
+
+    report = {
+        "environment": environment(),
+        "arguments": {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+        },
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nWrote {args.output}")
+    if args.compare is not None:
+        regressed = compare(json.loads(args.compare.read_text()), results, args.threshold)
+        if regressed and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Reproducible synthetic `GraphDocument`s for benchmarks.
+
+Entities are drawn from `num_labels` labels, connected by `num_rel_types`
+relationship types, and picked with a Zipf-like distribution: with `degree_skew=0`
+every entity is equally likely, larger values concentrate the edges on a few hub
+entities, as in real extracted graphs. Every node and relationship carries
+`property_width` typed properties.
+"""
+
+import itertools
+import random
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from langchain_kuzu.graphs.graph_document import GraphDocument, Node, Relationship
+
+_WORDS = "graph node edge table query chunk label index vector schema batch merge".split()
+
+
+def rel_schema(num_labels: int, num_rel_types: int) -> List[Tuple[str, str, str]]:
+    """Return the (source label, relationship type, target label) triples of the graph."""
+    return [
+        (f"Label{i % num_labels}", f"REL_{i}", f"Label{(i + 1) % num_labels}")
+        for i in range(num_rel_types)
+    ]
+
+
+def _properties(key: int, width: int) -> Dict[str, Any]:
+    """Deterministic properties of every type, so that an entity always gets the same
+    values."""
+    values: Dict[str, Any] = {}
+    for i in range(width):
+        kind = i % 4
+        if kind == 0:
+            values[f"p{i}"] = key * 31 + i
+        elif kind == 1:
+            values[f"p{i}"] = (key % 1000) / 7 + i
+        elif kind == 2:
+            values[f"p{i}"] = f"{_WORDS[(key + i) % len(_WORDS)]}-{key}"
+        else:
+            values[f"p{i}"] = (key + i) % 2 == 0
+    return values
+
+
+def generate_graph_documents(
+    num_documents: int = 100,
+    triples_per_document: int = 20,
+    num_labels: int = 3,
+    num_rel_types: int = 3,
+    num_entities: int = 1000,
+    degree_skew: float = 0.0,
+    property_width: int = 0,
+    text_words: int = 50,
+    seed: int = 0,
+) -> List[GraphDocument]:
+    """Generate `num_documents` graph documents of `triples_per_document` triples.
+
+    Args:
+        num_documents: Number of documents.
+        triples_per_document: Relationships per document.
+        num_labels: Number of node labels.
+        num_rel_types: Number of relationship types, each between two labels.
+        num_entities: Distinct entity ids per label.
+        degree_skew: Exponent of the Zipf-like distribution of entity ids.
+        property_width: Number of properties of every node and relationship.
+        text_words: Number of words of every source text.
+        seed: Seed of the random generator; equal arguments give equal documents.
+    """
+    if num_labels < 1 or num_rel_types < 1 or num_entities < 1:
+        raise ValueError("`num_labels`, `num_rel_types` and `num_entities` must be positive.")
+    rng = random.Random(seed)
+    schema = rel_schema(num_labels, num_rel_types)
+    cum_weights = list(
+        itertools.accumulate(1 / (rank + 1) ** degree_skew for rank in range(num_entities))
+    )
+    ranks = list(range(num_entities))
+
+    def entity(label: str) -> Node:
+        rank = rng.choices(ranks, cum_weights=cum_weights)[0]
+        return Node(
+            id=f"{label}_{rank}",
+            type=label,
+            properties=_properties(rank, property_width),
+        )
+
+    documents = []
+    for doc_index in range(num_documents):
+        nodes: Dict[Tuple[str, str], Node] = {}
+        relationships = []
+        for _ in range(triples_per_document):
+            source_label, rel_type, target_label = rng.choice(schema)
+            source, target = entity(source_label), entity(target_label)
+            nodes[(source.type, source.id)] = source
+            nodes[(target.type, target.id)] = target
+            relationships.append(
+                Relationship(
+                    source=source,
+                    target=target,
+                    type=rel_type,
+                    properties=_properties(doc_index, property_width),
+                )
+            )
+        words = [rng.choice(_WORDS) for _ in range(text_words)]
+        words += [node.id for node in nodes.values()]
+        documents.append(
+            GraphDocument(
+                nodes=list(nodes.values()),
+                relationships=relationships,
+                source=Document(page_content=f"Document {doc_index}: " + " ".join(words)),
+            )
+        )
+    return documents
@@ -0,0 +1,91 @@
+"""Compaction of graph query results into QA prompt context."""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+
+def approximate_num_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text as one token per four characters."""
+    return len(text) // 4 + 1
+
+
+def inject_limit(cypher: str, limit: int) -> str:
+    """Append `LIMIT limit` to a Cypher query that returns rows and has no `LIMIT`.
+
+    Queries containing `UNION` are left unchanged, since a trailing `LIMIT` would
+    only apply to their last part.
+
+    Args:
+        cypher: The Cypher query.
+        limit: The maximum number of rows to fetch.
+
+    Returns:
+        The Cypher query with a `LIMIT` clause.
+    """
+    if not re.search(r"\bRETURN\b", cypher, re.IGNORECASE) or re.search(
+        r"\b(LIMIT|UNION)\b", cypher, re.IGNORECASE
+    ):
+        return cypher
+    return f"{cypher.rstrip().rstrip(';')}\nLIMIT {limit}"
+
+
+def _format_value(value: Any, max_value_chars: int) -> str:
+    text = "" if value is None else " ".join(str(value).split())
+    if len(text) > max_value_chars:
+        text = text[: max_value_chars - 1] + "…"
+    return text
+
+
+def compact_context(
+    rows: List[Dict[str, Any]],
+    max_rows: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_value_chars: int = 200,
+    token_counter: Callable[[str], int] = approximate_num_tokens,
+) -> str:
+    """Render query result rows as a compact, pipe-separated table.
+
+    Duplicate rows and columns that are empty in every row are dropped, long values
+    are truncated, and rows are added until `max_rows` or the `max_tokens` budget
+    (measured with `token_counter`) is reached. A final line reports how many rows
+    were left out.
+
+    Args:
+        rows: The query result rows.
+        max_rows: Maximum number of rows to include.
+        max_tokens: Maximum number of tokens of the rendered table.
+        max_value_chars: Maximum number of characters of a single value.
+        token_counter: Function returning the number of tokens of a text.
+
+    Returns:
+        The rendered table, or an empty string if there are no rows.
+    """
+    columns = [
+        column
+        for column in dict.fromkeys(column for row in rows for column in row)
+        if any(row.get(column) not in (None, "") for row in rows)
+    ]
+    lines = list(
+        dict.fromkeys(
+            " | ".join(_format_value(row.get(column), max_value_chars) for column in columns)
+            for row in rows
+        )
+    )
+    if not columns or not lines:
+        return ""
+
+    header = " | ".join(columns)
+    kept = [header]
+    budget = None if max_tokens is None else max_tokens - token_counter(header)
+    for line in lines[:max_rows]:
+        if budget is not None:
+            budget -= token_counter(line)
+            if budget < 0:
+                break
+        kept.append(line)
+    omitted = len(lines) - (len(kept) - 1)
+    if omitted:
+        kept.append(f"... {omitted} more rows omitted")
+    return "\n".join(kept)
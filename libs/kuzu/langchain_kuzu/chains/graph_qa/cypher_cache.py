@@ -0,0 +1,206 @@
+"""Caches of generated Cypher statements for `KuzuQAChain`."""
+
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from langchain_core.runnables.config import run_in_executor
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question for cache lookups.
+
+    Case, surrounding whitespace, repeated whitespace and trailing punctuation are
+    ignored, so that "Who is the CEO of Apple?" and "who is the CEO of  apple"
+    share an entry.
+
+    Args:
+        question: The question to normalize.
+
+    Returns:
+        The normalized question.
+    """
+    return re.sub(r"\s+", " ", question).strip().rstrip("?!. ").casefold()
+
+
+class BaseCypherCache(ABC):
+    """Cache of generated Cypher statements, keyed by the normalized question and a
+    fingerprint of the graph schema the statement was generated for.
+
+    Only entries generated for the same schema fingerprint are returned, since
+    statements generated for another schema may refer to tables that no longer
+    exist.
+    """
+
+    @abstractmethod
+    def lookup(self, question: str, schema_fingerprint: str) -> Optional[str]:
+        """Return the cached Cypher statement for `question`, if any."""
+
+    @abstractmethod
+    def update(self, question: str, schema_fingerprint: str, cypher: str) -> None:
+        """Cache the Cypher statement generated for `question`."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all entries."""
+
+    async def alookup(self, question: str, schema_fingerprint: str) -> Optional[str]:
+        """Async version of `lookup`.
+
+        Runs `lookup` in the default executor, so that caches doing I/O do not block
+        the event loop. Override it for a native async implementation.
+        """
+        return await run_in_executor(None, self.lookup, question, schema_fingerprint)
+
+    async def aupdate(self, question: str, schema_fingerprint: str, cypher: str) -> None:
+        """Async version of `update`, run in the default executor."""
+        await run_in_executor(None, self.update, question, schema_fingerprint, cypher)
+
+
+class InMemoryCypherCache(BaseCypherCache):
+    """In-memory LRU cache of generated Cypher statements.
+
+    A lookup with a new schema fingerprint drops all entries generated for other
+    schemas.
+
+    Args:
+        maxsize: Maximum number of cached statements.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be a positive integer.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._schema_fingerprint: Optional[str] = None
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_fingerprint(self, schema_fingerprint: str) -> None:
+        if schema_fingerprint != self._schema_fingerprint:
+            self._entries.clear()
+            self._schema_fingerprint = schema_fingerprint
+
+    def lookup(self, question: str, schema_fingerprint: str) -> Optional[str]:
+        key = normalize_question(question)
+        with self._lock:
+            self._check_fingerprint(schema_fingerprint)
+            cypher = self._entries.get(key)
+            if cypher is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return cypher
+
+    def update(self, question: str, schema_fingerprint: str, cypher: str) -> None:
+        with self._lock:
+            self._check_fingerprint(schema_fingerprint)
+            key = normalize_question(question)
+            self._entries[key] = cypher
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def alookup(self, question: str, schema_fingerprint: str) -> Optional[str]:
+        return self.lookup(question, schema_fingerprint)
+
+    async def aupdate(self, question: str, schema_fingerprint: str, cypher: str) -> None:
+        self.update(question, schema_fingerprint, cypher)
+
+
+class SQLiteCypherCache(BaseCypherCache):
+    """Cypher statement cache stored in a SQLite database, shared across processes
+    and restarts.
+
+    Entries are stored per schema fingerprint, so that processes with different
+    views of the schema (e.g. before and after a migration) can share the database
+    without evicting each other's entries. Instead, entries not used for `ttl`
+    seconds expire, and only the `max_entries` most recently used are kept.
+
+    Args:
+        database_path: Path of the SQLite database file.
+        max_entries: Maximum number of cached statements, or None for no limit.
+        ttl: Seconds after its last use after which an entry expires, or None to
+            keep entries until they are evicted.
+    """
+
+    def __init__(
+        self,
+        database_path: str = ".cypher_cache.db",
+        max_entries: Optional[int] = 10000,
+        ttl: Optional[float] = None,
+    ) -> None:
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("`max_entries` must be a positive integer or None.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("`ttl` must be positive or None.")
+        self.database_path = database_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cypher_cache ("
+                "question TEXT NOT NULL, schema_fingerprint TEXT NOT NULL, "
+                "cypher TEXT NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (question, schema_fingerprint))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cypher_cache_last_used ON cypher_cache (last_used)"
+            )
+
+    def _expired_before(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else -math.inf
+
+    def _evict(self) -> None:
+        self._conn.execute(
+            "DELETE FROM cypher_cache WHERE last_used < ?", (self._expired_before(),)
+        )
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM cypher_cache WHERE rowid IN (SELECT rowid FROM cypher_cache "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def lookup(self, question: str, schema_fingerprint: str) -> Optional[str]:
+        key = (normalize_question(question), schema_fingerprint)
+        with self._lock, self._conn:
+            row: Optional[Tuple[str]] = self._conn.execute(
+                "SELECT cypher FROM cypher_cache "
+                "WHERE question = ? AND schema_fingerprint = ? AND last_used >= ?",
+                (*key, self._expired_before()),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE cypher_cache SET last_used = ? "
+                    "WHERE question = ? AND schema_fingerprint = ?",
+                    (time.time(), *key),
+                )
+        return row[0] if row else None
+
+    def update(self, question: str, schema_fingerprint: str, cypher: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cypher_cache VALUES (?, ?, ?, ?)",
+                (normalize_question(question), schema_fingerprint, cypher, time.time()),
+            )
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cypher_cache")
@@ -2,21 +2,40 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import re
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+from typing import Any, Callable, Dict, List, Literal, Optional, Union, cast
 
 from langchain.chains.base import Chain
 from langchain.chains.llm import LLMChain
-from langchain_core.callbacks import CallbackManagerForChainRun
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForChainRun,
+    CallbackManagerForChainRun,
+    Callbacks,
+)
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.prompts import BasePromptTemplate
 from pydantic import Field
 
+from langchain_kuzu.chains.graph_qa.context import (
+    approximate_num_tokens,
+    compact_context,
+    inject_limit,
+)
+from langchain_kuzu.chains.graph_qa.cypher_cache import BaseCypherCache
 from langchain_kuzu.chains.graph_qa.prompts import (
     CYPHER_QA_PROMPT,
+    CYPHER_REPAIR_PROMPT,
+    ENTITY_RESOLUTION_TEMPLATE,
     KUZU_GENERATION_PROMPT,
 )
+from langchain_kuzu.chains.graph_qa.schema_selector import SchemaSelector
 from langchain_kuzu.graphs.graph_store import GraphStore
+from langchain_kuzu.graphs.kuzu_graph import KuzuGraph
 
 
 def remove_prefix(text: str, prefix: str) -> str:
@@ -70,8 +89,58 @@ class KuzuQAChain(Chain):
     graph: GraphStore = Field(exclude=True)
     cypher_generation_chain: LLMChain
     qa_chain: LLMChain
+    cypher_repair_chain: Optional[LLMChain] = None
     input_key: str = "query"  #: :meta private:
     output_key: str = "result"  #: :meta private:
+    schema_refresh: Literal["always", "ttl", "on_change"] = "always"
+    """When to refresh the graph schema before generating Cypher.
+
+    - "always": call `graph.refresh_schema()` on every question.
+    - "ttl": reuse the cached schema for `schema_ttl` seconds.
+    - "on_change": reuse the cached schema until Kuzu's catalog version or table list
+      changes, i.e. until any DDL statement runs (checked with two catalog queries per
+      question). See `KuzuGraph.refresh_schema_if_stale`.
+
+    With "ttl" and "on_change", DDL issued through `KuzuGraph` (including
+    `add_graph_documents`) invalidates the cached schema immediately. Graph stores
+    other than `KuzuGraph` are always refreshed.
+    """
+    schema_ttl: float = 300.0
+    """Maximum age of the cached schema in seconds, for `schema_refresh="ttl"`."""
+    cypher_cache: Optional[BaseCypherCache] = Field(default=None, exclude=True)
+    """Cache of generated Cypher statements (e.g. `InMemoryCypherCache` or
+    `SQLiteCypherCache`), keyed by the normalized question and a fingerprint of the
+    graph schema. On a hit, Cypher generation is skipped. Statements are only cached
+    once they ran successfully."""
+    validate_cypher: bool = False
+    """If True, generated Cypher is compiled with `KuzuGraph.validate_query` (without
+    running it) before it is executed. A statement with syntax or binder errors is sent
+    back to `cypher_repair_chain` together with Kuzu's error message, up to
+    `max_cypher_repairs` times, instead of re-running the whole chain. Every repair is
+    reported as a `kuzu_cypher_repair` custom callback event with the attempt number,
+    error, repaired statement, latency and token usage."""
+    max_cypher_repairs: int = 2
+    """Maximum number of repair attempts per question, for `validate_cypher`."""
+    schema_selector: Optional[SchemaSelector] = Field(default=None, exclude=True)
+    """If set, only the part of the schema relevant to the question (see
+    `SchemaSelector`) is inserted into the Cypher generation prompt."""
+    resolve_entities: bool = False
+    """If True, entities mentioned in the question are looked up with
+    `KuzuGraph.keyword_search` before Cypher generation, and the ids of the best
+    matching nodes are added to the schema in the prompt, so that the generated
+    query can match them exactly on their primary key."""
+    entity_resolution_k: int = 5
+    """Maximum number of nodes added to the prompt, for `resolve_entities`."""
+    context_max_rows: Optional[int] = None
+    """If set, a `LIMIT` is added to generated Cypher statements that have none, and
+    at most this many rows are passed to the QA prompt."""
+    context_max_tokens: Optional[int] = None
+    """If set, rows are passed to the QA prompt until this token budget is spent."""
+    context_max_value_chars: int = 200
+    """Maximum length of a single value in the compacted context."""
+    context_token_counter: Optional[Callable[[str], int]] = Field(default=None, exclude=True)
+    """Counts the tokens of the compacted context. Defaults to four characters per
+    token."""
 
     allow_dangerous_requests: bool = False
     """Forced user opt-in to acknowledge that the chain can make dangerous requests.
@@ -128,6 +197,7 @@ class KuzuQAChain(Chain):
         *,
         qa_prompt: BasePromptTemplate = CYPHER_QA_PROMPT,
         cypher_prompt: BasePromptTemplate = KUZU_GENERATION_PROMPT,
+        repair_prompt: BasePromptTemplate = CYPHER_REPAIR_PROMPT,
         cypher_llm: Optional[BaseLanguageModel] = None,
         qa_llm: Optional[BaseLanguageModel] = None,
         **kwargs: Any,
@@ -153,13 +223,244 @@ class KuzuQAChain(Chain):
             llm=cypher_llm or llm,  # type: ignore[arg-type]
             prompt=cypher_prompt,
         )
+        cypher_repair_chain = LLMChain(
+            llm=cypher_llm or llm,  # type: ignore[arg-type]
+            prompt=repair_prompt,
+        )
 
         return cls(
             qa_chain=qa_chain,
             cypher_generation_chain=cypher_generation_chain,
+            cypher_repair_chain=cypher_repair_chain,
             **kwargs,
         )
 
+    def _refresh_schema(self) -> None:
+        if self.schema_refresh == "always" or not isinstance(self.graph, KuzuGraph):
+            self.graph.refresh_schema()
+        else:
+            self.graph.refresh_schema_if_stale(
+                max_age=self.schema_ttl if self.schema_refresh == "ttl" else None,
+                check_catalog=self.schema_refresh == "on_change",
+            )
+
+    @staticmethod
+    def _clean_cypher(text: str) -> str:
+        # Extract Cypher code if it is wrapped in triple backticks
+        # with the language marker "cypher"
+        return remove_prefix(extract_cypher(text), "cypher")
+
+    def _limit_cypher(self, cypher: str) -> str:
+        if self.context_max_rows is None:
+            return cypher
+        return inject_limit(cypher, self.context_max_rows)
+
+    def _build_context(self, rows: List[Dict[str, Any]]) -> Any:
+        """Compact the query results into a table if a row or token limit is set;
+        otherwise pass them to the QA prompt unchanged."""
+        if self.context_max_rows is None and self.context_max_tokens is None:
+            return rows
+        return compact_context(
+            rows,
+            max_rows=self.context_max_rows,
+            max_tokens=self.context_max_tokens,
+            max_value_chars=self.context_max_value_chars,
+            token_counter=self.context_token_counter or approximate_num_tokens,
+        )
+
+    def _schema_for(self, question: str) -> str:
+        if self.schema_selector is None:
+            schema = self.graph.get_schema
+        else:
+            schema = self.schema_selector.select(question, self.graph.get_structured_schema)
+        return schema + self._resolve_entities(question)
+
+    async def _aschema_for(self, question: str) -> str:
+        if self.schema_selector is None:
+            schema = self.graph.get_schema
+        else:
+            schema = await self.schema_selector.aselect(question, self.graph.get_structured_schema)
+        return schema + await self._aresolve_entities(question)
+
+    def _entity_labels(self) -> List[str]:
+        if not self.resolve_entities or not isinstance(self.graph, KuzuGraph):
+            return []
+        return [
+            label for label in self.graph.get_structured_schema["node_props"] if label != "Chunk"
+        ]
+
+    @staticmethod
+    def _format_entities(matches: List[Dict[str, Any]]) -> str:
+        if not matches:
+            return ""
+        entities = "\n".join(
+            f"- (:{match['label']} {{id: {json.dumps(match['id'])}}})" for match in matches
+        )
+        return ENTITY_RESOLUTION_TEMPLATE.format(entities=entities)
+
+    def _resolve_entities(self, question: str) -> str:
+        """Look up the entities of the question in the existing full-text search
+        indexes. Answering a question never creates indexes."""
+        entity_labels = self._entity_labels()
+        if not entity_labels:
+            return ""
+        return self._format_entities(
+            self.graph.keyword_search(  # type: ignore[attr-defined]
+                question,
+                k=self.entity_resolution_k,
+                node_labels=entity_labels,
+                create_missing_indexes=False,
+            )
+        )
+
+    async def _aresolve_entities(self, question: str) -> str:
+        entity_labels = self._entity_labels()
+        if not entity_labels:
+            return ""
+        return self._format_entities(
+            await self.graph.akeyword_search(  # type: ignore[attr-defined]
+                question,
+                k=self.entity_resolution_k,
+                node_labels=entity_labels,
+                create_missing_indexes=False,
+            )
+        )
+
+    def _schema_fingerprint(self) -> str:
+        return md5(self.graph.get_schema.encode("utf-8")).hexdigest()
+
+    def _lookup_cypher(self, question: str) -> Optional[str]:
+        if self.cypher_cache is None:
+            return None
+        return self.cypher_cache.lookup(question, self._schema_fingerprint())
+
+    def _update_cypher(self, question: str, cypher: str) -> None:
+        if self.cypher_cache is not None:
+            self.cypher_cache.update(question, self._schema_fingerprint(), cypher)
+
+    async def _alookup_cypher(self, question: str) -> Optional[str]:
+        if self.cypher_cache is None:
+            return None
+        return await self.cypher_cache.alookup(question, self._schema_fingerprint())
+
+    async def _aupdate_cypher(self, question: str, cypher: str) -> None:
+        if self.cypher_cache is not None:
+            await self.cypher_cache.aupdate(question, self._schema_fingerprint(), cypher)
+
+    def _repair_inputs(self, question: str, cypher: str, error: str) -> Dict[str, str]:
+        return {
+            "schema": self._schema_for(question),
+            "question": question,
+            "query": cypher,
+            "error": error,
+        }
+
+    @staticmethod
+    def _repair_event(
+        attempt: int, error: str, cypher: str, start: float, llm_output: Optional[dict]
+    ) -> Dict[str, Any]:
+        return {
+            "attempt": attempt,
+            "error": error,
+            "cypher": cypher,
+            "latency": time.perf_counter() - start,
+            "token_usage": (llm_output or {}).get("token_usage"),
+        }
+
+    def _validate_and_repair(
+        self, question: str, cypher: str, run_manager: CallbackManagerForChainRun
+    ) -> str:
+        """Return `cypher`, or its repaired version if Kuzu cannot compile it."""
+        if not self.validate_cypher or not isinstance(self.graph, KuzuGraph):
+            return cypher
+        error = self.graph.validate_query(cypher)
+        attempt = 0
+        while (
+            error is not None
+            and self.cypher_repair_chain is not None
+            and attempt < self.max_cypher_repairs
+        ):
+            attempt += 1
+            start = time.perf_counter()
+            result = self.cypher_repair_chain.generate(
+                [self._repair_inputs(question, cypher, error)], run_manager=run_manager
+            )
+            repaired = self._limit_cypher(self._clean_cypher(result.generations[0][0].text))
+            run_manager.on_text(f"Repaired Cypher ({error}):", end="\n", verbose=self.verbose)
+            run_manager.on_text(repaired, color="green", end="\n", verbose=self.verbose)
+            run_manager.get_child().on_custom_event(
+                "kuzu_cypher_repair",
+                self._repair_event(attempt, error, repaired, start, result.llm_output),
+            )
+            cypher = repaired
+            error = self.graph.validate_query(cypher)
+        # An invalid statement that could not be repaired fails in `graph.query`
+        return cypher
+
+    async def _avalidate_and_repair(
+        self, question: str, cypher: str, run_manager: AsyncCallbackManagerForChainRun
+    ) -> str:
+        """Asynchronous version of `_validate_and_repair`."""
+        if not self.validate_cypher or not isinstance(self.graph, KuzuGraph):
+            return cypher
+        error = await self.graph.avalidate_query(cypher)
+        attempt = 0
+        while (
+            error is not None
+            and self.cypher_repair_chain is not None
+            and attempt < self.max_cypher_repairs
+        ):
+            attempt += 1
+            start = time.perf_counter()
+            result = await self.cypher_repair_chain.agenerate(
+                [self._repair_inputs(question, cypher, error)], run_manager=run_manager
+            )
+            repaired = self._limit_cypher(self._clean_cypher(result.generations[0][0].text))
+            await run_manager.on_text(f"Repaired Cypher ({error}):", end="\n", verbose=self.verbose)
+            await run_manager.on_text(repaired, color="green", end="\n", verbose=self.verbose)
+            await run_manager.get_child().on_custom_event(
+                "kuzu_cypher_repair",
+                self._repair_event(attempt, error, repaired, start, result.llm_output),
+            )
+            cypher = repaired
+            error = await self.graph.avalidate_query(cypher)
+        return cypher
+
+    def _repair_batch(
+        self, questions: List[str], queries: List[str], callbacks: Callbacks
+    ) -> List[str]:
+        """Validate many statements and repair the invalid ones with batched calls of
+        the repair LLM."""
+        if (
+            not self.validate_cypher
+            or not isinstance(self.graph, KuzuGraph)
+            or self.cypher_repair_chain is None
+        ):
+            return queries
+        queries = list(queries)
+        pending = list(range(len(queries)))
+        for _ in range(self.max_cypher_repairs):
+            errors = {i: self.graph.validate_query(queries[i]) for i in pending}
+            pending = [i for i in pending if errors[i] is not None]
+            if not pending:
+                break
+            try:
+                repairs = self.cypher_repair_chain.apply(
+                    [
+                        self._repair_inputs(questions[i], queries[i], cast(str, errors[i]))
+                        for i in pending
+                    ],
+                    callbacks=callbacks,
+                )
+            except Exception:
+                # Unrepaired statements fail, and are reported, in `graph.query`
+                break
+            for i, repair in zip(pending, repairs, strict=True):
+                queries[i] = self._limit_cypher(
+                    self._clean_cypher(repair[self.cypher_repair_chain.output_key])
+                )
+        return queries
+
     def _call(
         self,
         inputs: Dict[str, Any],
@@ -170,17 +471,26 @@ class KuzuQAChain(Chain):
         callbacks = _run_manager.get_child()
         question = inputs[self.input_key]
 
-        self.graph.refresh_schema()
-        generated_cypher = self.cypher_generation_chain.run(
-            {"question": question, "schema": self.graph.get_schema}, callbacks=callbacks
-        )
-        # Extract Cypher code if it is wrapped in triple backticks
-        # with the language marker "cypher"
-        generated_cypher = remove_prefix(extract_cypher(generated_cypher), "cypher")
+        self._refresh_schema()
+        generated_cypher = self._lookup_cypher(question)
+        cache_hit = generated_cypher is not None
+        if generated_cypher is None:
+            generated_cypher = self._clean_cypher(
+                self.cypher_generation_chain.run(
+                    {"question": question, "schema": self._schema_for(question)},
+                    callbacks=callbacks,
+                )
+            )
+        generated_cypher = self._limit_cypher(generated_cypher)
 
-        _run_manager.on_text("Generated Cypher:", end="\n", verbose=self.verbose)
+        _run_manager.on_text(
+            "Cached Cypher:" if cache_hit else "Generated Cypher:", end="\n", verbose=self.verbose
+        )
         _run_manager.on_text(generated_cypher, color="green", end="\n", verbose=self.verbose)
-        context = self.graph.query(generated_cypher)
+        generated_cypher = self._validate_and_repair(question, generated_cypher, _run_manager)
+        context = self._build_context(self.graph.query(generated_cypher))
+        if not cache_hit:
+            self._update_cypher(question, generated_cypher)
 
         _run_manager.on_text("Full Context:", end="\n", verbose=self.verbose)
         _run_manager.on_text(str(context), color="green", end="\n", verbose=self.verbose)
@@ -190,3 +500,186 @@ class KuzuQAChain(Chain):
             callbacks=callbacks,
         )
         return {self.output_key: result[self.qa_chain.output_key]}
+
+    async def _arefresh_schema(self) -> None:
+        if not isinstance(self.graph, KuzuGraph):
+            await asyncio.get_running_loop().run_in_executor(None, self.graph.refresh_schema)
+        elif self.schema_refresh == "always":
+            await self.graph.arefresh_schema()
+        else:
+            await self.graph.arefresh_schema_if_stale(
+                max_age=self.schema_ttl if self.schema_refresh == "ttl" else None,
+                check_catalog=self.schema_refresh == "on_change",
+            )
+
+    async def _aquery_graph(self, query: str) -> List[Dict[str, Any]]:
+        if isinstance(self.graph, KuzuGraph):
+            rows: List[Dict[str, Any]] = await self.graph.aquery(query)
+            return rows
+        return await asyncio.get_running_loop().run_in_executor(None, self.graph.query, query)
+
+    async def _acall(
+        self,
+        inputs: Dict[str, Any],
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        """Generate Cypher statement, use it to look up in db and answer question,
+        without blocking the event loop."""
+        _run_manager = run_manager or AsyncCallbackManagerForChainRun.get_noop_manager()
+        callbacks = _run_manager.get_child()
+        question = inputs[self.input_key]
+
+        await self._arefresh_schema()
+        generated_cypher = await self._alookup_cypher(question)
+        cache_hit = generated_cypher is not None
+        if generated_cypher is None:
+            generated_cypher = self._clean_cypher(
+                await self.cypher_generation_chain.arun(
+                    {"question": question, "schema": await self._aschema_for(question)},
+                    callbacks=callbacks,
+                )
+            )
+        generated_cypher = self._limit_cypher(generated_cypher)
+
+        await _run_manager.on_text(
+            "Cached Cypher:" if cache_hit else "Generated Cypher:", end="\n", verbose=self.verbose
+        )
+        await _run_manager.on_text(generated_cypher, color="green", end="\n", verbose=self.verbose)
+        generated_cypher = await self._avalidate_and_repair(
+            question, generated_cypher, _run_manager
+        )
+        context = self._build_context(await self._aquery_graph(generated_cypher))
+        if not cache_hit:
+            await self._aupdate_cypher(question, generated_cypher)
+
+        await _run_manager.on_text("Full Context:", end="\n", verbose=self.verbose)
+        await _run_manager.on_text(str(context), color="green", end="\n", verbose=self.verbose)
+
+        result = await self.qa_chain.acall(
+            {"question": question, "context": context},
+            callbacks=callbacks,
+        )
+        return {self.output_key: result[self.qa_chain.output_key]}
+
+    @staticmethod
+    def _apply_per_item(
+        chain: LLMChain, inputs: List[Dict[str, Any]], callbacks: Callbacks
+    ) -> List[Union[Dict[str, str], Exception]]:
+        """Run `chain` on all `inputs` with one batched call. If the call fails, run
+        them one at a time instead, so that a failing input only fails its own item."""
+        if not inputs:
+            return []
+        try:
+            return list(chain.apply(inputs, callbacks=callbacks))
+        except Exception:
+            pass
+        outputs: List[Union[Dict[str, str], Exception]] = []
+        for item in inputs:
+            try:
+                outputs.append(chain.apply([item], callbacks=callbacks)[0])
+            except Exception as e:
+                outputs.append(e)
+        return outputs
+
+    def answer_batch(
+        self,
+        questions: List[str],
+        *,
+        max_workers: Optional[int] = None,
+        callbacks: Callbacks = None,
+    ) -> List[Union[Dict[str, str], Exception]]:
+        """Answer many questions with batched LLM calls and parallel graph queries.
+
+        Unlike calling `invoke` in a loop, the schema is refreshed once, all Cypher
+        statements are generated with a single batched call of the Cypher LLM, the
+        queries run in parallel on `max_workers` threads, and all answers are
+        generated with a single batched call of the QA LLM.
+
+        Args:
+            questions: The questions to answer.
+            max_workers: Number of threads running graph queries. Defaults to the size
+                of the graph's connection pool (`KuzuGraph(pool_size=...)`), or 1 if
+                the graph has no pool, since a single connection runs one query at a
+                time.
+            callbacks: Callbacks passed to the batched LLM calls.
+
+        Questions found in `cypher_cache` skip Cypher generation. With
+        `validate_cypher`, invalid statements are repaired with batched calls, too.
+        If a batched LLM call fails, its inputs are retried one at a time, so that a
+        failing question does not fail the others.
+
+        Returns:
+            For every question, in input order, the chain output
+            (`{input_key: question, output_key: answer}`), or the exception raised
+            while generating Cypher, querying the graph or answering it.
+        """
+        if not questions:
+            return []
+        self._refresh_schema()
+        results: List[Union[Dict[str, str], Exception]] = [{} for _ in questions]
+        failed: set[int] = set()
+
+        def fail(i: int, error: Exception) -> None:
+            results[i] = error
+            failed.add(i)
+
+        generated = [self._lookup_cypher(question) for question in questions]
+        prompts: Dict[int, Dict[str, Any]] = {}
+        for i, cypher in enumerate(generated):
+            if cypher is None:
+                try:
+                    prompts[i] = {
+                        "question": questions[i],
+                        "schema": self._schema_for(questions[i]),
+                    }
+                except Exception as e:
+                    fail(i, e)
+        generations = self._apply_per_item(
+            self.cypher_generation_chain, list(prompts.values()), callbacks
+        )
+        for i, generation in zip(prompts, generations, strict=True):
+            if isinstance(generation, Exception):
+                fail(i, generation)
+            else:
+                generated[i] = self._limit_cypher(
+                    self._clean_cypher(generation[self.cypher_generation_chain.output_key])
+                )
+        pending = [i for i in range(len(questions)) if i not in failed]
+        repaired = self._repair_batch(
+            [questions[i] for i in pending], [cast(str, generated[i]) for i in pending], callbacks
+        )
+        queries = dict(zip(pending, repaired, strict=True))
+
+        if max_workers is None:
+            pool = getattr(self.graph, "pool", None)
+            max_workers = pool.size if pool is not None else 1
+
+        def run_query(query: str) -> Any:
+            try:
+                return self._build_context(self.graph.query(query))
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            contexts = dict(zip(queries, executor.map(run_query, queries.values()), strict=True))
+        for i, context in contexts.items():
+            if isinstance(context, Exception):
+                fail(i, context)
+            elif i in prompts:
+                self._update_cypher(questions[i], queries[i])
+
+        answered = [i for i in contexts if i not in failed]
+        answers = self._apply_per_item(
+            self.qa_chain,
+            [{"question": questions[i], "context": contexts[i]} for i in answered],
+            callbacks,
+        )
+        for i, answer in zip(answered, answers, strict=True):
+            if isinstance(answer, Exception):
+                fail(i, answer)
+            else:
+                results[i] = {
+                    self.input_key: questions[i],
+                    self.output_key: answer[self.qa_chain.output_key],
+                }
+        return results
@@ -53,3 +53,32 @@ KUZU_GENERATION_TEMPLATE = CYPHER_GENERATION_TEMPLATE.replace(
 KUZU_GENERATION_PROMPT = PromptTemplate(
     input_variables=["schema", "question"], template=KUZU_GENERATION_TEMPLATE
 )
+
+ENTITY_RESOLUTION_TEMPLATE = """
+
+Nodes matching entities mentioned in the question. Match these nodes on their exact `id`,
+not with `LOWER()` or `CONTAINS`, so that the lookup uses the primary key index:
+{entities}"""
+
+CYPHER_REPAIR_TEMPLATE = """You are an expert in fixing Kuzu Cypher statements.
+The Cypher statement below was generated to answer the question, but the graph database
+rejected it with the given error.
+Use only the provided relationship types and properties in the schema to fix it.
+Do not include any explanations or apologies in your responses.
+Return only the corrected Cypher statement.
+
+Schema:
+{schema}
+
+The question is:
+{question}
+
+The Cypher statement is:
+{query}
+
+The error is:
+{error}"""
+
+CYPHER_REPAIR_PROMPT = PromptTemplate(
+    input_variables=["schema", "question", "query", "error"], template=CYPHER_REPAIR_TEMPLATE
+)
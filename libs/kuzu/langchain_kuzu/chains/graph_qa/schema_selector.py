@@ -0,0 +1,265 @@
+"""Selection of the part of a graph schema that is relevant to a question."""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import deque
+from hashlib import md5
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from langchain_kuzu.graphs.kuzu_graph import format_schema
+
+_STOP_WORDS = frozenset(
+    "a an and are at by do does for from has have how in is it of on or the to was what "
+    "when where which who whom whose with".split()
+)
+
+
+def _tokens(text: str) -> Set[str]:
+    """Split CamelCase, snake_case and plain words into lowercase, crudely singularized
+    tokens, without stop words."""
+    tokens = set()
+    for word in re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+", text):
+        word = word.lower()
+        if word in _STOP_WORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b, strict=True))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class SchemaSelector:
+    """Prunes a graph schema to the tables relevant to a question.
+
+    Node and relationship tables are ranked by how many question words match their
+    name (weighted by `label_weight`) and their property names, plus, if
+    `embeddings` is given, `embedding_weight` times the cosine similarity between
+    the question and a short description of the table. Table embeddings are computed
+    once per schema and cached.
+
+    The `k` best-ranked tables are extended into a connected subgraph: the endpoints
+    of selected relationships, the relationships between selected nodes, and the
+    tables on the shortest paths joining otherwise disconnected selections. If no
+    table matches the question, the whole schema is returned.
+
+    Args:
+        k: Number of top-ranked tables to select.
+        embeddings: Optional embedding model used to rank tables semantically.
+        label_weight: Score of a question word matching a table name, relative to a
+            word matching a property name.
+        embedding_weight: Weight of the embedding similarity in the score.
+    """
+
+    def __init__(
+        self,
+        k: int = 5,
+        embeddings: Optional[Embeddings] = None,
+        label_weight: float = 3.0,
+        embedding_weight: float = 1.0,
+    ) -> None:
+        if k < 1:
+            raise ValueError("`k` must be a positive integer.")
+        self.k = k
+        self.embeddings = embeddings
+        self.label_weight = label_weight
+        self.embedding_weight = embedding_weight
+        self._table_embeddings: Optional[Tuple[str, Dict[str, List[float]]]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _describe(label: str, props: List[Dict[str, Any]]) -> str:
+        return f"{label}: {', '.join(prop['property'] for prop in props)}"
+
+    def _table_descriptions(
+        self, structured_schema: Dict[str, Any]
+    ) -> Tuple[List[str], List[str], str]:
+        """Return the table names, their descriptions and the schema's fingerprint."""
+        tables = {**structured_schema["node_props"], **structured_schema["rel_props"]}
+        descriptions = [self._describe(label, props) for label, props in tables.items()]
+        fingerprint = md5("\n".join(descriptions).encode("utf-8")).hexdigest()
+        return list(tables), descriptions, fingerprint
+
+    def _cached_table_embeddings(self, fingerprint: str) -> Optional[Dict[str, List[float]]]:
+        with self._lock:
+            if self._table_embeddings is not None and self._table_embeddings[0] == fingerprint:
+                return self._table_embeddings[1]
+        return None
+
+    def _cache_table_embeddings(
+        self, fingerprint: str, labels: List[str], vectors: List[List[float]]
+    ) -> Dict[str, List[float]]:
+        table_embeddings = dict(zip(labels, vectors, strict=True))
+        with self._lock:
+            self._table_embeddings = (fingerprint, table_embeddings)
+        return table_embeddings
+
+    def _embed_tables(self, structured_schema: Dict[str, Any]) -> Dict[str, List[float]]:
+        """Return table embeddings, cached for the schema's fingerprint."""
+        labels, descriptions, fingerprint = self._table_descriptions(structured_schema)
+        cached = self._cached_table_embeddings(fingerprint)
+        if cached is not None:
+            return cached
+        vectors = self.embeddings.embed_documents(descriptions)  # type: ignore[union-attr]
+        return self._cache_table_embeddings(fingerprint, labels, vectors)
+
+    async def _aembed_tables(self, structured_schema: Dict[str, Any]) -> Dict[str, List[float]]:
+        """Asynchronously return table embeddings. See `_embed_tables`."""
+        labels, descriptions, fingerprint = self._table_descriptions(structured_schema)
+        cached = self._cached_table_embeddings(fingerprint)
+        if cached is not None:
+            return cached
+        vectors = await self.embeddings.aembed_documents(descriptions)  # type: ignore[union-attr]
+        return self._cache_table_embeddings(fingerprint, labels, vectors)
+
+    def _word_scores(self, question: str, structured_schema: Dict[str, Any]) -> Dict[str, float]:
+        question_tokens = _tokens(question)
+        tables = {**structured_schema["node_props"], **structured_schema["rel_props"]}
+        return {
+            label: self.label_weight * len(question_tokens & _tokens(label))
+            + sum(len(question_tokens & _tokens(prop["property"])) for prop in props)
+            for label, props in tables.items()
+        }
+
+    def _add_embedding_scores(
+        self,
+        scores: Dict[str, float],
+        question_vector: List[float],
+        table_embeddings: Dict[str, List[float]],
+    ) -> None:
+        for label, vector in table_embeddings.items():
+            scores[label] += self.embedding_weight * _cosine(question_vector, vector)
+
+    def rank(self, question: str, structured_schema: Dict[str, Any]) -> List[Tuple[str, float]]:
+        """Return the node and relationship table names with their relevance scores,
+        best first."""
+        scores = self._word_scores(question, structured_schema)
+        if self.embeddings is not None and scores:
+            self._add_embedding_scores(
+                scores,
+                self.embeddings.embed_query(question),
+                self._embed_tables(structured_schema),
+            )
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    async def arank(
+        self, question: str, structured_schema: Dict[str, Any]
+    ) -> List[Tuple[str, float]]:
+        """Asynchronously rank the tables, embedding with `aembed_query` and
+        `aembed_documents`. See `rank`."""
+        scores = self._word_scores(question, structured_schema)
+        if self.embeddings is not None and scores:
+            self._add_embedding_scores(
+                scores,
+                await self.embeddings.aembed_query(question),
+                await self._aembed_tables(structured_schema),
+            )
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def select_structured_schema(
+        self, question: str, structured_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Return the structured schema pruned to the subgraph relevant to `question`."""
+        return self._prune(self.rank(question, structured_schema), structured_schema)
+
+    async def aselect_structured_schema(
+        self, question: str, structured_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Asynchronously prune the structured schema. See `select_structured_schema`."""
+        return self._prune(await self.arank(question, structured_schema), structured_schema)
+
+    def _prune(
+        self, ranking: List[Tuple[str, float]], structured_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        node_props = structured_schema["node_props"]
+        rel_props = structured_schema["rel_props"]
+        triples = structured_schema["relationships"]
+        top = [label for label, score in ranking if score > 0]
+        top = top[: self.k]
+        if not top:
+            return structured_schema
+
+        nodes = {label for label in top if label in node_props}
+        rels = {label for label in top if label in rel_props}
+        for triple in triples:
+            if triple["type"] in rels:
+                nodes.update((triple["start"], triple["end"]))
+        self._connect(nodes, triples)
+        kept_triples = [
+            triple for triple in triples if triple["start"] in nodes and triple["end"] in nodes
+        ]
+        rels.update(triple["type"] for triple in kept_triples)
+        return {
+            "node_props": {label: props for label, props in node_props.items() if label in nodes},
+            "rel_props": {label: props for label, props in rel_props.items() if label in rels},
+            "relationships": kept_triples,
+            "metadata": structured_schema.get("metadata", {}),
+        }
+
+    @staticmethod
+    def _connect(nodes: Set[str], triples: List[Dict[str, str]]) -> None:
+        """Add the nodes on shortest (undirected) paths joining the components of
+        `nodes`, in place."""
+        neighbors: Dict[str, Set[str]] = {}
+        for triple in triples:
+            neighbors.setdefault(triple["start"], set()).add(triple["end"])
+            neighbors.setdefault(triple["end"], set()).add(triple["start"])
+
+        def component(start: str) -> Set[str]:
+            seen, queue = {start}, deque([start])
+            while queue:
+                for neighbor in neighbors.get(queue.popleft(), ()):
+                    if neighbor in nodes and neighbor not in seen:
+                        seen.add(neighbor)
+                        queue.append(neighbor)
+            return seen
+
+        if not nodes:
+            return
+        connected = component(next(iter(sorted(nodes))))
+        unreached = nodes - connected
+        while unreached:
+            # Breadth-first search from the connected part to the closest other node
+            parents: Dict[str, Optional[str]] = {label: None for label in connected}
+            queue = deque(sorted(connected))
+            found = None
+            while queue and found is None:
+                current = queue.popleft()
+                for neighbor in sorted(neighbors.get(current, ())):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = current
+                    if neighbor in unreached:
+                        found = neighbor
+                        break
+                    queue.append(neighbor)
+            if found is None:
+                # The remaining nodes cannot be reached from the connected part
+                return
+            step: Optional[str] = found
+            while step is not None and step not in connected:
+                nodes.add(step)
+                step = parents[step]
+            connected = component(found) | connected
+            unreached = nodes - connected
+
+    def select(self, question: str, structured_schema: Dict[str, Any]) -> str:
+        """Return the schema text of the subgraph relevant to `question`."""
+        return format_schema(self.select_structured_schema(question, structured_schema))
+
+    async def aselect(self, question: str, structured_schema: Dict[str, Any]) -> str:
+        """Asynchronously return the schema text of the subgraph relevant to
+        `question`. See `select`."""
+        return format_schema(await self.aselect_structured_schema(question, structured_schema))
@@ -0,0 +1,99 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+
+class KuzuConnectionPool:
+    """Thread-safe pool of `kuzu.Connection`s over a shared `kuzu.Database`.
+
+    A Kuzu connection runs one query at a time, so a multi-threaded server that
+    shares a single connection serializes all of its queries. Borrowing a connection
+    from a pool lets read queries from different threads run concurrently.
+
+    Args:
+        db: The `kuzu.Database` to connect to.
+        size: Number of connections in the pool.
+        timeout: Seconds to wait for a free connection before raising `TimeoutError`.
+            None waits forever.
+        max_threads_per_connection: Passed to `set_max_threads_for_exec` on every
+            connection. `0` lets Kuzu use all available threads for each query.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        size: int = 4,
+        timeout: Optional[float] = 30.0,
+        max_threads_per_connection: int = 0,
+    ) -> None:
+        if size < 1:
+            raise ValueError("`size` must be a positive integer.")
+        import kuzu
+
+        self.db = db
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[Any] = []
+        self._closed = False
+        self._condition = threading.Condition()
+        for _ in range(size):
+            conn = kuzu.Connection(db)
+            if max_threads_per_connection:
+                conn.set_max_threads_for_exec(max_threads_per_connection)
+            self._idle.append(conn)
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Check out a connection, waiting up to `timeout` (default: the pool's).
+
+        Raises `RuntimeError` if the pool is closed, including while waiting.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._closed or bool(self._idle),
+                self.timeout if timeout is None else timeout,
+            ):
+                raise TimeoutError(
+                    f"No Kuzu connection became available within {self.timeout} seconds "
+                    f"(pool size {self.size})."
+                )
+            if self._closed:
+                raise RuntimeError("The Kuzu connection pool is closed.")
+            return self._idle.pop()
+
+    def release(self, conn: Any) -> None:
+        """Return a connection checked out with `acquire`. Once the pool is closed,
+        the connection is closed instead."""
+        with self._condition:
+            if not self._closed:
+                self._idle.append(conn)
+                self._condition.notify()
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Borrow a connection for the duration of the `with` block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @property
+    def available(self) -> int:
+        """Number of idle connections."""
+        with self._condition:
+            return len(self._idle)
+
+    def close(self) -> None:
+        """Close the idle connections and refuse new checkouts.
+
+        Connections still checked out by other threads are left running and closed
+        when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for conn in idle:
+            conn.close()
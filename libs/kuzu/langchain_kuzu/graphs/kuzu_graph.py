@@ -1,8 +1,370 @@
+import asyncio
+import copy
+import importlib
+import itertools
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from hashlib import md5
-from typing import Any, Dict, List
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
-from langchain_kuzu.graphs.graph_document import GraphDocument, Relationship
+from langchain_core.callbacks import CallbackManager, Callbacks
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from langchain_kuzu.graphs.connection_pool import KuzuConnectionPool
+from langchain_kuzu.graphs.graph_document import GraphDocument
 from langchain_kuzu.graphs.graph_store import GraphStore
+from langchain_kuzu.graphs.metrics import (
+    IngestionPhaseMetrics,
+    MetricsRegistry,
+    QueryMetrics,
+    query_template,
+)
+from langchain_kuzu.graphs.result_cache import QueryResultCache, ResultCacheInfo
+from langchain_kuzu.graphs.statement_cache import CacheInfo, PreparedStatementCache
+
+DEFAULT_BATCH_SIZE = 1000
+"""Default number of rows sent per `UNWIND` statement by the batched upsert engine."""
+
+CHUNK_EMBEDDING_INDEX = "chunk_embedding_index"
+"""Name of the vector index over `Chunk.embedding`."""
+
+FTS_INDEX = "fts_index"
+"""Name of the full-text search index of each node table."""
+
+
+@dataclass
+class _GraphBatch:
+    """Graph documents normalized into deduplicated, per-table row groups.
+
+    Dictionaries with `None` values are used as insertion-ordered sets.
+    """
+
+    chunks: Dict[str, str] = field(default_factory=dict)
+    """Chunk id -> chunk text."""
+    nodes: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    """Node label -> node id -> node properties."""
+    mentions: Dict[str, Dict[Tuple[str, str], None]] = field(default_factory=dict)
+    """Node label -> (chunk id, node id) pairs."""
+    relationships: Dict[Tuple[str, str, str], Dict[Tuple[str, str], Dict[str, Any]]] = field(
+        default_factory=dict
+    )
+    """(rel type, source label, target label) -> (source id, target id) -> relationship
+    properties."""
+
+    @property
+    def num_triples(self) -> int:
+        return sum(len(pairs) for pairs in self.relationships.values())
+
+
+class IngestionSummary(NamedTuple):
+    """Chunk ids of the documents of an incremental ingest, by outcome."""
+
+    added: List[str]
+    """Documents whose chunk was not in the graph yet."""
+    updated: List[str]
+    """Documents whose chunk was stored with different (or unknown) content."""
+    skipped: List[str]
+    """Unchanged documents, which were not written."""
+
+
+@dataclass
+class _TableCatalog:
+    """In-process record of the node and rel tables known to exist in the database."""
+
+    node_tables: set[str] = field(default_factory=set)
+    rel_tables: Dict[str, set[Tuple[str, str]]] = field(default_factory=dict)
+    """Rel table name -> (source label, target label) pairs."""
+    columns: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    """Table name -> column name -> Kuzu type, in table order (without the FROM/TO
+    columns of rel tables)."""
+
+    @classmethod
+    def from_schema(cls, schema: dict[str, list[dict]]) -> "_TableCatalog":
+        catalog = cls(node_tables={node["label"] for node in schema.get("nodes", [])})
+        for edge in schema.get("relationships", []):
+            catalog.rel_tables[edge["label"]] = {
+                (conn["src"], conn["dst"]) for conn in edge.get("connections", [])
+            }
+        for table in schema.get("nodes", []) + schema.get("relationships", []):
+            catalog.columns[table["label"]] = {
+                prop["name"]: prop["type"] for prop in table["properties"]
+            }
+        return catalog
+
+
+_T = TypeVar("_T")
+
+ResultFormat = Literal["dicts", "arrow", "pandas", "polars"]
+
+_RESULT_FORMAT_PACKAGES: Dict[str, Optional[str]] = {
+    "dicts": None,
+    "arrow": "pyarrow",
+    "pandas": "pandas",
+    "polars": "polars",
+}
+"""Result format -> optional package needed to produce it."""
+
+_DDL_PATTERN = re.compile(r"\b(CREATE|DROP|ALTER|RENAME)\b[^;]*?\bTABLE\b", re.IGNORECASE)
+
+# Raised when the DDL cache still lists a table or column dropped outside the graph
+_STALE_CATALOG_PATTERN = re.compile(
+    r"Binder exception: (Table \S+ does not exist|Cannot find property)"
+)
+
+# Kuzu resets its catalog version to 0 on every checkpoint
+_CHECKPOINT_PATTERN = re.compile(r"\bCHECKPOINT\b", re.IGNORECASE)
+
+# String literals, quoted identifiers and comments, which may contain any keyword
+_LITERAL_PATTERN = re.compile(
+    r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|//[^\n]*|/\*.*?\*/", re.DOTALL
+)
+
+# Conservative: transaction control may write, too
+_WRITE_PATTERN = re.compile(
+    r"\b(CREATE|MERGE|SET|DELETE|REMOVE|COPY|ALTER|DROP|RENAME|BEGIN|COMMIT|ROLLBACK"
+    r"|CHECKPOINT|INSTALL|LOAD|IMPORT|ATTACH|DETACH|USE)\b",
+    re.IGNORECASE,
+)
+
+_CALL_PATTERN = re.compile(r"\bCALL\b\s*(\w*)", re.IGNORECASE)
+
+# Procedures that only read the catalog or the data; any other CALL may write
+_READ_ONLY_PROCEDURES = frozenset(
+    {
+        "CATALOG_VERSION",
+        "CURRENT_SETTING",
+        "DB_VERSION",
+        "QUERY_FTS_INDEX",
+        "QUERY_VECTOR_INDEX",
+        "SHOW_ATTACHED_DATABASES",
+        "SHOW_CONNECTION",
+        "SHOW_FUNCTIONS",
+        "SHOW_INDEXES",
+        "SHOW_LOADED_EXTENSIONS",
+        "SHOW_MACROS",
+        "SHOW_PROJECTED_GRAPHS",
+        "SHOW_SEQUENCES",
+        "SHOW_TABLES",
+        "SHOW_WARNINGS",
+        "STORAGE_INFO",
+        "TABLE_INFO",
+    }
+)
+
+_CACHEABLE_RESULT_FORMATS = ("dicts", "arrow")
+
+
+def _strip_literals(query: str) -> str:
+    """Blank out string literals, quoted identifiers and comments of a query."""
+    return _LITERAL_PATTERN.sub(" ", query)
+
+
+def _may_write(query: str) -> bool:
+    """Whether `query` (with literals and comments stripped) may modify the database."""
+    if _WRITE_PATTERN.search(query):
+        return True
+    return any(name.upper() not in _READ_ONLY_PROCEDURES for name in _CALL_PATTERN.findall(query))
+
+
+# Catalog version and sorted (name, type) of every table
+_CatalogFingerprint = Tuple[int, Tuple[Tuple[str, str], ...]]
+
+# Built-in columns that node and relationship properties cannot overwrite
+_NODE_COLUMNS = frozenset({"id", "type"})
+_REL_COLUMNS = frozenset({"from", "to"})
+
+
+def _property_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "BOOL"
+    if isinstance(value, int):
+        return "INT64"
+    if isinstance(value, float):
+        return "DOUBLE"
+    if isinstance(value, datetime):
+        return "TIMESTAMP"
+    if isinstance(value, date):
+        return "DATE"
+    if isinstance(value, (list, tuple)):
+        element_type = _infer_property_type(value)
+        return "[]" if element_type is None else f"{element_type}[]"
+    # Strings, and dicts or other objects stored as JSON text
+    return "STRING"
+
+
+def _unify_types(types: set[str]) -> Optional[str]:
+    if len(types) > 1:
+        # Empty lists fit any list type
+        types = types - {"[]"}
+    if not types:
+        return None
+    if len(types) == 1:
+        (kuzu_type,) = types
+        return "STRING[]" if kuzu_type == "[]" else kuzu_type
+    if types == {"INT64", "DOUBLE"}:
+        return "DOUBLE"
+    if all(kuzu_type.endswith("[]") for kuzu_type in types):
+        return f"{_unify_types({kuzu_type[:-2] for kuzu_type in types})}[]"
+    return "STRING"
+
+
+def _infer_property_type(values: Iterable[Any]) -> Optional[str]:
+    """Return the Kuzu column type able to hold all the non-null `values`.
+
+    Integers and floats widen to DOUBLE, lists get the common type of their elements,
+    and any other mix falls back to STRING. Returns None if all values are null.
+    """
+    return _unify_types({_property_type(value) for value in values if value is not None})
+
+
+def _coerce_property(value: Any, kuzu_type: str, name: str) -> Any:
+    """Convert a property value to the Python type Kuzu expects for `kuzu_type`."""
+    if value is None:
+        return None
+    if kuzu_type.endswith("[]") and isinstance(value, (list, tuple)):
+        return [_coerce_property(element, kuzu_type[:-2], name) for element in value]
+    if kuzu_type == "STRING":
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (dict, list, tuple)):
+            return json.dumps(value, default=str)
+        return str(value)
+    is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kuzu_type == "DOUBLE" and is_number:
+        return float(value)
+    if kuzu_type == "INT64" and is_number and float(value).is_integer():
+        return int(value)
+    if (
+        (kuzu_type == "BOOL" and isinstance(value, bool))
+        or (kuzu_type == "TIMESTAMP" and isinstance(value, datetime))
+        or (kuzu_type == "DATE" and isinstance(value, date) and not isinstance(value, datetime))
+    ):
+        return value
+    if kuzu_type in ("STRING", "DOUBLE", "INT64", "BOOL", "DATE", "TIMESTAMP") or (
+        kuzu_type.endswith("[]")
+    ):
+        raise ValueError(f"Cannot store {value!r} in the {kuzu_type} property `{name}`.")
+    # Columns of other types were not created by the graph: leave casting to Kuzu
+    return value
+
+
+def _arrow_type(pa: Any, kuzu_type: str) -> Any:
+    if kuzu_type.endswith("[]"):
+        element_type = _arrow_type(pa, kuzu_type[:-2])
+        return None if element_type is None else pa.list_(element_type)
+    return {
+        "STRING": pa.string(),
+        "INT64": pa.int64(),
+        "DOUBLE": pa.float64(),
+        "BOOL": pa.bool_(),
+        "DATE": pa.date32(),
+        "TIMESTAMP": pa.timestamp("us"),
+    }.get(kuzu_type)
+
+
+def _stage_rows(columns: Dict[str, List[Any]], types: Optional[Dict[str, str]] = None) -> Any:
+    """Stage columns as an Arrow table (or a pandas DataFrame) for `COPY FROM`.
+
+    Columns are typed from their Kuzu type in `types`, and are strings otherwise.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        try:
+            import pandas as pd
+        except ImportError as exc:
+            raise ImportError(
+                "Could not import pyarrow or pandas python package. "
+                "Bulk loading requires one of them. Please install pyarrow with "
+                "`pip install pyarrow`."
+            ) from exc
+        return pd.DataFrame(columns, dtype=object)
+    types = types or {}
+    return pa.table(
+        {
+            name: pa.array(
+                values, type=_arrow_type(pa, types[name]) if name in types else pa.string()
+            )
+            for name, values in columns.items()
+        }
+    )
+
+
+def _micro_batches(items: Iterable[_T], size: int) -> Iterator[List[_T]]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+async def _amicro_batches(
+    items: Union[Iterable[_T], AsyncIterable[_T]], size: int
+) -> AsyncIterator[List[_T]]:
+    if not isinstance(items, AsyncIterable):
+        for batch in _micro_batches(items, size):
+            yield batch
+        return
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def format_schema(structured_schema: Dict[str, Any]) -> str:
+    """Render a structured schema (see `KuzuGraph.get_structured_schema`) as the
+    schema text used in Cypher generation prompts."""
+    lines = []
+
+    # ALWAYS RESPECT THE RELATIONSHIP DIRECTIONS section
+    lines.append("ALWAYS RESPECT THE RELATIONSHIP DIRECTIONS:\n---")
+    for rel in structured_schema.get("relationships", []):
+        lines.append(f"(:{rel['start']}) -[:{rel['type']}]-> (:{rel['end']})")
+    lines.append("---")
+
+    # NODES section
+    lines.append("\nNode properties:")
+    for label, props in structured_schema.get("node_props", {}).items():
+        lines.append(f"  - {label}")
+        for prop in props:
+            ptype = prop["type"].lower()
+            lines.append(f"    - {prop['property']}: {ptype}")
+
+    # EDGES section (only include relationships with properties)
+    lines.append("\nRelationship properties:")
+    for label, props in structured_schema.get("rel_props", {}).items():
+        if props:
+            lines.append(f"- {label}")
+            for prop in props:
+                ptype = prop["type"].lower()
+                lines.append(f"    - {prop['property']}: {ptype}")
+    return "\n".join(lines)
 
 
 class KuzuGraph(GraphStore):
@@ -21,9 +383,66 @@ class KuzuGraph(GraphStore):
     """
 
     def __init__(
-        self, db: Any, database: str = "kuzu", allow_dangerous_requests: bool = False
+        self,
+        db: Any,
+        database: str = "kuzu",
+        allow_dangerous_requests: bool = False,
+        statement_cache_size: int = 128,
+        max_concurrent_queries: int = 4,
+        pool_size: int = 0,
+        pool_timeout: Optional[float] = 30.0,
+        max_threads_per_connection: int = 0,
+        result_cache_max_bytes: int = 0,
+        result_cache_ttl: Optional[float] = None,
+        embeddings: Optional[Embeddings] = None,
+        embedding_batch_size: int = 64,
+        full_text_search: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        callbacks: Callbacks = None,
     ) -> None:
-        """Initializes the Kuzu graph database connection."""
+        """Initializes the Kuzu graph database connection.
+
+        `statement_cache_size` bounds the LRU cache of prepared statements used by
+        `query` and the ingestion statements (`0` disables it).
+
+        `max_concurrent_queries` is the number of connections (and threads) behind
+        the async methods (`aquery`, `aadd_graph_documents`, ...). Each call has a
+        connection to itself until it completes. They are only created on first
+        async use.
+
+        With `pool_size > 0`, `query`, the schema methods and `add_graph_documents`
+        borrow a connection from a `KuzuConnectionPool` of `pool_size` connections,
+        so that they can be called from several threads at once. A call waits up to
+        `pool_timeout` seconds for a free connection before raising `TimeoutError`.
+        `max_threads_per_connection` caps the threads Kuzu uses for each query on a
+        pooled connection (`0` means no cap). Kuzu allows a single write transaction
+        at a time, so ingestion calls are serialized.
+
+        With `result_cache_max_bytes > 0`, results of read queries sent through
+        `query` (as dicts or Arrow tables) are cached by query text and parameters,
+        up to an estimated `result_cache_max_bytes` in total and for at most
+        `result_cache_ttl` seconds. Any write through the graph (`add_graph_documents`
+        or a query with a write clause outside string literals and comments, or a
+        `CALL` to a procedure other than the read-only catalog and index lookups)
+        clears the cache; writes from other connections are only picked up once cached
+        results expire.
+
+        With `embeddings`, `add_graph_documents(include_source=True)` stores an
+        embedding of every new chunk in a `Chunk.embedding FLOAT[dim]` column,
+        computed `embedding_batch_size` texts at a time, and `similarity_search`
+        queries a Kuzu vector index over it.
+
+        With `full_text_search`, `add_graph_documents` creates a Kuzu full-text
+        search index over `Chunk.text` and over the `id` of every entity table,
+        which Kuzu keeps up to date on later writes, for `keyword_search`.
+
+        With `metrics` or `callbacks`, every statement the graph runs is recorded as
+        a `QueryMetrics` (Kuzu's compiling and execution time, the time spent
+        materializing the result, its row count and the query template, or the
+        error), and every ingestion phase as an `IngestionPhaseMetrics`. They are
+        added to the `metrics` registry and sent to the LangChain `callbacks` as
+        `kuzu_query` and `kuzu_ingestion_phase` custom events.
+        """
 
         if allow_dangerous_requests is not True:
             raise ValueError(
@@ -41,7 +460,41 @@ class KuzuGraph(GraphStore):
             )
         self.db = db
         self.conn = kuzu.Connection(self.db)
+        self.statement_cache_size = statement_cache_size
+        # Prepared statements belong to the connection that prepared them
+        self._statement_caches: Dict[Any, PreparedStatementCache] = {}
+        self._local = threading.local()
+        self.max_concurrent_queries = max_concurrent_queries
+        self._async_pool: Optional[KuzuConnectionPool] = None
+        self._async_executor: Optional[ThreadPoolExecutor] = None
+        self._async_lock = threading.Lock()
+        self._pool: Optional[KuzuConnectionPool] = None
+        if pool_size > 0:
+            self._pool = KuzuConnectionPool(
+                self.db,
+                size=pool_size,
+                timeout=pool_timeout,
+                max_threads_per_connection=max_threads_per_connection,
+            )
+        self.result_cache: Optional[QueryResultCache] = None
+        if result_cache_max_bytes > 0:
+            self.result_cache = QueryResultCache(result_cache_max_bytes, result_cache_ttl)
+        # Kuzu rejects a second concurrent write transaction instead of waiting
+        self._write_lock = threading.RLock()
+        self.embeddings = embeddings
+        self.embedding_batch_size = embedding_batch_size
+        self._loaded_extensions: set[str] = set()
+        self.full_text_search = full_text_search
+        self.metrics = metrics
+        self._callback_manager = CallbackManager.configure(callbacks) if callbacks else None
+        self._instrumented = metrics is not None or self._callback_manager is not None
         self.database = database
+        self._catalog: Optional[_TableCatalog] = None
+        self._schema_stale = True
+        self._schema_refreshed_at = 0.0
+        self._schema_fingerprint: Optional[_CatalogFingerprint] = None
+        self._catalog_version_supported = True
+        self._introspected: Optional[Tuple[_CatalogFingerprint, dict[str, list[dict]]]] = None
         self.refresh_schema()
 
     @property
@@ -49,88 +502,592 @@ class KuzuGraph(GraphStore):
         """Returns the schema of the Kuzu database"""
         return self.schema
 
-    def query(self, query: str, params: dict = {}) -> List[Dict[str, Any]]:
-        """Query Kuzu database"""
-        result = self.conn.execute(query, params)
+    def _run_query_results(self, query: str, params: dict) -> List[Any]:
+        """Execute a user query and return all of its `QueryResult`s in order."""
+        statements = _strip_literals(query)
+        if _DDL_PATTERN.search(statements):
+            # Tables may have been created or dropped behind the DDL cache's back
+            self._catalog = None
+            for statement_cache in list(self._statement_caches.values()):
+                statement_cache.clear()
+            self.invalidate_schema()
+        elif _CHECKPOINT_PATTERN.search(statements):
+            self._introspected = None
+        # Successful queries are observed with their materialization by the caller
+        if self.result_cache is None or not _may_write(statements):
+            result = self._execute(query, params, observe=False)
+        else:
+            try:
+                result = self._execute(query, params, observe=False)
+            finally:
+                self.result_cache.invalidate()
         # Handle both single QueryResult and list of QueryResults
-        if isinstance(result, list):
-            result = result[0]  # Take first result if multiple
-        column_names = result.get_column_names()
-        return_list = []
+        return result if isinstance(result, list) else [result]
+
+    def _run_query(self, query: str, params: dict) -> Any:
+        """Execute a user query and return its first `QueryResult`."""
+        results = self._run_query_results(query, params)
+        for extra_result in results[1:]:
+            extra_result.close()
+        return results[0]  # Take first result if multiple
+
+    def _materialize_results(
+        self,
+        query: str,
+        results: List[Any],
+        result_format: str,
+        arrow_chunk_size: Optional[int] = None,
+    ) -> List[Any]:
+        """Convert `QueryResult`s into the requested result format and observe the
+        query."""
+        if not self._instrumented:
+            return [
+                self._materialize(result, result_format, arrow_chunk_size) for result in results
+            ]
+        num_rows = sum(result.get_num_tuples() for result in results)
+        start = time.perf_counter()
+        values = [self._materialize(result, result_format, arrow_chunk_size) for result in results]
+        self._observe_query(query, results, time.perf_counter() - start, num_rows)
+        return values
+
+    def _materialize(
+        self, result: Any, result_format: str, arrow_chunk_size: Optional[int] = None
+    ) -> Any:
+        """Convert a `QueryResult` into the requested result format."""
+        if result_format == "dicts":
+            column_names = result.get_column_names()
+            return_list = []
+            while result.has_next():
+                row = result.get_next()
+                return_list.append(dict(zip(column_names, row, strict=False)))
+            return return_list
+        if result_format == "arrow":
+            return result.get_as_arrow(arrow_chunk_size)
+        if result_format == "pandas":
+            return result.get_as_df()
+        return result.get_as_pl()
+
+    @staticmethod
+    def _check_result_format(result_format: str) -> None:
+        if result_format not in _RESULT_FORMAT_PACKAGES:
+            raise ValueError(
+                f"Unknown result_format {result_format!r}. "
+                f"Expected one of {list(_RESULT_FORMAT_PACKAGES)}."
+            )
+        package = _RESULT_FORMAT_PACKAGES[result_format]
+        if package is None:
+            return
+        try:
+            importlib.import_module(package)
+        except ImportError as exc:
+            raise ImportError(
+                f"Could not import {package} python package. "
+                f"Please install it with `pip install {package}`."
+            ) from exc
+
+    def query(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        *,
+        result_format: ResultFormat = "dicts",
+        arrow_chunk_size: Optional[int] = None,
+    ) -> Any:
+        """Query Kuzu database
+
+        By default, rows are returned as a list of dicts. For large results, pass
+        `result_format` to get Kuzu's native columnar output without building a
+        Python dict per row:
+
+        - "arrow": a `pyarrow.Table` (with `arrow_chunk_size` rows per record batch;
+          None lets Kuzu choose, -1 returns a single chunk).
+        - "pandas": a `pandas.DataFrame`.
+        - "polars": a `polars.DataFrame`.
+
+        If the graph has a result cache, read queries returning dicts or Arrow tables
+        are answered from it when possible.
+        """
+        self._check_result_format(result_format)
+        params = params or {}
+        cache = self.result_cache
+        if (
+            cache is None
+            or result_format not in _CACHEABLE_RESULT_FORMATS
+            or _may_write(_strip_literals(query))
+        ):
+            with self._borrow_connection():
+                result = self._run_query(query, params)
+                (value,) = self._materialize_results(
+                    query, [result], result_format, arrow_chunk_size
+                )
+                return value
+
+        key = (query, repr(sorted(params.items())), result_format, arrow_chunk_size)
+        hit, value = cache.get(key)
+        if not hit:
+            generation = cache.generation
+            with self._borrow_connection():
+                result = self._run_query(query, params)
+                (value,) = self._materialize_results(
+                    query, [result], result_format, arrow_chunk_size
+                )
+            cache.put(key, value, generation)
+        # Arrow tables are immutable; give callers their own rows, down to nested
+        # lists and dicts, to modify
+        return copy.deepcopy(value) if result_format == "dicts" else value
+
+    def query_all(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        *,
+        result_format: ResultFormat = "dicts",
+        arrow_chunk_size: Optional[int] = None,
+    ) -> List[Any]:
+        """Run a script of one or more `;`-separated statements and return the result
+        set of every statement, in order, each in `result_format` (see `query`).
+
+        `query` only returns the first result set; this runs a whole batch of
+        statements in a single call. Note that Kuzu cannot prepare multi-statement
+        scripts, so they cannot take `params`.
+        """
+        self._check_result_format(result_format)
+        params = params or {}
+        with self._borrow_connection():
+            results = self._run_query_results(query, params)
+            return self._materialize_results(query, results, result_format, arrow_chunk_size)
+
+    def query_iter(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        chunk_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """Query Kuzu database and stream the rows from the result cursor.
+
+        Unlike `query`, rows are converted to dicts one at a time as the caller
+        consumes them, so the first row is available immediately and the Python side
+        never holds more than one row (or chunk) at a time.
+
+        Args:
+            query: The Cypher query to run.
+            params: The query parameters.
+            chunk_size: If set, yield lists of up to `chunk_size` rows instead of
+                single rows.
+            max_rows: If set, stop after this many rows.
+
+        The underlying `QueryResult` is closed as soon as the rows are exhausted,
+        `max_rows` is reached, or the consumer stops early and closes the generator
+        (e.g. with `contextlib.closing`, or when it is garbage collected)::
+
+            with closing(graph.query_iter("MATCH (n) RETURN n.id")) as rows:
+                for row in rows:
+                    if done(row):
+                        break
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("`chunk_size` must be a positive integer.")
+        # The pooled connection is held until the cursor is closed, but only bound to
+        # the consumer's thread while the query starts.
+        with self._checkout_connection() as conn:
+            with self._use_connection(conn):
+                result = self._run_query(query, params or {})
+            # Materialization time excludes the time spent in the consumer
+            materialization_time = 0.0
+            num_rows = 0
+            try:
+                column_names = result.get_column_names()
+                remaining = max_rows if max_rows is not None else -1
+                while remaining != 0:
+                    start = time.perf_counter()
+                    if not result.has_next():
+                        break
+                    if chunk_size is None:
+                        remaining -= 1
+                        row = dict(zip(column_names, result.get_next(), strict=False))
+                        materialization_time += time.perf_counter() - start
+                        num_rows += 1
+                        yield row
+                        continue
+                    count = chunk_size if remaining < 0 else min(chunk_size, remaining)
+                    rows = result.get_n(count)
+                    remaining -= len(rows)
+                    chunk = [dict(zip(column_names, row, strict=False)) for row in rows]
+                    materialization_time += time.perf_counter() - start
+                    num_rows += len(chunk)
+                    yield chunk
+            finally:
+                if self._instrumented:
+                    self._observe_query(query, [result], materialization_time, num_rows)
+                result.close()
+
+    @property
+    def _active_conn(self) -> Any:
+        """The connection bound to the current thread by `_use_connection`, if any,
+        otherwise `self.conn`."""
+        return getattr(self._local, "conn", None) or self.conn
+
+    @contextmanager
+    def _use_connection(self, conn: Any) -> Iterator[None]:
+        """Run the graph's statements on `conn` in the current thread."""
+        previous = getattr(self._local, "conn", None)
+        self._local.conn = conn
+        try:
+            yield
+        finally:
+            self._local.conn = previous
+
+    @contextmanager
+    def _checkout_connection(self) -> Iterator[Any]:
+        """Yield the connection a call should run on: the one already bound to the
+        current thread (nested and async calls), else one borrowed from the pool,
+        else `self.conn`."""
+        bound = getattr(self._local, "conn", None)
+        if bound is not None or self._pool is None:
+            yield bound or self.conn
+            return
+        with self._pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _borrow_connection(self) -> Iterator[Any]:
+        """Check out a connection and bind it to the current thread for the call."""
+        with self._checkout_connection() as conn, self._use_connection(conn):
+            yield conn
+
+    @property
+    def pool(self) -> Optional[KuzuConnectionPool]:
+        """The connection pool, if the graph was created with `pool_size > 0`."""
+        return self._pool
+
+    def _statement_cache(self) -> PreparedStatementCache:
+        """The prepared statement cache of the active connection."""
+        conn = self._active_conn
+        statement_cache = self._statement_caches.get(conn)
+        if statement_cache is None:
+            statement_cache = PreparedStatementCache(conn, self.statement_cache_size)
+            self._statement_caches[conn] = statement_cache
+        return statement_cache
+
+    def _execute(self, query: str, parameters: Optional[dict] = None, observe: bool = True) -> Any:
+        """Execute `query` on the active connection through its prepared statement cache."""
+        return self._run_statement(
+            query, lambda: self._statement_cache().execute(query, parameters), observe
+        )
+
+    def _run_statement(self, query: str, run: Callable[[], Any], observe: bool = True) -> Any:
+        """Call `run` to execute `query`, and observe the statement if the graph is
+        instrumented: its error if it fails, its timings if it succeeds and `observe`."""
+        if not self._instrumented:
+            return run()
+        try:
+            result = run()
+        except Exception as e:
+            self._emit_query_metrics(QueryMetrics(query_template(query), 0.0, 0.0, 0.0, 0, str(e)))
+            raise
+        if observe:
+            results = result if isinstance(result, list) else [result]
+            self._observe_query(query, results, 0.0, sum(r.get_num_tuples() for r in results))
+        return result
+
+    def _observe_query(
+        self, query: str, results: List[Any], materialization_time: float, num_rows: int
+    ) -> None:
+        # Kuzu reports times in milliseconds
+        self._emit_query_metrics(
+            QueryMetrics(
+                template=query_template(query),
+                compiling_time=sum(result.get_compiling_time() for result in results) / 1000,
+                execution_time=sum(result.get_execution_time() for result in results) / 1000,
+                materialization_time=materialization_time,
+                num_rows=num_rows,
+            )
+        )
+
+    def _emit_query_metrics(self, metrics: QueryMetrics) -> None:
+        if self.metrics is not None:
+            self.metrics.record_query(metrics)
+        if self._callback_manager is not None:
+            self._callback_manager.on_custom_event("kuzu_query", metrics._asdict())
+
+    @contextmanager
+    def _ingestion_phase(self, phase: str, num_rows: int) -> Iterator[None]:
+        """Observe the duration of an ingestion phase that writes `num_rows` rows, if
+        it succeeds.
+
+        Phases can nest (e.g. "ddl" within "nodes", "embeddings" within "chunks");
+        the time spent in nested phases is subtracted from the enclosing one, so
+        that every second is counted in exactly one phase.
+        """
+        if not self._instrumented:
+            yield
+            return
+        nested = getattr(self._local, "nested_phase_times", None)
+        if nested is None:
+            nested = self._local.nested_phase_times = []
+        nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            duration = elapsed - nested.pop()
+            if nested:
+                nested[-1] += elapsed
+        metrics = IngestionPhaseMetrics(phase, num_rows, duration)
+        if self.metrics is not None:
+            self.metrics.record_ingestion_phase(metrics)
+        if self._callback_manager is not None:
+            self._callback_manager.on_custom_event(
+                "kuzu_ingestion_phase",
+                {**metrics._asdict(), "rows_per_second": metrics.rows_per_second},
+            )
+
+    def validate_query(self, query: str) -> Optional[str]:
+        """Check a query for syntax and binder errors without running it.
+
+        Kuzu parses, binds and plans the query, as `EXPLAIN` would. The prepared
+        statement is cached, so running the query afterwards does not compile it again.
+
+        Returns:
+            Kuzu's error message, or None if the query is valid.
+        """
+        with self._borrow_connection():
+            return self._statement_cache().validate(query)
+
+    def statement_cache_info(self) -> CacheInfo:
+        """Return hit/miss statistics of the prepared statement caches of all connections."""
+        infos = [cache.info() for cache in list(self._statement_caches.values())]
+        return CacheInfo(
+            hits=sum(info.hits for info in infos),
+            misses=sum(info.misses for info in infos),
+            maxsize=self.statement_cache_size,
+            currsize=sum(info.currsize for info in infos),
+        )
+
+    def result_cache_info(self) -> Optional[ResultCacheInfo]:
+        """Return hit/miss statistics of the result cache, or None if it is disabled."""
+        return self.result_cache.info() if self.result_cache is not None else None
+
+    def _fetch_all(self, result: Any) -> List[list]:
+        rows = []
         while result.has_next():
-            row = result.get_next()
-            return_list.append(dict(zip(column_names, row, strict=False)))
-        return return_list
+            rows.append(result.get_next())
+        return rows
 
-    def get_schema_dict(self) -> dict[str, list[dict]]:
+    def _show_tables(self) -> List[list]:
+        return self._fetch_all(self._active_conn.execute("CALL SHOW_TABLES() RETURN name, type;"))
+
+    def _execute_script(self, statements: List[str]) -> List[List[list]]:
+        """Run several statements in a single `execute` call and return the rows of
+        each of them.
+
+        Falls back to one call per statement if the connection does not return one
+        result per statement (Kuzu versions without multi-statement queries).
         """
-        Return the schema of the Kuzu database as a dictionary.
-        Includes nodes, relationships, and their associated properties.
+        if not statements:
+            return []
+        results = self._active_conn.execute(" ".join(statements))
+        if not isinstance(results, list):
+            results = [results]
+        if len(results) != len(statements):
+            results = [self._active_conn.execute(statement) for statement in statements]
+        return [self._fetch_all(result) for result in results]
+
+    def _version_and_tables(self) -> Tuple[Optional[int], List[list]]:
+        """Return Kuzu's catalog version and the names and types of all tables, read
+        in a single `execute` call when `CATALOG_VERSION` is available."""
+        if self._catalog_version_supported:
+            try:
+                version_rows, tables = self._execute_script(
+                    [
+                        "CALL CATALOG_VERSION() RETURN version;",
+                        "CALL SHOW_TABLES() RETURN name, type;",
+                    ]
+                )
+            except RuntimeError:
+                self._catalog_version_supported = False
+            else:
+                return (version_rows[0][0] if version_rows else None), tables
+        return None, self._show_tables()
+
+    def _table_info(self, table: str) -> List[list]:
+        return self._fetch_all(
+            self._active_conn.execute(f"CALL TABLE_INFO('{table}') RETURN name, type;")
+        )
+
+    @staticmethod
+    def _fingerprint(version: Optional[int], tables: List[list]) -> Optional[_CatalogFingerprint]:
+        if version is None:
+            return None
+        return version, tuple(sorted((name, table_type) for name, table_type in tables))
+
+    def _catalog_fingerprint(self) -> Optional[_CatalogFingerprint]:
+        """Return Kuzu's catalog version together with the names and types of all
+        tables, or None if the catalog version is not available.
+
+        Kuzu resets the catalog version to 0 on every checkpoint (explicit or
+        automatic), so the version alone can repeat for different catalogs; the
+        table list tells them apart when tables were created or dropped.
         """
-        # Get table names
-        tables_result = self.conn.execute("CALL SHOW_TABLES() RETURN *;")
-        tables = []
-        while tables_result.has_next():  # type: ignore
-            data = tables_result.get_next()  # type: ignore
-            tables.append(data)
+        return self._fingerprint(*self._version_and_tables())
 
-        nodes = [table[1] for table in tables if table[2] == "NODE"]
-        relationships = [table[1] for table in tables if table[2] == "REL"]
+    def _introspect_schema(self) -> Tuple[Optional[_CatalogFingerprint], dict[str, list[dict]]]:
+        """Return the catalog fingerprint and schema, re-reading the catalog only if
+        the fingerprint changed since the last call.
+
+        The memo is also dropped on every DDL statement and checkpoint issued through
+        the graph, since a checkpoint can bring the catalog version back to the value
+        it had when the memo was taken.
+
+        The catalog is read in two `execute` calls whatever the number of tables: one
+        for the fingerprint and, on a memo miss, one script with a `TABLE_INFO` call per
+        table and a `SHOW_CONNECTION` call per relationship table.
+        """
+        version, tables = self._version_and_tables()
+        fingerprint = self._fingerprint(version, tables)
+        if fingerprint is not None and self._introspected is not None:
+            cached_fingerprint, cached_schema = self._introspected
+            if cached_fingerprint == fingerprint:
+                return fingerprint, cached_schema
+
+        nodes = [name for name, table_type in tables if table_type == "NODE"]
+        relationships = [name for name, table_type in tables if table_type == "REL"]
+
+        statements = [f"CALL TABLE_INFO('{table}') RETURN name, type;" for table in nodes]
+        for rel in relationships:
+            statements.append(f"CALL TABLE_INFO('{rel}') RETURN name, type;")
+            statements.append(
+                f"CALL SHOW_CONNECTION('{rel}') "
+                "RETURN `source table name`, `destination table name`;"
+            )
+        results = iter(self._execute_script(statements))
 
         # Collect schema information for nodes and relationships
         schema: dict[str, list[dict]] = {"nodes": [], "relationships": []}
 
         for node in nodes:
-            node_schema = {"label": node, "properties": []}
-            node_properties = self.conn.execute(f"CALL TABLE_INFO('{node}') RETURN *;")
-            while node_properties.has_next():  # type: ignore
-                row = node_properties.get_next()  # type: ignore
-                node_schema["properties"].append({"name": row[1], "type": row[2]})
-            schema["nodes"].append(node_schema)
+            properties = [{"name": name, "type": ptype} for name, ptype in next(results)]
+            schema["nodes"].append({"label": node, "properties": properties})
 
         for rel in relationships:
-            edge = dict()
-            edge["label"] = rel
-            edge["properties"] = []
-            rel_properties = self.conn.execute(f"CALL SHOW_CONNECTION('{rel}') RETURN *;")
-            while rel_properties.has_next():  # type: ignore
-                row = rel_properties.get_next()  # type: ignore
-                edge["src"] = row[0]
-                edge["dst"] = row[1]
-                edge["properties"].append({"name": row[1], "type": row[2]})
+            properties = [{"name": name, "type": ptype} for name, ptype in next(results)]
+            connections = [{"src": src, "dst": dst} for src, dst in next(results)]
+            edge: dict[str, Any] = {
+                "label": rel,
+                "properties": properties,
+                "connections": connections,
+            }
+            if connections:
+                edge["src"] = connections[0]["src"]
+                edge["dst"] = connections[0]["dst"]
             schema["relationships"].append(edge)
-        return schema
+
+        if fingerprint is not None:
+            self._introspected = (fingerprint, schema)
+        return fingerprint, schema
+
+    def get_schema_dict(self) -> dict[str, list[dict]]:
+        """
+        Return the schema of the Kuzu database as a dictionary.
+        Includes nodes, relationships, and their associated properties.
+
+        Each relationship lists every FROM/TO pair of its table under `connections`;
+        `src` and `dst` hold the first pair.
+
+        The schema is memoized by Kuzu's catalog version and table list: as long as
+        no DDL statement ran, a call costs a single `execute` call (`CATALOG_VERSION`
+        and `SHOW_TABLES`) instead of one catalog query per table.
+        """
+        with self._borrow_connection():
+            return copy.deepcopy(self._introspect_schema()[1])
+
+    @property
+    def get_structured_schema(self) -> Dict[str, Any]:
+        """Returns the structured schema of the Kuzu database"""
+        return self.structured_schema
+
+    def invalidate_schema(self) -> None:
+        """Mark the cached schema as stale, e.g. after a DDL statement."""
+        self._schema_stale = True
+        self._introspected = None
+
+    def _schema_changed(self) -> bool:
+        fingerprint = self._catalog_fingerprint()
+        return fingerprint is None or fingerprint != self._schema_fingerprint
+
+    def refresh_schema_if_stale(
+        self, max_age: Optional[float] = None, check_catalog: bool = False
+    ) -> bool:
+        """Refresh the schema only if it may be out of date.
+
+        The schema is refreshed if it was invalidated by a DDL statement issued through
+        this graph, if it is older than `max_age` seconds, or, with `check_catalog`, if
+        Kuzu's catalog version or table list changed since the last refresh, i.e. any
+        DDL statement ran on any connection (checked with a single `execute` call
+        running `CATALOG_VERSION` and `SHOW_TABLES`). Kuzu resets the catalog version on every checkpoint, so a
+        column added by another connection can go unnoticed if a checkpoint brings the
+        version back to its previous value.
+
+        Returns:
+            Whether the schema was refreshed.
+        """
+        with self._borrow_connection():
+            stale = (
+                self._schema_stale
+                or (max_age is not None and time.monotonic() - self._schema_refreshed_at > max_age)
+                or (check_catalog and self._schema_changed())
+            )
+            if stale:
+                self.refresh_schema()
+            return stale
 
     def refresh_schema(self) -> None:
-        schema = self.get_schema_dict()
-        lines = []
+        with self._borrow_connection():
+            self._schema_fingerprint, schema = self._introspect_schema()
+        self._catalog = _TableCatalog.from_schema(schema)
+        self._schema_stale = False
+        self._schema_refreshed_at = time.monotonic()
+        self.structured_schema = {
+            "node_props": {
+                node["label"]: [
+                    {"property": prop["name"], "type": prop["type"]} for prop in node["properties"]
+                ]
+                for node in schema["nodes"]
+            },
+            "rel_props": {
+                edge["label"]: [
+                    {"property": prop["name"], "type": prop["type"]} for prop in edge["properties"]
+                ]
+                for edge in schema["relationships"]
+            },
+            "relationships": [
+                {"start": conn["src"], "type": edge["label"], "end": conn["dst"]}
+                for edge in schema["relationships"]
+                for conn in edge["connections"]
+            ],
+            "metadata": {},
+        }
+        self.schema = format_schema(self.structured_schema)
 
-        # ALWAYS RESPECT THE RELATIONSHIP DIRECTIONS section
-        lines.append("ALWAYS RESPECT THE RELATIONSHIP DIRECTIONS:\n---")
-        for edge in schema.get("relationships", []):
-            lines.append(f"(:{edge['src']}) -[:{edge['label']}]-> (:{edge['dst']})")
-        lines.append("---")
-
-        # NODES section
-        lines.append("\nNode properties:")
-        for node in schema.get("nodes", []):
-            lines.append(f"  - {node['label']}")
-            for prop in node.get("properties", []):
-                ptype = prop["type"].lower()
-                lines.append(f"    - {prop['name']}: {ptype}")
+    @property
+    def _table_catalog(self) -> _TableCatalog:
+        """The DDL cache, seeded from `get_schema_dict` when missing or invalidated."""
+        if self._catalog is None:
+            self._catalog = _TableCatalog.from_schema(self.get_schema_dict())
+        return self._catalog
 
-        # EDGES section (only include relationships with properties)
-        lines.append("\nRelationship properties:")
-        for edge in schema.get("relationships", []):
-            if edge.get("properties"):
-                lines.append(f"- {edge['label']}")
-                for prop in edge.get("properties", []):
-                    ptype = prop["type"].lower()
-                    lines.append(f"    - {prop['name']}: {ptype}")
-        self.schema = "\n".join(lines)
+    def _execute_ddl(self, ddl: str) -> None:
+        with self._write_lock, self._ingestion_phase("ddl", 1):
+            self._run_statement(ddl, lambda: self._active_conn.execute(ddl))
+        self.invalidate_schema()
 
     def _create_chunk_node_table(self) -> None:
-        self.conn.execute(
+        catalog = self._table_catalog
+        if "Chunk" in catalog.node_tables:
+            return
+        self._execute_ddl(
             """
             CREATE NODE TABLE IF NOT EXISTS Chunk (
                 id STRING,
@@ -140,9 +1097,14 @@ class KuzuGraph(GraphStore):
             );
             """
         )
+        catalog.node_tables.add("Chunk")
+        catalog.columns["Chunk"] = {"id": "STRING", "text": "STRING", "type": "STRING"}
 
     def _create_entity_node_table(self, node_label: str) -> None:
-        self.conn.execute(
+        catalog = self._table_catalog
+        if node_label in catalog.node_tables:
+            return
+        self._execute_ddl(
             f"""
             CREATE NODE TABLE IF NOT EXISTS {node_label} (
                 id STRING,
@@ -151,20 +1113,816 @@ class KuzuGraph(GraphStore):
             );
             """
         )
+        catalog.node_tables.add(node_label)
+        catalog.columns[node_label] = {"id": "STRING", "type": "STRING"}
 
-    def _create_entity_relationship_table(self, rel: Relationship) -> None:
-        self.conn.execute(
+    def _add_rel_table_pairs(
+        self,
+        rel_type: str,
+        pairs: List[Tuple[str, str]],
+        properties: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Create the rel table `rel_type`, or add the FROM/TO pairs it is missing."""
+        catalog = self._table_catalog
+        known_pairs = catalog.rel_tables.get(rel_type)
+        if known_pairs is None:
+            properties = properties or {}
+            columns = ", ".join(
+                [f"FROM {src} TO {dst}" for src, dst in pairs]
+                + [f"{name} {ptype}" for name, ptype in properties.items()]
+            )
+            self._execute_ddl(f"CREATE REL TABLE IF NOT EXISTS {rel_type} ({columns})")
+            catalog.rel_tables[rel_type] = set(pairs)
+            catalog.columns[rel_type] = dict(properties)
+            return
+        for src, dst in pairs:
+            if (src, dst) not in known_pairs:
+                self._execute_ddl(f"ALTER TABLE {rel_type} ADD IF NOT EXISTS FROM {src} TO {dst}")
+                known_pairs.add((src, dst))
+
+    def _create_entity_relationship_table(
+        self, rel_type: str, source_label: str, target_label: str
+    ) -> None:
+        self._add_rel_table_pairs(rel_type, [(source_label, target_label)])
+
+    def _create_mentions_relationship_table(self, node_labels: List[str]) -> None:
+        # Add common properties for all the tables here
+        self._add_rel_table_pairs(
+            "MENTIONS",
+            [("Chunk", node_label) for node_label in dict.fromkeys(node_labels)],
+            properties={"label": "STRING", "triplet_source_id": "STRING"},
+        )
+
+    def _merge_chunk(self, chunk_id: str, text: str) -> None:
+        self._execute(
+            """
+            MERGE (c:Chunk {id: $id})
+                SET c.text = $text,
+                    c.type = "text_chunk"
+            """,
+            parameters={"id": chunk_id, "text": text},
+        )
+
+    def _add_property_columns(
+        self, table: str, properties: Iterable[Dict[str, Any]], reserved: frozenset
+    ) -> Dict[str, Tuple[str, str]]:
+        """Make sure `table` has a column for every property in `properties`.
+
+        Column types are inferred from all the values of a property. Columns are
+        matched case-insensitively, like Kuzu does, and existing columns keep their
+        type.
+
+        Returns:
+            Property name -> (column name, Kuzu type), for the properties that have
+            a column.
+        """
+        values: Dict[str, List[Any]] = {}
+        for props in properties:
+            for name, value in props.items():
+                if name.lower() not in reserved:
+                    values.setdefault(name, []).append(value)
+        columns = self._table_catalog.columns.setdefault(table, {})
+        by_lower = {column.lower(): column for column in columns}
+        resolved = {}
+        for name, property_values in values.items():
+            column = by_lower.get(name.lower())
+            if column is None:
+                kuzu_type = _infer_property_type(property_values)
+                if kuzu_type is None:
+                    continue
+                self._execute_ddl(f"ALTER TABLE {table} ADD IF NOT EXISTS `{name}` {kuzu_type}")
+                column = by_lower[name.lower()] = name
+                columns[column] = kuzu_type
+            resolved[name] = (column, columns[column])
+        return resolved
+
+    @staticmethod
+    def _property_values(
+        properties: Dict[str, Any], columns: Dict[str, Tuple[str, str]]
+    ) -> Dict[str, Any]:
+        """Return the non-null `properties` that have a column, by column name and
+        converted to the column type."""
+        values = {}
+        for name, value in properties.items():
+            if name in columns and value is not None:
+                column, kuzu_type = columns[name]
+                values[column] = _coerce_property(value, kuzu_type, name)
+        return values
+
+    def _merge_entity(
+        self, node_label: str, node_id: Any, properties: Optional[Dict[str, Any]] = None
+    ) -> None:
+        properties = properties or {}
+        values = self._property_values(
+            properties, self._add_property_columns(node_label, [properties], _NODE_COLUMNS)
+        )
+        assignments = "".join(f",\n    e.`{column}` = $p{i}" for i, column in enumerate(values))
+        self._execute(
             f"""
-            CREATE REL TABLE IF NOT EXISTS {rel.type} (
-                FROM {rel.source.type} TO {rel.target.type}
-            );
+            MERGE (e:{node_label} {{id: $id}})
+                SET e.type = "entity"{assignments}
+            """,
+            parameters={
+                "id": node_id,
+                **{f"p{i}": value for i, value in enumerate(values.values())},
+            },
+        )
+
+    def _merge_mention(self, chunk_id: str, node_label: str, node_id: Any) -> None:
+        self._execute(
+            f"""
+            MATCH (c:Chunk {{id: $id}}),
+                  (e:{node_label} {{id: $node_id}})
+            MERGE (c)-[m:MENTIONS]->(e)
+              SET m.triplet_source_id = $id
+            """,
+            parameters={"id": chunk_id, "node_id": node_id},
+        )
+
+    def _merge_relationship(
+        self,
+        rel_type: str,
+        source_label: str,
+        source_id: Any,
+        target_label: str,
+        target_id: Any,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        properties = properties or {}
+        values = self._property_values(
+            properties, self._add_property_columns(rel_type, [properties], _REL_COLUMNS)
+        )
+        assignments = ", ".join(f"rel.`{column}` = $p{i}" for i, column in enumerate(values))
+        self._execute(
+            f"""
+            MATCH (e1:{source_label} {{id: $source_id}}),
+                    (e2:{target_label} {{id: $target_id}})
+            MERGE (e1)-[rel:{rel_type}]->(e2)
+            {f"SET {assignments}" if assignments else ""}
+            """,
+            parameters={
+                "source_id": source_id,
+                "target_id": target_id,
+                **{f"p{i}": value for i, value in enumerate(values.values())},
+            },
+        )
+
+    def _unwind(self, query: str, rows: List[Dict[str, Any]], batch_size: int) -> None:
+        for start in range(0, len(rows), batch_size):
+            self._execute(query, parameters={"rows": rows[start : start + batch_size]})
+
+    def _upsert_chunks(self, chunks: Dict[str, str], batch_size: int) -> None:
+        self._unwind(
             """
+            UNWIND $rows AS r
+            MERGE (c:Chunk {id: r.id})
+                SET c.text = r.text,
+                    c.type = "text_chunk"
+            """,
+            [{"id": chunk_id, "text": text} for chunk_id, text in chunks.items()],
+            batch_size,
+        )
+
+    def _grouped_property_rows(
+        self,
+        table: str,
+        properties: Dict[Any, Dict[str, Any]],
+        reserved: frozenset,
+        key_row: Callable[[Any], Dict[str, Any]],
+    ) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+        """Group `UNWIND` rows by the columns they set, with their property values
+        under `props`.
+
+        Kuzu types each field of the `$rows` parameter from its values, so a column
+        is only set by rows that have a value for it.
+        """
+        columns = self._add_property_columns(table, properties.values(), reserved)
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for key, props in properties.items():
+            values = self._property_values(props, columns)
+            row = key_row(key)
+            if values:
+                row["props"] = values
+            groups.setdefault(tuple(values), []).append(row)
+        return groups
+
+    def _upsert_entities(
+        self, node_label: str, nodes: Dict[str, Dict[str, Any]], batch_size: int
+    ) -> None:
+        groups = self._grouped_property_rows(
+            node_label, nodes, _NODE_COLUMNS, lambda node_id: {"id": node_id}
+        )
+        for columns, rows in groups.items():
+            assignments = "".join(f",\n    e.`{column}` = r.props.`{column}`" for column in columns)
+            self._unwind(
+                f"""
+                UNWIND $rows AS r
+                MERGE (e:{node_label} {{id: r.id}})
+                    SET e.type = "entity"{assignments}
+                """,
+                rows,
+                batch_size,
+            )
+
+    def _upsert_mentions(
+        self, node_label: str, pairs: List[Tuple[str, str]], batch_size: int
+    ) -> None:
+        self._unwind(
+            f"""
+            UNWIND $rows AS r
+            MATCH (c:Chunk {{id: r.src}}),
+                  (e:{node_label} {{id: r.dst}})
+            MERGE (c)-[m:MENTIONS]->(e)
+              SET m.triplet_source_id = r.src
+            """,
+            [{"src": chunk_id, "dst": node_id} for chunk_id, node_id in pairs],
+            batch_size,
+        )
+
+    def _upsert_relationships(
+        self,
+        rel_type: str,
+        source_label: str,
+        target_label: str,
+        pairs: Dict[Tuple[str, str], Dict[str, Any]],
+        batch_size: int,
+    ) -> None:
+        groups = self._grouped_property_rows(
+            rel_type, pairs, _REL_COLUMNS, lambda pair: {"src": pair[0], "dst": pair[1]}
+        )
+        for columns, rows in groups.items():
+            assignments = ", ".join(f"rel.`{column}` = r.props.`{column}`" for column in columns)
+            self._unwind(
+                f"""
+                UNWIND $rows AS r
+                MATCH (e1:{source_label} {{id: r.src}}),
+                        (e2:{target_label} {{id: r.dst}})
+                MERGE (e1)-[rel:{rel_type}]->(e2)
+                {f"SET {assignments}" if assignments else ""}
+                """,
+                rows,
+                batch_size,
+            )
+
+    @staticmethod
+    def _content_hash(document: GraphDocument) -> str:
+        return md5(document.source.page_content.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _ensure_source_id(cls, document: GraphDocument, content_hash: Optional[str] = None) -> str:
+        if not document.source.metadata.get("id"):
+            # Add a unique id to each document chunk via an md5 hash
+            document.source.metadata["id"] = content_hash or cls._content_hash(document)
+        return cast(str, document.source.metadata["id"])
+
+    @staticmethod
+    def _non_null(properties: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: value for name, value in properties.items() if value is not None}
+
+    @classmethod
+    def _collect_graph_batch(
+        cls, graph_documents: List[GraphDocument], include_source: bool
+    ) -> _GraphBatch:
+        """Group and deduplicate the rows of `graph_documents` by target table."""
+        batch = _GraphBatch()
+        for document in graph_documents:
+            chunk_id = None
+            if include_source:
+                chunk_id = cls._ensure_source_id(document)
+                batch.chunks[chunk_id] = document.source.page_content
+            for node in document.nodes:
+                properties = batch.nodes.setdefault(node.type, {}).setdefault(str(node.id), {})
+                properties.update(cls._non_null(node.properties))
+                if chunk_id is not None:
+                    batch.mentions.setdefault(node.type, {})[(chunk_id, str(node.id))] = None
+            for rel in document.relationships:
+                key = (rel.type, rel.source.type, rel.target.type)
+                pairs = batch.relationships.setdefault(key, {})
+                properties = pairs.setdefault((str(rel.source.id), str(rel.target.id)), {})
+                properties.update(cls._non_null(rel.properties))
+        return batch
+
+    def _existing_node_ids(self, node_label: str, node_ids: List[str]) -> set[str]:
+        result = self._execute(
+            f"MATCH (e:{node_label}) WHERE e.id IN $ids RETURN e.id",
+            parameters={"ids": node_ids},
+        )
+        existing = set()
+        while result.has_next():  # type: ignore
+            existing.add(result.get_next()[0])  # type: ignore
+        return existing
+
+    def _existing_rel_pairs(
+        self,
+        rel_type: str,
+        source_label: str,
+        target_label: str,
+        pairs: List[Tuple[str, str]],
+    ) -> set[Tuple[str, str]]:
+        result = self._execute(
+            f"""
+            UNWIND $pairs AS p
+            MATCH (e1:{source_label} {{id: p.src}})-[:{rel_type}]->(e2:{target_label} {{id: p.dst}})
+            RETURN DISTINCT e1.id, e2.id
+            """,
+            parameters={"pairs": [{"src": src, "dst": dst} for src, dst in pairs]},
         )
+        existing = set()
+        while result.has_next():  # type: ignore
+            row = result.get_next()  # type: ignore
+            existing.add((row[0], row[1]))
+        return existing
+
+    def _copy_rows(self, table: str, columns: Dict[str, List[Any]], options: str = "") -> None:
+        """`COPY` rows into `table`, filling the table columns missing from `columns`
+        with nulls."""
+        catalog = self._table_catalog
+        table_columns = catalog.columns.get(table, {})
+        num_rows = len(next(iter(columns.values())))
+        names = ["from", "to"] if table in catalog.rel_tables else []
+        names += list(table_columns) or [name for name in columns if name not in names]
+        staged = {name: columns.get(name, [None] * num_rows) for name in names}
+        query = f"COPY {table} FROM $rows{options}"
+        parameters = {"rows": _stage_rows(staged, table_columns)}
+        self._run_statement(query, lambda: self._active_conn.execute(query, parameters=parameters))
+
+    def _property_columns_data(
+        self,
+        table: str,
+        properties: List[Dict[str, Any]],
+        reserved: frozenset,
+    ) -> Dict[str, List[Any]]:
+        """Return the columns of `properties` for `COPY`, by column name."""
+        columns = self._add_property_columns(table, properties, reserved)
+        rows = [self._property_values(props, columns) for props in properties]
+        return {
+            column: [row.get(column) for row in rows]
+            for column in dict.fromkeys(column for column, _ in columns.values())
+        }
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        with self._ingestion_phase("embeddings", len(texts)):
+            for start in range(0, len(texts), self.embedding_batch_size):
+                vectors.extend(
+                    self.embeddings.embed_documents(  # type: ignore[union-attr]
+                        texts[start : start + self.embedding_batch_size]
+                    )
+                )
+        return vectors
+
+    def _chunk_columns(self) -> set[str]:
+        """Return the columns of the `Chunk` table, read from the live catalog: the
+        schema memo can lag behind after a checkpoint, and a wrong answer here makes
+        Kuzu refuse to `SET` an indexed embedding."""
+        return {name for name, _ in self._table_info("Chunk")}
+
+    def _load_extension(self, name: str) -> None:
+        if name in self._loaded_extensions:
+            return
+        try:
+            self._active_conn.execute(f"LOAD {name}")
+        except RuntimeError:
+            self._active_conn.execute(f"INSTALL {name}")
+            self._active_conn.execute(f"LOAD {name}")
+        self._loaded_extensions.add(name)
+
+    def _has_vector_index(self) -> bool:
+        return any(
+            table == "Chunk" and index == CHUNK_EMBEDDING_INDEX
+            for table, index in self._fetch_all(
+                self._active_conn.execute("CALL SHOW_INDEXES() RETURN table_name, index_name;")
+            )
+        )
+
+    def _write_embedded_chunks(self, chunks: Dict[str, str], batch_size: int) -> None:
+        """Write chunks together with the embeddings of their text.
+
+        Chunks that already exist keep their embedding unless their text changed;
+        those stored before embeddings were enabled are embedded now. Kuzu refuses
+        to `SET` a column covered by a vector index, so once the index exists such
+        chunks are deleted and re-created with their embedding, and their
+        `MENTIONS` edges and `content_hash` restored.
+        """
+        chunk_ids = list(chunks)
+        existing = self._existing_node_ids("Chunk", chunk_ids)
+        new_ids = [chunk_id for chunk_id in chunk_ids if chunk_id not in existing]
+        columns = self._chunk_columns()
+        has_column = "embedding" in columns
+        if has_column and existing:
+            result = self._execute(
+                """
+                UNWIND $rows AS r
+                MATCH (c:Chunk {id: r.id})
+                WHERE c.embedding IS NULL OR c.text <> r.text
+                RETURN c.id
+                """,
+                parameters={
+                    "rows": [{"id": chunk_id, "text": chunks[chunk_id]} for chunk_id in existing]
+                },
+            )
+            missing = [row[0] for row in self._fetch_all(result)]
+        else:
+            missing = list(existing)
+
+        texts = [chunks[chunk_id] for chunk_id in new_ids + missing]
+        vectors = dict(zip(new_ids + missing, self._embed_texts(texts), strict=False))
+        if vectors and not has_column:
+            dimension = len(next(iter(vectors.values())))
+            self._execute_ddl(f"ALTER TABLE Chunk ADD IF NOT EXISTS embedding FLOAT[{dimension}]")
+            self._table_catalog.columns.setdefault("Chunk", {})["embedding"] = f"FLOAT[{dimension}]"
+
+        mentions: Dict[str, List[Tuple[str, str]]] = {}
+        content_hashes: Dict[str, str] = {}
+        if missing and has_column:
+            self._load_extension("vector")
+            if self._has_vector_index():
+                if "content_hash" in columns:
+                    result = self._execute(
+                        """
+                        MATCH (c:Chunk)
+                        WHERE c.id IN $ids AND c.content_hash IS NOT NULL
+                        RETURN c.id, c.content_hash
+                        """,
+                        parameters={"ids": missing},
+                    )
+                    content_hashes = dict(self._fetch_all(result))
+                if "MENTIONS" in self._table_catalog.rel_tables:
+                    result = self._execute(
+                        """
+                        MATCH (c:Chunk)-[:MENTIONS]->(e)
+                        WHERE c.id IN $ids
+                        RETURN label(e), c.id, e.id
+                        """,
+                        parameters={"ids": missing},
+                    )
+                    for node_label, chunk_id, node_id in self._fetch_all(result):
+                        mentions.setdefault(node_label, []).append((chunk_id, node_id))
+                self._execute(
+                    "MATCH (c:Chunk) WHERE c.id IN $ids DETACH DELETE c",
+                    parameters={"ids": missing},
+                )
+                existing.difference_update(missing)
+                new_ids += missing
+                missing = []
+
+        if new_ids:
+            self._unwind(
+                """
+                UNWIND $rows AS r
+                CREATE (:Chunk {id: r.id, text: r.text, type: "text_chunk",
+                                embedding: r.embedding})
+                """,
+                [
+                    {"id": chunk_id, "text": chunks[chunk_id], "embedding": vectors[chunk_id]}
+                    for chunk_id in new_ids
+                ],
+                batch_size,
+            )
+        if existing:
+            self._upsert_chunks({chunk_id: chunks[chunk_id] for chunk_id in existing}, batch_size)
+        if missing:
+            self._unwind(
+                """
+                UNWIND $rows AS r
+                MATCH (c:Chunk {id: r.id})
+                SET c.embedding = r.embedding
+                """,
+                [{"id": chunk_id, "embedding": vectors[chunk_id]} for chunk_id in missing],
+                batch_size,
+            )
+        if content_hashes:
+            self._unwind(
+                """
+                UNWIND $rows AS r
+                MATCH (c:Chunk {id: r.id})
+                SET c.content_hash = r.content_hash
+                """,
+                [
+                    {"id": chunk_id, "content_hash": content_hash}
+                    for chunk_id, content_hash in content_hashes.items()
+                ],
+                batch_size,
+            )
+        for node_label, pairs in mentions.items():
+            self._upsert_mentions(node_label, pairs, batch_size)
+
+    def create_vector_index(self, metric: str = "cosine") -> None:
+        """Create the vector index over `Chunk.embedding`, if it does not exist yet.
+
+        `similarity_search` creates it on first use; call this after a large initial
+        ingest to build it up front. Chunks added later are indexed as they are
+        created.
+
+        Args:
+            metric: The distance metric: "cosine", "l2", "l2sq" or "dotproduct".
+        """
+        with self._write_lock, self._borrow_connection():
+            self._load_extension("vector")
+            if not self._has_vector_index():
+                self._execute_ddl(
+                    f"CALL CREATE_VECTOR_INDEX('Chunk', '{CHUNK_EMBEDDING_INDEX}', "
+                    f"'embedding', metric := '{metric}')"
+                )
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """Return the `k` chunks most similar to `query`, using the vector index.
+
+        Each `Document` holds the chunk text, and its metadata the chunk `id`, the
+        `distance` to the query, and the entities the chunk `mentions` (as
+        `{"type": label, "id": id}` dicts).
+
+        Requires the graph to be created with `embeddings`.
+        """
+        if self.embeddings is None:
+            raise ValueError(
+                "similarity_search requires the KuzuGraph to be created with `embeddings`."
+            )
+        vector = self.embeddings.embed_query(query)
+        with self._borrow_connection():
+            self._load_extension("vector")
+            if not self._has_vector_index():
+                self.create_vector_index()
+            mentions = (
+                """
+                OPTIONAL MATCH (c)-[:MENTIONS]->(e)
+                WITH c, distance,
+                     collect(CASE WHEN e IS NULL THEN NULL
+                                  ELSE {type: label(e), id: e.id} END) AS mentions
+                """
+                if "MENTIONS" in self._table_catalog.rel_tables
+                else "WITH c, distance, NULL AS mentions"
+            )
+            result = self._execute(
+                f"""
+                CALL QUERY_VECTOR_INDEX('Chunk', '{CHUNK_EMBEDDING_INDEX}', $embedding, $k)
+                WITH node AS c, distance
+                {mentions}
+                RETURN c.id, c.text, distance, mentions
+                ORDER BY distance
+                """,
+                parameters={"embedding": vector, "k": k},
+            )
+            return [
+                Document(
+                    page_content=text,
+                    metadata={"id": chunk_id, "distance": distance, "mentions": mentions or []},
+                )
+                for chunk_id, text, distance, mentions in self._fetch_all(result)
+            ]
+
+    def _fts_properties(self) -> Dict[str, str]:
+        """Return the property to index of every node table: `text` for `Chunk`,
+        `id` for entity tables with a string id.
+
+        The tables are read from the live catalog rather than the schema memo, since
+        this runs right after ingestion, which can checkpoint.
+        """
+        properties = {}
+        for label, table_type in self._show_tables():
+            if table_type != "NODE":
+                continue
+            for name, ptype in self._table_info(label):
+                if (label == "Chunk" and name == "text") or (
+                    label != "Chunk" and name == "id" and ptype == "STRING"
+                ):
+                    properties[label] = name
+        return properties
+
+    def _fts_indexed_tables(self) -> set[str]:
+        return {
+            table
+            for table, index in self._fetch_all(
+                self._active_conn.execute("CALL SHOW_INDEXES() RETURN table_name, index_name;")
+            )
+            if index == FTS_INDEX
+        }
+
+    def _create_fts_indexes(self, node_labels: Optional[List[str]]) -> None:
+        properties = self._fts_properties()
+        labels = list(properties) if node_labels is None else node_labels
+        self._load_extension("fts")
+        indexed = self._fts_indexed_tables()
+        for label in labels:
+            if label in properties and label not in indexed:
+                self._execute_ddl(
+                    f"CALL CREATE_FTS_INDEX('{label}', '{FTS_INDEX}', ['{properties[label]}'])"
+                )
+
+    def create_fts_indexes(self, node_labels: Optional[List[str]] = None) -> None:
+        """Create the missing full-text search indexes over `Chunk.text` and the `id`
+        of entity tables.
+
+        Kuzu keeps the indexes up to date as nodes are added, updated or deleted, but
+        tables created later need their own index: call this again, or create the
+        graph with `full_text_search=True`.
+
+        Args:
+            node_labels: The node tables to index. Defaults to all of them.
+        """
+        with self._write_lock, self._borrow_connection():
+            self._create_fts_indexes(node_labels)
+
+    def keyword_search(
+        self,
+        query: str,
+        k: int = 4,
+        node_labels: Optional[List[str]] = None,
+        create_missing_indexes: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Return the `k` nodes that best match the keywords of `query`.
+
+        Chunks are matched on their text and entities on their `id`, using Kuzu's
+        full-text search (BM25 over stemmed words, without stop words).
+
+        Args:
+            query: The keywords to look for.
+            k: The number of nodes to return.
+            node_labels: The node tables to search. Defaults to all of them.
+            create_missing_indexes: If True, missing indexes are created first;
+                otherwise tables without an index are not searched, and the
+                database is left unchanged.
+
+        Returns:
+            `{"label", "id", "score"}` dicts, best match first, with the chunk `text`
+            for chunks.
+        """
+        with self._borrow_connection():
+            self._load_extension("fts")
+            properties = self._fts_properties()
+            labels = [
+                label
+                for label in (properties if node_labels is None else node_labels)
+                if label in properties
+            ]
+            indexed = self._fts_indexed_tables()
+            if create_missing_indexes and set(labels) - indexed:
+                self.create_fts_indexes(labels)
+            elif not create_missing_indexes:
+                labels = [label for label in labels if label in indexed]
+            matches = []
+            for label in labels:
+                result = self._execute(
+                    f"""
+                    CALL QUERY_FTS_INDEX('{label}', '{FTS_INDEX}', $query, top := $k)
+                    RETURN node.id, score{", node.text" if label == "Chunk" else ""}
+                    """,
+                    parameters={"query": query, "k": k},
+                )
+                for node_id, score, *text in self._fetch_all(result):
+                    match = {"label": label, "id": node_id, "score": score}
+                    if text:
+                        match["text"] = text[0]
+                    matches.append(match)
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return matches[:k]
+
+    def _create_batch_tables(self, batch: _GraphBatch) -> None:
+        node_labels = list(batch.nodes)
+        if batch.chunks:
+            self._create_chunk_node_table()
+        for node_label in node_labels:
+            self._create_entity_node_table(node_label)
+        if batch.chunks and node_labels:
+            self._create_mentions_relationship_table(node_labels)
+        for rel_type, source_label, target_label in batch.relationships:
+            self._create_entity_relationship_table(rel_type, source_label, target_label)
+
+    def _batched_upsert(self, batch: _GraphBatch, batch_size: int) -> None:
+        """Upsert a normalized batch with one `UNWIND ... MERGE` statement per
+        table group and `batch_size` rows."""
+        self._create_batch_tables(batch)
+        with self._ingestion_phase("chunks", len(batch.chunks)):
+            if batch.chunks and self.embeddings is not None:
+                self._write_embedded_chunks(batch.chunks, batch_size)
+            elif batch.chunks:
+                self._upsert_chunks(batch.chunks, batch_size)
+        with self._ingestion_phase("nodes", sum(map(len, batch.nodes.values()))):
+            for node_label, nodes in batch.nodes.items():
+                self._upsert_entities(node_label, nodes, batch_size)
+        with self._ingestion_phase("mentions", sum(map(len, batch.mentions.values()))):
+            for node_label, mention_pairs in batch.mentions.items():
+                self._upsert_mentions(node_label, list(mention_pairs), batch_size)
+        with self._ingestion_phase("relationships", sum(map(len, batch.relationships.values()))):
+            for (rel_type, source_label, target_label), rel_pairs in batch.relationships.items():
+                self._upsert_relationships(
+                    rel_type, source_label, target_label, rel_pairs, batch_size
+                )
+
+    def _bulk_load(self, batch: _GraphBatch, batch_size: int) -> None:
+        """Load a normalized batch with one `COPY FROM` per table group.
+
+        Rows that already exist in the database (and relationships whose endpoints
+        are not part of the batch) fall back to batched `UNWIND ... MERGE` statements.
+        """
+        self._create_batch_tables(batch)
+
+        with self._ingestion_phase("chunks", len(batch.chunks)):
+            if batch.chunks and self.embeddings is not None:
+                self._write_embedded_chunks(batch.chunks, batch_size)
+            elif batch.chunks:
+                chunk_ids = list(batch.chunks)
+                existing = self._existing_node_ids("Chunk", chunk_ids)
+                new_ids = [chunk_id for chunk_id in chunk_ids if chunk_id not in existing]
+                if new_ids:
+                    self._copy_rows(
+                        "Chunk",
+                        {
+                            "id": new_ids,
+                            "text": [batch.chunks[chunk_id] for chunk_id in new_ids],
+                            "type": ["text_chunk"] * len(new_ids),
+                        },
+                    )
+                if existing:
+                    self._upsert_chunks(
+                        {chunk_id: batch.chunks[chunk_id] for chunk_id in existing}, batch_size
+                    )
+
+        with self._ingestion_phase("nodes", sum(map(len, batch.nodes.values()))):
+            for node_label, nodes in batch.nodes.items():
+                node_ids = list(nodes)
+                existing = self._existing_node_ids(node_label, node_ids)
+                new_ids = [node_id for node_id in node_ids if node_id not in existing]
+                if new_ids:
+                    self._copy_rows(
+                        node_label,
+                        {
+                            "id": new_ids,
+                            "type": ["entity"] * len(new_ids),
+                            **self._property_columns_data(
+                                node_label, [nodes[node_id] for node_id in new_ids], _NODE_COLUMNS
+                            ),
+                        },
+                    )
+                if existing:
+                    self._upsert_entities(
+                        node_label, {node_id: nodes[node_id] for node_id in existing}, batch_size
+                    )
+
+        with self._ingestion_phase("mentions", sum(map(len, batch.mentions.values()))):
+            for node_label, mention_pairs in batch.mentions.items():
+                pairs = list(mention_pairs)
+                existing_pairs = self._existing_rel_pairs("MENTIONS", "Chunk", node_label, pairs)
+                new_pairs = [pair for pair in pairs if pair not in existing_pairs]
+                if new_pairs:
+                    self._copy_rows(
+                        "MENTIONS",
+                        {
+                            "from": [chunk_id for chunk_id, _ in new_pairs],
+                            "to": [node_id for _, node_id in new_pairs],
+                            "label": [None] * len(new_pairs),
+                            "triplet_source_id": [chunk_id for chunk_id, _ in new_pairs],
+                        },
+                        options=f" (from='Chunk', to='{node_label}')",
+                    )
+                if existing_pairs:
+                    self._upsert_mentions(node_label, list(existing_pairs), batch_size)
+
+        with self._ingestion_phase("relationships", sum(map(len, batch.relationships.values()))):
+            for (rel_type, source_label, target_label), rel_pairs in batch.relationships.items():
+                source_ids = batch.nodes.get(source_label, {})
+                target_ids = batch.nodes.get(target_label, {})
+                pairs = list(rel_pairs)
+                existing_pairs = self._existing_rel_pairs(
+                    rel_type, source_label, target_label, pairs
+                )
+                new_pairs, merge_pairs = [], {}
+                for pair in pairs:
+                    if (
+                        pair not in existing_pairs
+                        and pair[0] in source_ids
+                        and pair[1] in target_ids
+                    ):
+                        new_pairs.append(pair)
+                    else:
+                        # Edge already exists, or an endpoint may be missing: MERGE only
+                        # creates it if both endpoints can be matched.
+                        merge_pairs[pair] = rel_pairs[pair]
+                if merge_pairs:
+                    self._upsert_relationships(
+                        rel_type, source_label, target_label, merge_pairs, batch_size
+                    )
+                if new_pairs:
+                    self._copy_rows(
+                        rel_type,
+                        {
+                            "from": [source_id for source_id, _ in new_pairs],
+                            "to": [target_id for _, target_id in new_pairs],
+                            **self._property_columns_data(
+                                rel_type, [rel_pairs[pair] for pair in new_pairs], _REL_COLUMNS
+                            ),
+                        },
+                        options=f" (from='{source_label}', to='{target_label}')",
+                    )
 
     def add_graph_documents(
         self,
         graph_documents: List[GraphDocument],
         include_source: bool = False,
+        bulk_load: bool = False,
+        batch_size: Optional[int] = None,
+        commit_every: Optional[int] = None,
+        defer_checkpoint: bool = False,
     ) -> None:
         """
         Adds a list of `GraphDocument` objects that represent nodes and relationships
@@ -188,91 +1946,639 @@ class KuzuGraph(GraphStore):
             documents based on the `id` property from the source document metadata
             if available; otherwise it calculates the MD5 hash of `page_content`
             for merging process. Defaults to False.
+
+          - bulk_load (bool): If True, groups nodes by label and relationships by
+            (type, source label, target label), deduplicates them in memory and loads
+            each group with a single `COPY FROM` over an in-memory Arrow table
+            (or pandas DataFrame). Only rows that already exist in the database go
+            through `MERGE`. Requires `pyarrow` or `pandas`. Defaults to False.
+
+          - batch_size (Optional[int]): If set, upserts nodes, relationships and
+            `MENTIONS` edges with one parameterized `UNWIND $rows AS r MERGE ...`
+            statement per label or relationship type and per `batch_size` rows,
+            instead of one statement per row. Also used for the `MERGE` fallback
+            of `bulk_load` (defaults to `DEFAULT_BATCH_SIZE` there).
+
+          - commit_every (Optional[int]): If set, ingests the documents in explicit
+            transactions of `commit_every` documents (`BEGIN TRANSACTION` ...
+            `COMMIT`) instead of one auto-commit transaction per statement. If a
+            statement fails, the current transaction is rolled back and the error is
+            raised: the documents of earlier transactions stay committed, the others
+            are not written at all. Pass `len(graph_documents)` for an
+            all-or-nothing ingest.
+
+          - defer_checkpoint (bool): If True, Kuzu's automatic checkpointing is paused
+            during the call (the setting is database-wide) and the WAL is
+            checkpointed once at the end, instead of whenever it grows past the
+            checkpoint threshold. Defaults to False.
+
+        `Node.properties` and `Relationship.properties` are stored as typed columns of
+        their table. The type of a new column is inferred from all the values of the
+        property in the call (INT64, DOUBLE, BOOL, STRING, DATE, TIMESTAMP or lists of
+        these; integers mixed with floats become DOUBLE, other mixes and dicts are
+        stored as STRING) and the column is added with `ALTER TABLE ... ADD`. Values
+        for existing columns are converted to the column type, or raise a
+        `ValueError`. Null values leave stored values unchanged, and node properties
+        named `id` or `type` are ignored.
+
+        The whole call runs on a single (pooled) connection and holds the graph's
+        write lock, since Kuzu allows only one write transaction at a time.
         """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("`batch_size` must be a positive integer.")
+        if commit_every is not None and commit_every < 1:
+            raise ValueError("`commit_every` must be a positive integer.")
+        try:
+            with self._write_lock, self._borrow_connection():
+                self._write_documents(
+                    graph_documents,
+                    lambda documents: self._add_graph_documents(
+                        documents, include_source, bulk_load, batch_size
+                    ),
+                    commit_every,
+                    defer_checkpoint,
+                )
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.invalidate()
+
+    def _write_documents(
+        self,
+        graph_documents: List[GraphDocument],
+        write: Callable[[List[GraphDocument]], None],
+        commit_every: Optional[int],
+        defer_checkpoint: bool,
+    ) -> None:
+        """Call `write` on all the documents, or on every `commit_every` documents in
+        a transaction, then maintain the full-text search indexes."""
+
+        def write_transaction(documents: List[GraphDocument]) -> None:
+            with self._transaction():
+                write(documents)
+
+        with self._checkpoint_deferred() if defer_checkpoint else nullcontext():
+            if commit_every is None:
+                self._retry_on_stale_catalog(write, graph_documents)
+            else:
+                for start in range(0, len(graph_documents), commit_every):
+                    self._retry_on_stale_catalog(
+                        write_transaction, graph_documents[start : start + commit_every]
+                    )
+        if self.full_text_search:
+            self._create_fts_indexes(None)
+
+    def add_graph_documents_incremental(
+        self,
+        graph_documents: List[GraphDocument],
+        bulk_load: bool = False,
+        batch_size: Optional[int] = None,
+        commit_every: Optional[int] = None,
+        defer_checkpoint: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> IngestionSummary:
+        """Add graph documents and their source chunks, skipping the documents whose
+        source was already ingested unchanged.
+
+        The `page_content` of every source is hashed (in a thread pool of
+        `max_workers` threads) and compared, in one query, with the hash stored in
+        the `content_hash` property of its `Chunk`, which serves as the ingestion
+        manifest. Chunks are identified like with `include_source=True`: by the
+        `id` in the source metadata, else by the hash of their content.
+
+        Unchanged documents are not written at all: neither their chunk and
+        `MENTIONS` edges, nor their nodes and relationships. For updated documents,
+        the `MENTIONS` edges of the stored chunk are replaced; nodes and
+        relationships extracted from the previous version are kept, since other
+        chunks may mention them.
+
+        Args:
+            graph_documents: The graph documents to add.
+            bulk_load: See `add_graph_documents`.
+            batch_size: See `add_graph_documents`.
+            commit_every: See `add_graph_documents`.
+            defer_checkpoint: See `add_graph_documents`.
+            max_workers: Number of threads hashing the sources.
+
+        Returns:
+            The chunk ids of the added, updated and skipped documents.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("`batch_size` must be a positive integer.")
+        if commit_every is not None and commit_every < 1:
+            raise ValueError("`commit_every` must be a positive integer.")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            content_hashes = list(executor.map(self._content_hash, graph_documents))
+        chunk_hashes = {
+            self._ensure_source_id(document, content_hash): content_hash
+            for document, content_hash in zip(graph_documents, content_hashes, strict=True)
+        }
+
+        try:
+            with self._write_lock, self._borrow_connection():
+
+                def stored_hashes() -> Dict[str, str]:
+                    self._create_chunk_node_table()
+                    self._add_property_columns("Chunk", [{"content_hash": ""}], frozenset())
+                    result = self._execute(
+                        "MATCH (c:Chunk) WHERE c.id IN $ids RETURN c.id, c.content_hash",
+                        parameters={"ids": list(chunk_hashes)},
+                    )
+                    return dict(self._fetch_all(result))
+
+                stored = self._retry_on_stale_catalog(stored_hashes)
+                summary = IngestionSummary([], [], [])
+                for chunk_id, content_hash in chunk_hashes.items():
+                    if chunk_id not in stored:
+                        summary.added.append(chunk_id)
+                    elif stored[chunk_id] == content_hash:
+                        summary.skipped.append(chunk_id)
+                    else:
+                        summary.updated.append(chunk_id)
+                skipped = set(summary.skipped)
+                updated = set(summary.updated)
+
+                def write(documents: List[GraphDocument]) -> None:
+                    chunk_ids = {document.source.metadata["id"] for document in documents}
+                    stale = list(chunk_ids & updated)
+                    if stale and "MENTIONS" in self._table_catalog.rel_tables:
+                        self._execute(
+                            "MATCH (c:Chunk)-[m:MENTIONS]->() WHERE c.id IN $ids DELETE m",
+                            parameters={"ids": stale},
+                        )
+                    self._add_graph_documents(documents, True, bulk_load, batch_size)
+                    self._unwind(
+                        """
+                        UNWIND $rows AS r
+                        MATCH (c:Chunk {id: r.id})
+                        SET c.content_hash = r.content_hash
+                        """,
+                        [
+                            {"id": chunk_id, "content_hash": chunk_hashes[chunk_id]}
+                            for chunk_id in chunk_ids
+                        ],
+                        batch_size or DEFAULT_BATCH_SIZE,
+                    )
+
+                changed = [
+                    document
+                    for document in graph_documents
+                    if document.source.metadata["id"] not in skipped
+                ]
+                if changed:
+                    self._write_documents(changed, write, commit_every, defer_checkpoint)
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.invalidate()
+        return summary
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run the enclosed statements in one explicit transaction on the active
+        connection, rolling it back if they raise."""
+        conn = self._active_conn
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            yield
+        except BaseException:
+            try:
+                conn.execute("ROLLBACK")
+            except RuntimeError:
+                # Kuzu already rolled back the transaction of the failed statement
+                pass
+            # Tables created in the transaction are gone again
+            self._forget_catalog()
+            raise
+        conn.execute("COMMIT")
+
+    def _forget_catalog(self) -> None:
+        """Drop the DDL cache, the prepared statements and the schema memo."""
+        self._catalog = None
+        self._statement_cache().clear()
+        self.invalidate_schema()
+
+    def _retry_on_stale_catalog(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Call `func`, and once more with a fresh DDL cache if Kuzu reports a table
+        or column that the cache believed to exist, i.e. one dropped outside the
+        graph since it was cached."""
+        try:
+            return func(*args)
+        except RuntimeError as exc:
+            if not _STALE_CATALOG_PATTERN.search(str(exc)):
+                raise
+            self._forget_catalog()
+            return func(*args)
+
+    def _pause_auto_checkpoint(self) -> str:
+        """Turn off automatic checkpointing and return the previous setting."""
+        result = self._active_conn.execute("CALL current_setting('auto_checkpoint') RETURN *;")
+        previous: str = self._fetch_all(result)[0][0].lower()
+        self._active_conn.execute("CALL auto_checkpoint=false;")
+        return previous
+
+    def _resume_auto_checkpoint(self, previous: str, checkpoint: bool) -> None:
+        self._active_conn.execute(f"CALL auto_checkpoint={previous};")
+        if checkpoint:
+            self._active_conn.execute("CHECKPOINT;")
+            self._introspected = None
+
+    @contextmanager
+    def _checkpoint_deferred(self) -> Iterator[None]:
+        """Pause automatic checkpointing, and checkpoint once when done."""
+        previous = self._pause_auto_checkpoint()
+        try:
+            yield
+        except BaseException:
+            self._resume_auto_checkpoint(previous, checkpoint=False)
+            raise
+        self._resume_auto_checkpoint(previous, checkpoint=True)
+
+    def _write_stream_batch(self, batch: _GraphBatch, bulk_load: bool, batch_size: int) -> None:
+        """Write one normalized micro-batch of a stream in its own transaction."""
+        try:
+            with self._write_lock, self._borrow_connection():
+
+                def write() -> None:
+                    with self._transaction():
+                        if bulk_load:
+                            self._bulk_load(batch, batch_size)
+                        else:
+                            self._batched_upsert(batch, batch_size)
+
+                self._retry_on_stale_catalog(write)
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.invalidate()
+
+    @staticmethod
+    def _validate_stream_args(micro_batch_size: int, max_pending_batches: int) -> None:
+        if micro_batch_size < 1:
+            raise ValueError("`micro_batch_size` must be a positive integer.")
+        if max_pending_batches < 1:
+            raise ValueError("`max_pending_batches` must be a positive integer.")
+
+    def add_graph_document_stream(
+        self,
+        graph_documents: Iterable[GraphDocument],
+        include_source: bool = False,
+        bulk_load: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        micro_batch_size: int = 100,
+        max_pending_batches: int = 2,
+        defer_checkpoint: bool = False,
+    ) -> int:
+        """Add graph documents from an iterable (e.g. a generator extracting them with
+        an LLM) without materializing it.
+
+        Documents are taken `micro_batch_size` at a time and normalized in a
+        background thread while the previous micro-batch is written. At most
+        `max_pending_batches` normalized micro-batches wait to be written; the
+        iterable is not advanced further until one of them is, so memory use does
+        not grow with the size of the input.
+
+        Each micro-batch is written like `add_graph_documents(batch_size=...)` (or
+        with `bulk_load`) in its own transaction: tables, columns and relationship
+        pairs are created as micro-batches introduce them, and a failing micro-batch
+        is rolled back while earlier ones stay committed. Property column types are
+        set by the first micro-batch that has the property.
+
+        Args:
+            graph_documents: The graph documents to add.
+            include_source: See `add_graph_documents`.
+            bulk_load: See `add_graph_documents`.
+            batch_size: Rows per `UNWIND` statement.
+            micro_batch_size: Documents per micro-batch and transaction.
+            max_pending_batches: Maximum number of normalized micro-batches waiting
+                to be written.
+            defer_checkpoint: See `add_graph_documents`.
+
+        Returns:
+            The number of documents added.
+        """
+        self._validate_stream_args(micro_batch_size, max_pending_batches)
+        pending: queue.Queue = queue.Queue(maxsize=max_pending_batches)
+        stop = threading.Event()
+
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def normalize() -> None:
+            try:
+                for documents in _micro_batches(graph_documents, micro_batch_size):
+                    batch = self._collect_graph_batch(documents, include_source)
+                    if not put((len(documents), batch)):
+                        return
+            except BaseException as e:
+                put(e)
+            else:
+                put(None)
+
+        normalizer = threading.Thread(target=normalize, name="kuzu-stream-normalizer", daemon=True)
+        num_documents = 0
+        with self._borrow_connection():
+            normalizer.start()
+            try:
+                with self._checkpoint_deferred() if defer_checkpoint else nullcontext():
+                    while (item := pending.get()) is not None:
+                        if isinstance(item, BaseException):
+                            raise item
+                        self._write_stream_batch(item[1], bulk_load, batch_size)
+                        num_documents += item[0]
+                if self.full_text_search:
+                    self.create_fts_indexes()
+            finally:
+                stop.set()
+                normalizer.join()
+        return num_documents
+
+    def _add_graph_documents(
+        self,
+        graph_documents: List[GraphDocument],
+        include_source: bool,
+        bulk_load: bool,
+        batch_size: Optional[int],
+    ) -> None:
+        if bulk_load:
+            self._bulk_load(
+                self._collect_graph_batch(graph_documents, include_source),
+                batch_size or DEFAULT_BATCH_SIZE,
+            )
+            return
+        if batch_size is not None:
+            self._batched_upsert(
+                self._collect_graph_batch(graph_documents, include_source), batch_size
+            )
+            return
+
         # Get unique node labels in the graph documents
         node_labels = list({node.type for document in graph_documents for node in document.nodes})
 
+        # Infer the types of property columns across all documents
+        node_properties: Dict[str, List[Dict[str, Any]]] = {}
+        rel_properties: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        for document in graph_documents:
+            for node in document.nodes:
+                node_properties.setdefault(node.type, []).append(self._non_null(node.properties))
+            for rel in document.relationships:
+                key = (rel.type, rel.source.type, rel.target.type)
+                rel_properties.setdefault(key, []).append(self._non_null(rel.properties))
+        for node_label, properties in node_properties.items():
+            self._create_entity_node_table(node_label)
+            self._add_property_columns(node_label, properties, _NODE_COLUMNS)
+        for (rel_type, source_label, target_label), properties in rel_properties.items():
+            if any(properties):
+                self._create_entity_relationship_table(rel_type, source_label, target_label)
+                self._add_property_columns(rel_type, properties, _REL_COLUMNS)
+
         for document in graph_documents:
             # Add chunk nodes and create source document relationships if include_source
             # is True
             if include_source:
                 self._create_chunk_node_table()
-                if not document.source.metadata.get("id"):
-                    # Add a unique id to each document chunk via an md5 hash
-                    document.source.metadata["id"] = md5(
-                        document.source.page_content.encode("utf-8")
-                    ).hexdigest()
-
-                self.conn.execute(
-                    f"""
-                    MERGE (c:Chunk {{id: $id}}) 
-                        SET c.text = $text,
-                            c.type = "text_chunk"
-                    """,  # noqa: F541
-                    parameters={
-                        "id": document.source.metadata["id"],
-                        "text": document.source.page_content,
-                    },
-                )
+                chunk_id = self._ensure_source_id(document)
+                with self._ingestion_phase("chunks", 1):
+                    if self.embeddings is not None:
+                        self._write_embedded_chunks(
+                            {chunk_id: document.source.page_content}, DEFAULT_BATCH_SIZE
+                        )
+                    else:
+                        self._merge_chunk(chunk_id, document.source.page_content)
 
             for node_label in node_labels:
                 self._create_entity_node_table(node_label)
+            if include_source and document.nodes:
+                # If include_source is True, we need to create a relationship table
+                # between the chunk nodes and the entity nodes
+                self._create_mentions_relationship_table(node_labels)
 
             # Add entity nodes from data
-            for node in document.nodes:
-                self.conn.execute(
-                    f"""
-                    MERGE (e:{node.type} {{id: $id}})
-                        SET e.type = "entity"
-                    """,
-                    parameters={"id": node.id},
-                )
-                if include_source:
-                    # If include_source is True, we need to create a relationship table
-                    # between the chunk nodes and the entity nodes
-                    self._create_chunk_node_table()
-                    ddl = "CREATE REL TABLE IF NOT EXISTS MENTIONS ("
-                    table_names = []
-                    for node_label in node_labels:
-                        table_names.append(f"FROM Chunk TO {node_label}")
-                    table_names = list(set(table_names))
-                    ddl += ", ".join(table_names)
-                    # Add common properties for all the tables here
-                    ddl += ", label STRING, triplet_source_id STRING)"
-                    if ddl:
-                        self.conn.execute(ddl)
-
-                    # Only allow relationships that exist in the schema
-                    if node.type in node_labels:
-                        self.conn.execute(
-                            f"""
-                            MATCH (c:Chunk {{id: $id}}),
-                                  (e:{node.type} {{id: $node_id}})
-                            MERGE (c)-[m:MENTIONS]->(e)
-                          SET m.triplet_source_id = $id
-                            """,
-                            parameters={
-                                "id": document.source.metadata["id"],
-                                "node_id": node.id,
-                            },
-                        )
+            with self._ingestion_phase("nodes", len(document.nodes)):
+                for node in document.nodes:
+                    self._merge_entity(node.type, node.id, self._non_null(node.properties))
+            if include_source:
+                with self._ingestion_phase("mentions", len(document.nodes)):
+                    for node in document.nodes:
+                        # Only allow relationships that exist in the schema
+                        if node.type in node_labels:
+                            self._merge_mention(document.source.metadata["id"], node.type, node.id)
 
             # Add entity relationships
             for rel in document.relationships:
-                self._create_entity_relationship_table(rel)
-                # Create relationship
-                source_label = rel.source.type
-                source_id = rel.source.id
-                target_label = rel.target.type
-                target_id = rel.target.id
-                self.conn.execute(
-                    f"""
-                    MATCH (e1:{source_label} {{id: $source_id}}),
-                            (e2:{target_label} {{id: $target_id}})
-                    MERGE (e1)-[:{rel.type}]->(e2)
-                    """,
-                    parameters={
-                        "source_id": source_id,
-                        "target_id": target_id,
-                    },
-                )
+                self._create_entity_relationship_table(rel.type, rel.source.type, rel.target.type)
+            with self._ingestion_phase("relationships", len(document.relationships)):
+                for rel in document.relationships:
+                    self._merge_relationship(
+                        rel.type,
+                        rel.source.type,
+                        rel.source.id,
+                        rel.target.type,
+                        rel.target.id,
+                        self._non_null(rel.properties),
+                    )
+
+    def _async_resources(self) -> Tuple[ThreadPoolExecutor, KuzuConnectionPool]:
+        if self._async_executor is None or self._async_pool is None:
+            with self._async_lock:
+                if self._async_executor is None or self._async_pool is None:
+                    self._async_pool = KuzuConnectionPool(
+                        self.db, size=self.max_concurrent_queries, timeout=None
+                    )
+                    self._async_executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrent_queries
+                    )
+        return self._async_executor, self._async_pool
+
+    async def _arun(self, func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        """Run a synchronous graph method in the async thread pool, without blocking
+        the event loop.
+
+        The job checks out a connection of its own and returns it only when it
+        completes, so that concurrent jobs never share a connection, its statement
+        cache or its open transaction. There are as many threads as connections, so
+        checking out never waits. If the caller is cancelled, the running statement
+        is interrupted, and the connection is returned once the job has stopped.
+
+        `kuzu.AsyncConnection` is not used: it runs single statements, while the
+        async methods run whole graph operations (schema introspection, ingestion
+        transactions) that must keep one connection from start to end. Its
+        `acquire_connection` hands out the least busy connection even if another job
+        is using it, so two jobs could share a transaction.
+        """
+        executor, pool = self._async_resources()
+        lock = threading.Lock()
+        running: List[Any] = []
+        cancelled = False
+
+        def run() -> _T:
+            conn = pool.acquire()
+            try:
+                with lock:
+                    if cancelled:
+                        raise asyncio.CancelledError()
+                    running.append(conn)
+                with self._use_connection(conn):
+                    return func(*args, **kwargs)
+            finally:
+                pool.release(conn)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, run)
+        except asyncio.CancelledError:
+            with lock:
+                cancelled = True
+                for conn in running:
+                    conn.interrupt()
+            raise
+
+    async def aquery(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        *,
+        result_format: ResultFormat = "dicts",
+        arrow_chunk_size: Optional[int] = None,
+    ) -> Any:
+        """Asynchronously query Kuzu database. See `query`."""
+        return await self._arun(
+            self.query,
+            query,
+            params,
+            result_format=result_format,
+            arrow_chunk_size=arrow_chunk_size,
+        )
+
+    async def avalidate_query(self, query: str) -> Optional[str]:
+        """Asynchronously check a query without running it. See `validate_query`."""
+        return await self._arun(self.validate_query, query)
+
+    async def arefresh_schema(self) -> None:
+        """Asynchronously refresh the graph schema information."""
+        await self._arun(self.refresh_schema)
+
+    async def arefresh_schema_if_stale(
+        self, max_age: Optional[float] = None, check_catalog: bool = False
+    ) -> bool:
+        """Asynchronously refresh the schema if it may be out of date.
+        See `refresh_schema_if_stale`."""
+        return await self._arun(
+            self.refresh_schema_if_stale, max_age=max_age, check_catalog=check_catalog
+        )
+
+    async def akeyword_search(
+        self,
+        query: str,
+        k: int = 4,
+        node_labels: Optional[List[str]] = None,
+        create_missing_indexes: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Asynchronously search nodes by keywords. See `keyword_search`."""
+        return await self._arun(
+            self.keyword_search,
+            query,
+            k=k,
+            node_labels=node_labels,
+            create_missing_indexes=create_missing_indexes,
+        )
+
+    async def aadd_graph_documents(
+        self,
+        graph_documents: List[GraphDocument],
+        include_source: bool = False,
+        bulk_load: bool = False,
+        batch_size: Optional[int] = None,
+        commit_every: Optional[int] = None,
+        defer_checkpoint: bool = False,
+    ) -> None:
+        """Asynchronously add graph documents. See `add_graph_documents`.
+
+        Kuzu allows a single write transaction at a time, so concurrent calls do not
+        write in parallel, but they no longer block the event loop.
+        """
+        await self._arun(
+            self.add_graph_documents,
+            graph_documents,
+            include_source=include_source,
+            bulk_load=bulk_load,
+            batch_size=batch_size,
+            commit_every=commit_every,
+            defer_checkpoint=defer_checkpoint,
+        )
+
+    async def aadd_graph_documents_incremental(
+        self,
+        graph_documents: List[GraphDocument],
+        bulk_load: bool = False,
+        batch_size: Optional[int] = None,
+        commit_every: Optional[int] = None,
+        defer_checkpoint: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> IngestionSummary:
+        """Asynchronously add graph documents, skipping unchanged ones.
+        See `add_graph_documents_incremental`."""
+        return await self._arun(
+            self.add_graph_documents_incremental,
+            graph_documents,
+            bulk_load=bulk_load,
+            batch_size=batch_size,
+            commit_every=commit_every,
+            defer_checkpoint=defer_checkpoint,
+            max_workers=max_workers,
+        )
+
+    async def aadd_graph_document_stream(
+        self,
+        graph_documents: Union[Iterable[GraphDocument], AsyncIterable[GraphDocument]],
+        include_source: bool = False,
+        bulk_load: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        micro_batch_size: int = 100,
+        max_pending_batches: int = 2,
+        defer_checkpoint: bool = False,
+    ) -> int:
+        """Asynchronously add graph documents from a sync or async iterable.
+        See `add_graph_document_stream`.
+
+        Micro-batches are collected and normalized on the event loop while the
+        previous one is written in the async thread pool.
+        """
+        self._validate_stream_args(micro_batch_size, max_pending_batches)
+        pending: asyncio.Queue = asyncio.Queue(maxsize=max_pending_batches)
+
+        async def write() -> int:
+            num_documents = 0
+            while (item := await pending.get()) is not None:
+                await self._arun(self._write_stream_batch, item[1], bulk_load, batch_size)
+                num_documents += item[0]
+            return num_documents
+
+        async def put(item: Any) -> None:
+            # Stop waiting for room in the queue if the writer failed
+            put_task = asyncio.ensure_future(pending.put(item))
+            await asyncio.wait({put_task, writer}, return_when=asyncio.FIRST_COMPLETED)
+            if not put_task.done():
+                put_task.cancel()
+
+        previous = await self._arun(self._pause_auto_checkpoint) if defer_checkpoint else None
+        writer = asyncio.ensure_future(write())
+        try:
+            async for documents in _amicro_batches(graph_documents, micro_batch_size):
+                await put((len(documents), self._collect_graph_batch(documents, include_source)))
+                if writer.done():
+                    break
+            await put(None)
+            num_documents = await writer
+        except BaseException:
+            writer.cancel()
+            if previous is not None:
+                await self._arun(self._resume_auto_checkpoint, previous, False)
+            raise
+        if previous is not None:
+            await self._arun(self._resume_auto_checkpoint, previous, True)
+        if self.full_text_search:
+            await self._arun(self.create_fts_indexes)
+        return num_documents
@@ -0,0 +1,243 @@
+import bisect
+import math
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""Default upper bounds, in seconds, of the latency histogram buckets."""
+
+OTHER_TEMPLATE = "__other__"
+"""Template label of the queries recorded after `max_templates` distinct templates."""
+
+
+def query_template(query: str) -> str:
+    """Return the template of a query: its text with whitespace collapsed.
+
+    Queries sent by `KuzuGraph` pass their values as parameters, so their text is
+    the same for every call of the same kind.
+    """
+    return " ".join(query.split())
+
+
+class QueryMetrics(NamedTuple):
+    """Timings and row count of one statement (or script) run through `KuzuGraph`."""
+
+    template: str
+    """The query text with whitespace collapsed, see `query_template`."""
+    compiling_time: float
+    """Seconds Kuzu spent parsing, binding and planning, as reported by Kuzu."""
+    execution_time: float
+    """Seconds Kuzu spent executing, as reported by Kuzu."""
+    materialization_time: float
+    """Seconds spent converting the result into Python objects (dicts, Arrow or
+    DataFrames). 0 for statements whose result is not fetched."""
+    num_rows: int
+    """Number of rows of the result."""
+    error: Optional[str] = None
+    """The error message, if the statement failed; timings are then 0."""
+
+
+class IngestionPhaseMetrics(NamedTuple):
+    """Duration and row count of one phase of an ingestion call."""
+
+    phase: str
+    """One of "ddl", "embeddings", "chunks", "nodes", "mentions" or "relationships"."""
+    num_rows: int
+    """Rows written in the phase (statements, for "ddl"; texts, for "embeddings")."""
+    duration: float
+    """Seconds spent in the phase, excluding the phases nested in it."""
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.num_rows / self.duration if self.duration > 0 else 0.0
+
+
+class HistogramSnapshot(NamedTuple):
+    """State of a histogram: cumulative counts for each bucket upper bound (the last
+    one being +Inf), the sum and the number of the observed values."""
+
+    buckets: List[Tuple[float, int]]
+    sum: float
+    num_observations: int
+
+
+class _Histogram:
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> HistogramSnapshot:
+        cumulative, total = [], 0
+        for bound, count in zip([*self.bounds, math.inf], self.counts, strict=True):
+            total += count
+            cumulative.append((bound, total))
+        return HistogramSnapshot(cumulative, self.sum, self.count)
+
+
+_HISTOGRAMS = {
+    "kuzu_query_compiling_seconds": "Time Kuzu spent compiling statements.",
+    "kuzu_query_execution_seconds": "Time Kuzu spent executing statements.",
+    "kuzu_query_materialization_seconds": "Time spent converting results to Python.",
+    "kuzu_ingestion_phase_seconds": "Time spent in each ingestion phase.",
+}
+_COUNTERS = {
+    "kuzu_query_rows": "Rows returned by statements.",
+    "kuzu_query_errors": "Statements that failed.",
+    "kuzu_ingestion_rows": "Rows written by each ingestion phase.",
+}
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Thread-safe, in-process registry of query and ingestion metrics.
+
+    `KuzuGraph` records every statement it runs as a `QueryMetrics` (per template:
+    latency histograms of compiling, execution and materialization time, and
+    counters of rows and errors) and every ingestion phase as an
+    `IngestionPhaseMetrics` (per phase: a latency histogram and a row counter).
+    `render` exposes them in the OpenMetrics text format, for a `/metrics` endpoint
+    or a push gateway.
+
+    Queries generated by an LLM can have many distinct templates; only the first
+    `max_templates` get their own label, later ones are counted under
+    `OTHER_TEMPLATE`.
+
+    Args:
+        buckets: Upper bounds of the latency histogram buckets, in seconds.
+        max_templates: Maximum number of distinct template labels.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        max_templates: int = 1000,
+    ) -> None:
+        if not buckets or list(buckets) != sorted(set(buckets)):
+            raise ValueError("`buckets` must be a non-empty, increasing sequence.")
+        if max_templates < 1:
+            raise ValueError("`max_templates` must be a positive integer.")
+        self.buckets = tuple(buckets)
+        self.max_templates = max_templates
+        self._templates: set[str] = set()
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def _template_label(self, template: str) -> str:
+        if template not in self._templates:
+            if len(self._templates) >= self.max_templates:
+                return OTHER_TEMPLATE
+            self._templates.add(template)
+        return template
+
+    def _observe(self, name: str, labels: Tuple[Tuple[str, str], ...], value: float) -> None:
+        histogram = self._histograms.get((name, labels))
+        if histogram is None:
+            histogram = self._histograms[(name, labels)] = _Histogram(self.buckets)
+        histogram.observe(value)
+
+    def _increment(self, name: str, labels: Tuple[Tuple[str, str], ...], value: float) -> None:
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + value
+
+    def record_query(self, metrics: QueryMetrics) -> None:
+        """Record a statement run."""
+        with self._lock:
+            labels = (("template", self._template_label(metrics.template)),)
+            if metrics.error is not None:
+                self._increment("kuzu_query_errors", labels, 1)
+                return
+            self._observe("kuzu_query_compiling_seconds", labels, metrics.compiling_time)
+            self._observe("kuzu_query_execution_seconds", labels, metrics.execution_time)
+            self._observe(
+                "kuzu_query_materialization_seconds", labels, metrics.materialization_time
+            )
+            self._increment("kuzu_query_rows", labels, metrics.num_rows)
+
+    def record_ingestion_phase(self, metrics: IngestionPhaseMetrics) -> None:
+        """Record an ingestion phase."""
+        with self._lock:
+            labels = (("phase", metrics.phase),)
+            self._observe("kuzu_ingestion_phase_seconds", labels, metrics.duration)
+            self._increment("kuzu_ingestion_rows", labels, metrics.num_rows)
+
+    def histogram(self, name: str, **labels: str) -> Optional[HistogramSnapshot]:
+        """Return the state of a histogram, or None if nothing was recorded in it."""
+        with self._lock:
+            histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+            return histogram.snapshot() if histogram is not None else None
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return the value of a counter (without the `_total` suffix)."""
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._templates.clear()
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        """Return all metrics in the OpenMetrics text exposition format."""
+        with self._lock:
+            histograms = {key: h.snapshot() for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        lines = []
+        for name, help_text in _HISTOGRAMS.items():
+            snapshots = sorted((labels, h) for (n, labels), h in histograms.items() if n == name)
+            if not snapshots:
+                continue
+            lines += [f"# TYPE {name} histogram", f"# HELP {name} {help_text}"]
+            for labels, snapshot in snapshots:
+                for bound, count in snapshot.buckets:
+                    bucket_labels = _format_labels((*labels, ("le", _format_number(bound))))
+                    lines.append(f"{name}_bucket{bucket_labels} {count}")
+                lines.append(f"{name}_count{_format_labels(labels)} {snapshot.num_observations}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(snapshot.sum)}")
+        for name, help_text in _COUNTERS.items():
+            series = sorted((labels, v) for (n, labels), v in counters.items() if n == name)
+            if not series:
+                continue
+            lines += [f"# TYPE {name} counter", f"# HELP {name} {help_text}"]
+            for labels, value in series:
+                lines.append(f"{name}_total{_format_labels(labels)} {_format_number(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,123 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional, Tuple
+
+
+class ResultCacheInfo(NamedTuple):
+    """Statistics of a `QueryResultCache`."""
+
+    hits: int
+    misses: int
+    invalidations: int
+    currsize: int
+    """Number of cached results."""
+    nbytes: int
+    """Estimated size of the cached results in bytes."""
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory used by a query result in bytes.
+
+    Arrow tables report their buffer size; rows made of dicts, lists and scalars are
+    measured recursively with `sys.getsizeof`.
+    """
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class QueryResultCache:
+    """LRU cache of materialized query results, bounded by their estimated size in
+    bytes and, optionally, by their age.
+
+    Every call to `invalidate` bumps a generation counter. A result is only stored if
+    no invalidation happened while its query ran, so that a read racing with a write
+    cannot put a stale result back into the cache.
+
+    Args:
+        max_bytes: Maximum estimated size of all cached results. Results larger than
+            this are not cached.
+        ttl: Maximum age of a cached result in seconds. None keeps results until they
+            are evicted or invalidated.
+    """
+
+    def __init__(self, max_bytes: int, ttl: Optional[float] = None) -> None:
+        if max_bytes < 1:
+            raise ValueError("`max_bytes` must be a positive integer.")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._nbytes = 0
+        # key -> (stored at, size, value)
+        self._entries: OrderedDict[Hashable, Tuple[float, int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return `(True, value)` on a hit and `(False, None)` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None:
+                if time.monotonic() - entry[0] > self.ttl:
+                    self._pop(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return True, entry[2]
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+        """Cache `value`, unless the cache was invalidated since `generation`."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic(), size, value)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._nbytes -= size
+
+    def invalidate(self) -> None:
+        """Drop all cached results, e.g. after a write."""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+            self._nbytes = 0
+
+    def info(self) -> ResultCacheInfo:
+        with self._lock:
+            return ResultCacheInfo(
+                self.hits,
+                self.misses,
+                self.invalidations,
+                len(self._entries),
+                self._nbytes,
+                self.max_bytes,
+            )
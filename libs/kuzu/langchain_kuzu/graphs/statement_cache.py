@@ -0,0 +1,99 @@
+import warnings
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+
+class CacheInfo(NamedTuple):
+    """Hit/miss statistics of a cache, in the shape of `functools.lru_cache`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class PreparedStatementCache:
+    """LRU cache of Kuzu prepared statements for a single connection, keyed by query text.
+
+    Kuzu parses, binds and plans a query every time its text is sent to
+    `Connection.execute`. Executing a cached prepared statement instead only binds the
+    new parameter values. Prepared statements belong to the connection that prepared
+    them, so each connection needs its own cache.
+
+    Queries that cannot be prepared (e.g. scripts with several statements) are
+    remembered and executed as plain text, so that Kuzu reports errors as usual.
+
+    Args:
+        conn: The `kuzu.Connection` to prepare and execute statements on.
+        maxsize: Maximum number of prepared statements to keep. `0` disables caching.
+    """
+
+    def __init__(self, conn: Any, maxsize: int = 128) -> None:
+        if maxsize < 0:
+            raise ValueError("`maxsize` must be a non-negative integer.")
+        self.conn = conn
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: OrderedDict[str, Optional[Any]] = OrderedDict()
+
+    def _prepare(self, query: str) -> Any:
+        # Kuzu 0.11 deprecates `Connection.prepare` in favour of passing the query text
+        # to `execute`, which plans the query again on every call. `prepare` is still
+        # the only public way to get a reusable statement, so its warning is silenced.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            return self.conn.prepare(query)
+
+    def _store(self, query: str, statement: Optional[Any]) -> None:
+        self._statements[query] = statement
+        if len(self._statements) > self.maxsize:
+            self._statements.popitem(last=False)
+
+    def _get(self, query: str) -> Optional[Any]:
+        if query in self._statements:
+            self.hits += 1
+            self._statements.move_to_end(query)
+            return self._statements[query]
+
+        self.misses += 1
+        statement = self._prepare(query)
+        if not statement.is_success():
+            statement = None
+        self._store(query, statement)
+        return statement
+
+    def validate(self, query: str) -> Optional[str]:
+        """Compile `query` without running it and return Kuzu's error message, or None
+        if it is valid. A valid statement stays cached for its execution.
+
+        Scripts with several statements cannot be prepared and are reported as
+        invalid.
+        """
+        if self.maxsize and self._statements.get(query) is not None:
+            self.hits += 1
+            self._statements.move_to_end(query)
+            return None
+        statement = self._prepare(query)
+        if not statement.is_success():
+            return str(statement.get_error_message())
+        if self.maxsize:
+            self.misses += 1
+            self._store(query, statement)
+        return None
+
+    def execute(self, query: str, parameters: Optional[dict] = None) -> Any:
+        """Execute `query` through its cached prepared statement."""
+        if self.maxsize == 0:
+            return self.conn.execute(query, parameters or {})
+        statement = self._get(query)
+        if statement is None:
+            return self.conn.execute(query, parameters or {})
+        return self.conn.execute(statement, parameters or {})
+
+    def clear(self) -> None:
+        """Drop all prepared statements. Hit/miss counters are kept."""
+        self._statements.clear()
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._statements))
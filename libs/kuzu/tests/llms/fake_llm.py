@@ -4,7 +4,7 @@ from typing import Any, Dict, List, Mapping, Optional, cast
 
 from langchain_core.callbacks import CallbackManagerForLLMRun
 from langchain_core.language_models.llms import LLM
-from pydantic import field_validator
+from pydantic import model_validator
 
 
 class FakeLLM(LLM):
@@ -14,13 +14,12 @@ class FakeLLM(LLM):
     sequential_responses: Optional[bool] = False
     response_index: int = 0
 
-    @field_validator("queries")
-    @classmethod
-    def check_queries_required(cls, queries: Optional[Mapping]) -> Optional[Mapping]:
+    @model_validator(mode="after")
+    def check_queries_required(self) -> "FakeLLM":
         """Validate that queries is provided when sequential_responses is True."""
-        if cls.sequential_responses and not queries:
+        if self.sequential_responses and not self.queries:
             raise ValueError("queries is required when sequential_response is set to True")
-        return queries
+        return self
 
     def get_num_tokens(self, text: str) -> int:
         """Return number of tokens."""
@@ -1,9 +1,18 @@
-from typing import Any, Dict, List
+import asyncio
+import itertools
+import threading
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
 
+import kuzu
 import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import DeterministicFakeEmbedding
 from langchain_core.prompts import PromptTemplate
 from llms.fake_llm import FakeLLM
 
+from langchain_kuzu.chains.graph_qa.context import compact_context, inject_limit
+from langchain_kuzu.chains.graph_qa.cypher_cache import InMemoryCypherCache, SQLiteCypherCache
 from langchain_kuzu.chains.graph_qa.kuzu import (
     KuzuQAChain,
     extract_cypher,
@@ -13,8 +22,10 @@ from langchain_kuzu.chains.graph_qa.prompts import (
     CYPHER_QA_PROMPT,
     KUZU_GENERATION_PROMPT,
 )
+from langchain_kuzu.chains.graph_qa.schema_selector import SchemaSelector
 from langchain_kuzu.graphs.graph_document import GraphDocument
 from langchain_kuzu.graphs.graph_store import GraphStore
+from langchain_kuzu.graphs.kuzu_graph import KuzuGraph
 
 
 class FakeGraphStore(GraphStore):
@@ -196,3 +207,431 @@ def test_llm_arg_combinations() -> None:
         "You can specify up to two of 'cypher_llm', 'qa_llm'"
         ", and 'llm', but not all three simultaneously."
     ) == str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "schema_refresh, expected_refreshes",
+    [("always", 3), ("ttl", 0), ("on_change", 1)],
+)
+def test_schema_refresh_modes(schema_refresh: str, expected_refreshes: int) -> None:
+    graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True)
+    llm = FakeLLM(
+        queries={f"{step}{i}": "RETURN 1 AS x" for i in range(3) for step in ("cypher", "qa")},
+        sequential_responses=True,
+    )
+    chain = KuzuQAChain.from_llm(
+        llm=llm,
+        graph=graph,
+        allow_dangerous_requests=True,
+        schema_refresh=schema_refresh,
+    )
+
+    with patch.object(graph, "refresh_schema", wraps=graph.refresh_schema) as refresh:
+        chain.invoke({"query": "first"})
+        # A table created behind the graph's back is only picked up by "on_change"
+        kuzu.Connection(graph.db).execute("CREATE NODE TABLE Event(id STRING PRIMARY KEY)")
+        chain.invoke({"query": "second"})
+        chain.invoke({"query": "third"})
+
+    assert refresh.call_count == expected_refreshes
+
+
+def test_chain_acall() -> None:
+    graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True)
+    graph.query("CREATE NODE TABLE Person(id STRING PRIMARY KEY)")
+    graph.query("CREATE (:Person {id: 'Alice'})")
+    llm = FakeLLM(
+        queries={
+            "cypher": "```cypher MATCH (p:Person) RETURN p.id AS name```",
+            "qa": "Alice",
+        },
+        sequential_responses=True,
+    )
+    cache = InMemoryCypherCache()
+    chain = KuzuQAChain.from_llm(
+        llm=llm, graph=graph, allow_dangerous_requests=True, cypher_cache=cache
+    )
+
+    with (
+        patch.object(graph, "aquery", wraps=graph.aquery) as aquery,
+        patch.object(cache, "alookup", wraps=cache.alookup) as alookup,
+        patch.object(cache, "aupdate", wraps=cache.aupdate) as aupdate,
+    ):
+        response = asyncio.run(chain.ainvoke({"query": "Who is there?"}))
+
+    assert response["result"] == "Alice"
+    aquery.assert_called_once_with(" MATCH (p:Person) RETURN p.id AS name")
+    # The Cypher cache is used through its async methods
+    alookup.assert_awaited_once()
+    aupdate.assert_awaited_once()
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_answer_batch() -> None:
+    graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True, pool_size=2)
+    graph.query("CREATE NODE TABLE Person(id STRING PRIMARY KEY, age INT64)")
+    graph.query("CREATE (:Person {id: 'Alice', age: 30}), (:Person {id: 'Bob', age: 40})")
+    llm = FakeLLM(
+        queries={
+            "cypher0": "MATCH (p:Person {id: 'Alice'}) RETURN p.age AS age",
+            "cypher1": "MATCH (p:Missing) RETURN p",
+            "cypher2": "MATCH (p:Person {id: 'Bob'}) RETURN p.age AS age",
+            "qa0": "30",
+            "qa2": "40",
+        },
+        sequential_responses=True,
+    )
+    chain = KuzuQAChain.from_llm(llm=llm, graph=graph, allow_dangerous_requests=True)
+
+    with patch.object(graph, "refresh_schema", wraps=graph.refresh_schema) as refresh:
+        results = chain.answer_batch(["Alice?", "Missing?", "Bob?"])
+
+    assert refresh.call_count == 1
+    assert results[0] == {"query": "Alice?", "result": "30"}
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == {"query": "Bob?", "result": "40"}
+    assert chain.answer_batch([]) == []
+
+
+def test_answer_batch_isolates_llm_failures() -> None:
+    class FlakyLLM(FakeLLM):
+        def _call(self, prompt: str, *args: Any, **kwargs: Any) -> str:
+            if "Helpful Answer" in prompt:
+                if "Bob?" in prompt:
+                    raise ValueError("answer failed")
+                return "30"
+            if "Broken?" in prompt:
+                raise ValueError("generation failed")
+            return "MATCH (p:Person {id: 'Alice'}) RETURN p.age AS age"
+
+    graph = _person_graph()
+    graph.query("ALTER TABLE Person ADD age INT64 DEFAULT 30")
+    chain = KuzuQAChain.from_llm(llm=FlakyLLM(), graph=graph, allow_dangerous_requests=True)
+
+    results = chain.answer_batch(["Alice?", "Broken?", "Bob?"])
+
+    assert results[0] == {"query": "Alice?", "result": "30"}
+    assert str(results[1]) == "generation failed"
+    assert str(results[2]) == "answer failed"
+
+
+def test_cypher_cache_skips_generation() -> None:
+    graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True)
+    graph.query("CREATE NODE TABLE Person(id STRING PRIMARY KEY)")
+    graph.query("CREATE (:Person {id: 'Alice'})")
+    cypher = "MATCH (p:Person) RETURN p.id AS name"
+    llm = FakeLLM(
+        queries={"cypher0": cypher, "qa0": "Alice", "qa1": "Alice", "cypher1": cypher, "qa2": ""},
+        sequential_responses=True,
+    )
+    cache = InMemoryCypherCache()
+    chain = KuzuQAChain.from_llm(
+        llm=llm, graph=graph, allow_dangerous_requests=True, cypher_cache=cache
+    )
+
+    chain.invoke({"query": "Who is there?"})
+    chain.invoke({"query": "  who is THERE"})
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert llm.response_index == 3
+
+    # A schema change invalidates the cached statements
+    graph.query("CREATE NODE TABLE City(id STRING PRIMARY KEY)")
+    chain.invoke({"query": "Who is there?"})
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert llm.response_index == 5
+
+
+def test_sqlite_cypher_cache(tmp_path: Any) -> None:
+    path = str(tmp_path / "cache.db")
+    clock = itertools.count(1000.0)
+    with patch("time.time", side_effect=lambda: next(clock)):
+        cache = SQLiteCypherCache(path)
+        cache.update("Who is there?", "v1", "MATCH (p) RETURN p")
+
+        # Processes with different schema fingerprints do not evict each other
+        reopened = SQLiteCypherCache(path, max_entries=2, ttl=60)
+        assert reopened.lookup("who is there", "v2") is None
+        reopened.update("Who is there?", "v2", "MATCH (n) RETURN n")
+        assert cache.lookup("who is there", "v1") == "MATCH (p) RETURN p"
+        assert reopened.lookup("who is there", "v2") == "MATCH (n) RETURN n"
+
+        # The least recently used entry is evicted, and unused entries expire
+        reopened.update("Who else?", "v2", "MATCH (n) RETURN n.id")
+        assert cache.lookup("who is there", "v1") is None
+        assert reopened.lookup("who else", "v2") == "MATCH (n) RETURN n.id"
+        clock = itertools.count(2000.0)
+        assert reopened.lookup("who else", "v2") is None
+
+    with pytest.raises(ValueError):
+        SQLiteCypherCache(path, max_entries=0)
+
+
+def test_sqlite_cypher_cache_async(tmp_path: Any) -> None:
+    cache = SQLiteCypherCache(str(tmp_path / "cache.db"))
+    threads: List[threading.Thread] = []
+    lookup = cache.lookup
+
+    def record_thread(question: str, schema_fingerprint: str) -> Optional[str]:
+        threads.append(threading.current_thread())
+        return lookup(question, schema_fingerprint)
+
+    async def roundtrip() -> Optional[str]:
+        await cache.aupdate("Who is there?", "v1", "MATCH (p) RETURN p")
+        return await cache.alookup("who is there", "v1")
+
+    with patch.object(cache, "lookup", side_effect=record_thread):
+        assert asyncio.run(roundtrip()) == "MATCH (p) RETURN p"
+    # SQLite I/O runs off the event loop
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_inject_limit() -> None:
+    assert inject_limit("MATCH (p) RETURN p.id;", 10) == "MATCH (p) RETURN p.id\nLIMIT 10"
+    assert inject_limit("MATCH (p) RETURN p.id LIMIT 3", 10) == "MATCH (p) RETURN p.id LIMIT 3"
+    union = "RETURN 1 AS x UNION RETURN 2 AS x"
+    assert inject_limit(union, 10) == union
+    assert inject_limit("CREATE (:P {id: 1})", 10) == "CREATE (:P {id: 1})"
+
+
+def test_compact_context() -> None:
+    rows = [
+        {"name": "Alice", "bio": "x" * 50, "empty": None},
+        {"name": "Alice", "bio": "x" * 50, "empty": None},
+        {"name": "Bob", "bio": "line\nbreak", "empty": None},
+        {"name": "Carol", "bio": None, "empty": None},
+    ]
+
+    assert compact_context(rows, max_value_chars=10) == (
+        "name | bio\nAlice | xxxxxxxxx…\nBob | line break\nCarol | "
+    )
+    assert compact_context(rows, max_rows=1, max_value_chars=10) == (
+        "name | bio\nAlice | xxxxxxxxx…\n... 2 more rows omitted"
+    )
+    assert compact_context(rows, max_tokens=3, token_counter=lambda text: 1) == (
+        "name | bio\nAlice | " + "x" * 50 + "\nBob | line break\n... 1 more rows omitted"
+    )
+    assert compact_context([]) == ""
+
+
+def test_chain_compacts_context() -> None:
+    graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True)
+    graph.query("CREATE NODE TABLE Person(id STRING PRIMARY KEY, age INT64)")
+    graph.query("UNWIND range(1, 100) AS i CREATE (:Person {id: 'p' + CAST(i, 'STRING')})")
+    llm = FakeLLM(
+        queries={
+            "Who?": "MATCH (p:Person) RETURN p.id AS id, p.age AS age ORDER BY p.id",
+            "id\np1\np10\n... 1 more rows omitted": "Many people",
+        }
+    )
+    chain = KuzuQAChain.from_llm(
+        llm=llm,
+        graph=graph,
+        allow_dangerous_requests=True,
+        cypher_prompt=PromptTemplate.from_template("{question}"),
+        qa_prompt=PromptTemplate.from_template("{context}"),
+        context_max_rows=3,
+        context_max_tokens=4,
+    )
+
+    with patch.object(graph, "query", wraps=graph.query) as query:
+        assert chain.invoke({"query": "Who?"})["result"] == "Many people"
+
+    query.assert_called_once_with(
+        "MATCH (p:Person) RETURN p.id AS id, p.age AS age ORDER BY p.id\nLIMIT 3"
+    )
+
+
+def _retail_graph() -> KuzuGraph:
+    graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True)
+    for ddl in [
+        "CREATE NODE TABLE Person(id STRING PRIMARY KEY, age INT64)",
+        "CREATE NODE TABLE Company(id STRING PRIMARY KEY, revenue DOUBLE)",
+        "CREATE NODE TABLE City(id STRING PRIMARY KEY, population INT64)",
+        "CREATE NODE TABLE Product(id STRING PRIMARY KEY, price DOUBLE)",
+        "CREATE REL TABLE WORKS_AT(FROM Person TO Company, since INT64)",
+        "CREATE REL TABLE LOCATED_IN(FROM Company TO City)",
+        "CREATE REL TABLE SELLS(FROM Company TO Product)",
+    ]:
+        graph.query(ddl)
+    graph.refresh_schema()
+    return graph
+
+
+def test_schema_selector_connected_subgraph() -> None:
+    graph = _retail_graph()
+    selector = SchemaSelector(k=2)
+
+    selected = selector.select_structured_schema(
+        "Which person lives in a city with a large population?", graph.get_structured_schema
+    )
+
+    # Company joins the Person and City tables
+    assert set(selected["node_props"]) == {"Person", "Company", "City"}
+    assert set(selected["rel_props"]) == {"WORKS_AT", "LOCATED_IN"}
+    assert "Product" not in selector.select("Which people live in cities?", graph.structured_schema)
+    # Nothing matches: the whole schema is kept
+    assert selector.select("Hello", graph.get_structured_schema) == graph.get_schema
+
+
+def test_schema_selector_embeddings_cached_per_schema() -> None:
+    graph = _retail_graph()
+    embeddings = DeterministicFakeEmbedding(size=8)
+    selector = SchemaSelector(k=1, embeddings=embeddings)
+
+    with patch.object(
+        DeterministicFakeEmbedding, "embed_documents", wraps=embeddings.embed_documents
+    ) as embed_documents:
+        selector.select("products", graph.get_structured_schema)
+        selector.select("companies", graph.get_structured_schema)
+        assert embed_documents.call_count == 1
+        graph.query("CREATE NODE TABLE Store(id STRING PRIMARY KEY)")
+        graph.refresh_schema()
+        selector.select("stores", graph.get_structured_schema)
+        assert embed_documents.call_count == 2
+
+
+def test_chain_uses_schema_selector() -> None:
+    graph = _retail_graph()
+    chain = KuzuQAChain.from_llm(
+        llm=FakeLLM(),
+        graph=graph,
+        allow_dangerous_requests=True,
+        schema_selector=SchemaSelector(k=1),
+    )
+
+    schema = chain._schema_for("What does each product cost?")
+
+    assert "Product" in schema and "Person" not in schema
+    assert "(:Company) -[:SELLS]-> (:Product)" not in schema
+
+
+def test_chain_selects_schema_without_blocking() -> None:
+    class AsyncOnlyEmbeddings(DeterministicFakeEmbedding):
+        def embed_query(self, text: str) -> List[float]:
+            raise AssertionError("blocking embedding call")
+
+        def embed_documents(self, texts: List[str]) -> List[List[float]]:
+            raise AssertionError("blocking embedding call")
+
+        async def aembed_query(self, text: str) -> List[float]:
+            return DeterministicFakeEmbedding.embed_query(self, text)
+
+        async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+            return DeterministicFakeEmbedding.embed_documents(self, texts)
+
+    graph = _retail_graph()
+    question = "What does each product cost?"
+    expected = SchemaSelector(k=1, embeddings=DeterministicFakeEmbedding(size=8)).select(
+        question, graph.get_structured_schema
+    )
+    chain = KuzuQAChain.from_llm(
+        llm=FakeLLM(),
+        graph=graph,
+        allow_dangerous_requests=True,
+        schema_selector=SchemaSelector(k=1, embeddings=AsyncOnlyEmbeddings(size=8)),
+    )
+
+    assert asyncio.run(chain._aschema_for(question)) == expected
+
+
+class _RepairEvents(BaseCallbackHandler):
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+
+    def on_custom_event(self, name: str, data: Any, **kwargs: Any) -> None:
+        if name == "kuzu_cypher_repair":
+            self.events.append(data)
+
+
+def _person_graph() -> KuzuGraph:
+    graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True)
+    graph.query("CREATE NODE TABLE Person(id STRING PRIMARY KEY)")
+    graph.query("CREATE (:Person {id: 'Alice'})")
+    return graph
+
+
+def test_chain_repairs_invalid_cypher() -> None:
+    graph = _person_graph()
+    llm = FakeLLM(
+        queries={
+            "cypher": "MATCH (p:Persn) RETURN p.id AS name",
+            "repair": "MATCH (p:Person) RETURN p.id AS name",
+            "qa": "Alice",
+        },
+        sequential_responses=True,
+    )
+    chain = KuzuQAChain.from_llm(
+        llm=llm, graph=graph, allow_dangerous_requests=True, validate_cypher=True
+    )
+    handler = _RepairEvents()
+
+    with patch.object(graph, "query", wraps=graph.query) as query:
+        response = chain.invoke({"query": "Who is there?"}, config={"callbacks": [handler]})
+
+    assert response["result"] == "Alice"
+    query.assert_called_once_with("MATCH (p:Person) RETURN p.id AS name")
+    assert len(handler.events) == 1
+    assert handler.events[0]["attempt"] == 1
+    assert "Persn" in handler.events[0]["error"]
+    assert handler.events[0]["latency"] >= 0
+
+
+def test_chain_repair_attempts_are_bounded() -> None:
+    llm = FakeLLM(
+        queries={"cypher": "MATCH (p:Persn) RETURN p", "repair": "MATCH (p:Prson) RETURN p"},
+        sequential_responses=True,
+    )
+    chain = KuzuQAChain.from_llm(
+        llm=llm,
+        graph=_person_graph(),
+        allow_dangerous_requests=True,
+        validate_cypher=True,
+        max_cypher_repairs=1,
+    )
+
+    with pytest.raises(RuntimeError, match="Prson"):
+        chain.invoke({"query": "Who is there?"})
+    assert llm.response_index == 2
+
+
+def test_answer_batch_repairs_invalid_cypher() -> None:
+    llm = FakeLLM(
+        queries={
+            "cypher0": "MATCH (p:Person) RETURN p.id AS name",
+            "cypher1": "MATCH (p:Persn) RETURN p.id AS name",
+            "repair1": "MATCH (p:Person) RETURN count(p) AS n",
+            "qa0": "Alice",
+            "qa1": "One",
+        },
+        sequential_responses=True,
+    )
+    chain = KuzuQAChain.from_llm(
+        llm=llm, graph=_person_graph(), allow_dangerous_requests=True, validate_cypher=True
+    )
+
+    results = chain.answer_batch(["Who?", "How many?"])
+
+    assert [result["result"] for result in results] == ["Alice", "One"]  # type: ignore[index]
+
+
+def test_chain_resolves_entities_with_full_text_search() -> None:
+    graph = _person_graph()
+    graph.query("CREATE (:Person {id: 'Alice Smith'}), (:Person {id: 'Bob'})")
+    graph.refresh_schema()
+    chain = KuzuQAChain.from_llm(
+        llm=FakeLLM(), graph=graph, allow_dangerous_requests=True, resolve_entities=True
+    )
+
+    # Answering a question does not create the missing indexes
+    assert chain._schema_for("Who is Alice friends with?") == graph.get_schema
+    assert graph.query("CALL SHOW_INDEXES() RETURN table_name") == []
+
+    graph.create_fts_indexes()
+    schema = chain._schema_for("Who is Alice friends with?")
+
+    assert schema.startswith(graph.get_schema)
+    assert '(:Person {id: "Alice"})' in schema
+    assert '(:Person {id: "Alice Smith"})' in schema
+    assert "Bob" not in schema
+    assert chain._schema_for("What is the weather like?") == graph.get_schema
+    assert asyncio.run(chain._aschema_for("Who is Alice friends with?")) == schema
@@ -1,10 +1,27 @@
+import asyncio
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Generator, Optional
 from unittest.mock import Mock, patch
 
+import kuzu
 import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
 
-from langchain_kuzu.graphs.graph_document import GraphDocument, Node
+from langchain_kuzu.graphs.connection_pool import KuzuConnectionPool
+from langchain_kuzu.graphs.graph_document import GraphDocument, Node, Relationship
 from langchain_kuzu.graphs.kuzu_graph import KuzuGraph
+from langchain_kuzu.graphs.metrics import (
+    OTHER_TEMPLATE,
+    IngestionPhaseMetrics,
+    MetricsRegistry,
+    QueryMetrics,
+)
+from langchain_kuzu.graphs.result_cache import QueryResultCache, estimate_size
 
 
 class MockCursor:
@@ -108,6 +125,8 @@ def test_add_graph_documents_with_source(kuzu_graph: KuzuGraph, mock_kuzu_connec
     source_doc = Document(page_content="Test content", metadata={})
     doc = GraphDocument(nodes=[node1], relationships=[], source=source_doc)
 
+    # Statements that cannot be prepared run as text, so their queries can be checked
+    mock_kuzu_connection.prepare.return_value.is_success.return_value = False
     # Reset the mock to clear any previous calls
     mock_kuzu_connection.execute.reset_mock()
 
@@ -149,3 +168,1086 @@ def test_get_schema_property(kuzu_graph: KuzuGraph) -> None:
     test_schema = "test schema"
     kuzu_graph.schema = test_schema
     assert kuzu_graph.get_schema == test_schema
+
+
+@pytest.fixture
+def kuzu_db_graph(request: pytest.FixtureRequest) -> KuzuGraph:
+    # KuzuGraph options can be passed with indirect parametrization
+    return KuzuGraph(
+        kuzu.Database(":memory:"), allow_dangerous_requests=True, **getattr(request, "param", {})
+    )
+
+
+def _graph_documents() -> list[GraphDocument]:
+    alice = Node(id="alice", type="Person")
+    acme = Node(id="acme", type="Company")
+    berlin = Node(id="berlin", type="Location")
+    return [
+        GraphDocument(
+            nodes=[alice, acme],
+            relationships=[Relationship(source=alice, target=acme, type="WORKS_AT")],
+            source=Document(page_content="Alice works at Acme."),
+        ),
+        GraphDocument(
+            nodes=[acme, berlin],
+            relationships=[
+                Relationship(source=acme, target=berlin, type="LOCATED_IN"),
+                # Endpoint not part of any document: skipped, as with MERGE
+                Relationship(source=Node(id="bob", type="Person"), target=acme, type="WORKS_AT"),
+            ],
+            source=Document(page_content="Acme is located in Berlin."),
+        ),
+    ]
+
+
+@pytest.fixture
+def populated_graph(kuzu_db_graph: KuzuGraph) -> KuzuGraph:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True, batch_size=10)
+    return kuzu_db_graph
+
+
+def _graph_counts(graph: KuzuGraph) -> dict[str, int]:
+    return {
+        "nodes": graph.query("MATCH (n) RETURN count(n) AS c")[0]["c"],
+        "mentions": graph.query("MATCH ()-[r:MENTIONS]->() RETURN count(r) AS c")[0]["c"],
+        "works_at": graph.query("MATCH ()-[r:WORKS_AT]->() RETURN count(r) AS c")[0]["c"],
+        "located_in": graph.query("MATCH ()-[r:LOCATED_IN]->() RETURN count(r) AS c")[0]["c"],
+    }
+
+
+def test_add_graph_documents_bulk_load_matches_merge(kuzu_db_graph: KuzuGraph) -> None:
+    merge_graph = KuzuGraph(kuzu.Database(":memory:"), allow_dangerous_requests=True)
+    merge_graph.add_graph_documents(_graph_documents(), include_source=True)
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True, bulk_load=True)
+
+    expected = {"nodes": 5, "mentions": 4, "works_at": 1, "located_in": 1}
+    assert _graph_counts(merge_graph) == expected
+    assert _graph_counts(kuzu_db_graph) == expected
+
+
+def test_add_graph_documents_bulk_load_existing_rows(kuzu_db_graph: KuzuGraph) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True, bulk_load=True)
+    # Re-loading the same documents must not duplicate rows or edges
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True, bulk_load=True)
+
+    assert _graph_counts(kuzu_db_graph) == {
+        "nodes": 5,
+        "mentions": 4,
+        "works_at": 1,
+        "located_in": 1,
+    }
+
+
+def test_add_graph_documents_batched_upsert(kuzu_db_graph: KuzuGraph) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True, batch_size=1)
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True, batch_size=2)
+
+    assert _graph_counts(kuzu_db_graph) == {
+        "nodes": 5,
+        "mentions": 4,
+        "works_at": 1,
+        "located_in": 1,
+    }
+
+
+def test_add_graph_documents_batched_upsert_statements(
+    kuzu_graph: KuzuGraph, mock_kuzu_connection: Mock
+) -> None:
+    # Statements that cannot be prepared run as text, so their queries can be checked
+    mock_kuzu_connection.prepare.return_value.is_success.return_value = False
+    mock_kuzu_connection.execute.reset_mock()
+
+    kuzu_graph.add_graph_documents(_graph_documents(), include_source=True, batch_size=100)
+
+    merges = [
+        call.args[0]
+        for call in mock_kuzu_connection.execute.call_args_list
+        if "MERGE" in call.args[0]
+    ]
+    # One statement per table group: chunks, 3 labels, 3 MENTIONS targets, 2 rel groups
+    assert len(merges) == 9
+    assert all("UNWIND $rows AS r" in query for query in merges)
+
+
+def test_add_graph_documents_invalid_batch_size(kuzu_graph: KuzuGraph) -> None:
+    with pytest.raises(ValueError, match="batch_size"):
+        kuzu_graph.add_graph_documents(_graph_documents(), batch_size=0)
+
+
+def test_add_graph_documents_ddl_runs_once(
+    kuzu_graph: KuzuGraph, mock_kuzu_connection: Mock
+) -> None:
+    mock_kuzu_connection.execute.reset_mock()
+
+    kuzu_graph.add_graph_documents(_graph_documents() * 2, include_source=True)
+
+    ddl = [
+        call.args[0]
+        for call in mock_kuzu_connection.execute.call_args_list
+        if "CREATE" in call.args[0] or "ALTER" in call.args[0]
+    ]
+    # Chunk, Person, Company, Location, MENTIONS, WORKS_AT, LOCATED_IN
+    assert len(ddl) == 7
+
+
+def test_ddl_cache_adds_missing_mentions_pair(kuzu_db_graph: KuzuGraph) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True)
+    event = Node(id="launch", type="Event")
+    doc = GraphDocument(
+        nodes=[event], relationships=[], source=Document(page_content="A launch event.")
+    )
+
+    kuzu_db_graph.add_graph_documents([doc], include_source=True)
+
+    assert kuzu_db_graph.query("MATCH (:Chunk)-[:MENTIONS]->(e:Event) RETURN e.id AS id") == [
+        {"id": "launch"}
+    ]
+    assert ("Chunk", "Event") in kuzu_db_graph._table_catalog.rel_tables["MENTIONS"]
+
+
+def test_ddl_cache_seeded_from_schema(kuzu_db_graph: KuzuGraph) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True)
+
+    graph = KuzuGraph(kuzu_db_graph.db, allow_dangerous_requests=True)
+
+    assert {"Chunk", "Person", "Company", "Location"} <= graph._table_catalog.node_tables
+    assert set(graph._table_catalog.rel_tables) == {"MENTIONS", "WORKS_AT", "LOCATED_IN"}
+
+
+def test_ddl_cache_invalidated_by_ddl_query(populated_graph: KuzuGraph) -> None:
+    populated_graph.query("DROP TABLE LOCATED_IN")
+
+    populated_graph.add_graph_documents(_graph_documents(), include_source=True, batch_size=10)
+
+    assert _graph_counts(populated_graph)["located_in"] == 1
+
+
+@pytest.mark.parametrize(
+    "ingest_kwargs", [{}, {"batch_size": 10}, {"bulk_load": True}, {"commit_every": 1}]
+)
+def test_ddl_cache_recovers_from_external_drop(
+    kuzu_db_graph: KuzuGraph, ingest_kwargs: dict
+) -> None:
+    kuzu_db_graph.add_graph_documents(_property_documents(), include_source=True)
+    conn = kuzu.Connection(kuzu_db_graph.db)
+    conn.execute("ALTER TABLE Company DROP public")
+    for table in ["MENTIONS", "WORKS_AT", "Person"]:
+        conn.execute(f"DROP TABLE {table}")
+
+    kuzu_db_graph.add_graph_documents(_property_documents(), include_source=True, **ingest_kwargs)
+
+    assert kuzu_db_graph.query(
+        "MATCH (p:Person)-[:WORKS_AT]->(c:Company) RETURN p.age AS age, c.public AS public "
+        "ORDER BY age"
+    ) == [{"age": 30.0, "public": True}, {"age": 41.5, "public": True}]
+
+
+def test_statement_cache_reuses_prepared_statements(kuzu_db_graph: KuzuGraph) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), batch_size=10)
+    query = "MATCH (p:Person) WHERE p.id = $id RETURN p.id AS id"
+    before = kuzu_db_graph.statement_cache_info()
+
+    for _ in range(3):
+        assert kuzu_db_graph.query(query, {"id": "alice"}) == [{"id": "alice"}]
+
+    after = kuzu_db_graph.statement_cache_info()
+    assert after.misses - before.misses == 1
+    assert after.hits - before.hits == 2
+
+
+@pytest.mark.parametrize("kuzu_db_graph", [{"statement_cache_size": 1}], indirect=True)
+def test_statement_cache_eviction_and_multi_statement(kuzu_db_graph: KuzuGraph) -> None:
+    assert kuzu_db_graph.query("RETURN 1 AS a; RETURN 2 AS a") == [{"a": 1}]
+    assert kuzu_db_graph.query("RETURN 3 AS a") == [{"a": 3}]
+    assert kuzu_db_graph.statement_cache_info().currsize == 1
+    with pytest.raises(RuntimeError, match="Binder exception"):
+        kuzu_db_graph.query("MATCH (n:Missing) RETURN n")
+
+
+def test_refresh_schema_if_stale(kuzu_db_graph: KuzuGraph) -> None:
+    assert kuzu_db_graph.refresh_schema_if_stale() is False
+    # DDL issued by the graph itself invalidates the schema
+    kuzu_db_graph.add_graph_documents(_graph_documents(), batch_size=10)
+    assert kuzu_db_graph.refresh_schema_if_stale() is True
+    assert "WORKS_AT" in kuzu_db_graph.get_schema
+    assert kuzu_db_graph.refresh_schema_if_stale(check_catalog=True) is False
+
+    # DDL from another connection is only seen through the catalog check or the TTL
+    kuzu.Connection(kuzu_db_graph.db).execute("CREATE NODE TABLE Event(id STRING PRIMARY KEY)")
+    assert kuzu_db_graph.refresh_schema_if_stale() is False
+    assert kuzu_db_graph.refresh_schema_if_stale(check_catalog=True) is True
+    assert "Event" in kuzu_db_graph.get_schema
+    assert kuzu_db_graph.refresh_schema_if_stale(max_age=0) is True
+
+
+def test_get_schema_dict_keeps_all_rel_pairs(kuzu_db_graph: KuzuGraph) -> None:
+    for ddl in [
+        "CREATE NODE TABLE Person(id STRING PRIMARY KEY, age INT64)",
+        "CREATE NODE TABLE Company(id STRING PRIMARY KEY)",
+        "CREATE REL TABLE KNOWS(FROM Person TO Person, FROM Person TO Company, since INT64)",
+    ]:
+        kuzu_db_graph.query(ddl)
+
+    schema = kuzu_db_graph.get_schema_dict()
+
+    assert {
+        "label": "Person",
+        "properties": [
+            {"name": "id", "type": "STRING"},
+            {"name": "age", "type": "INT64"},
+        ],
+    } in schema["nodes"]
+    (knows,) = schema["relationships"]
+    assert knows["properties"] == [{"name": "since", "type": "INT64"}]
+    assert knows["connections"] == [
+        {"src": "Person", "dst": "Person"},
+        {"src": "Person", "dst": "Company"},
+    ]
+
+    kuzu_db_graph.refresh_schema()
+    assert "(:Person) -[:KNOWS]-> (:Company)" in kuzu_db_graph.get_schema
+    assert "(:Person) -[:KNOWS]-> (:Person)" in kuzu_db_graph.get_schema
+    structured = kuzu_db_graph.get_structured_schema
+    assert structured["rel_props"]["KNOWS"] == [{"property": "since", "type": "INT64"}]
+    assert {"start": "Person", "type": "KNOWS", "end": "Company"} in structured["relationships"]
+    assert kuzu_db_graph._table_catalog.rel_tables["KNOWS"] == {
+        ("Person", "Person"),
+        ("Person", "Company"),
+    }
+
+
+def test_get_schema_dict_memoized_by_catalog_version(populated_graph: KuzuGraph) -> None:
+    populated_graph.invalidate_schema()
+
+    with patch.object(
+        populated_graph.conn, "execute", wraps=populated_graph.conn.execute
+    ) as execute:
+        schema = populated_graph.get_schema_dict()
+    # The fingerprint, then every TABLE_INFO and SHOW_CONNECTION in one script
+    assert execute.call_count == 2
+
+    with patch.object(
+        populated_graph.conn, "execute", wraps=populated_graph.conn.execute
+    ) as execute:
+        assert populated_graph.get_schema_dict() == schema
+    # CATALOG_VERSION and SHOW_TABLES only
+    assert execute.call_count == 1
+
+    # Any DDL, even from another connection, bumps the catalog version
+    kuzu.Connection(populated_graph.db).execute("ALTER TABLE Person ADD age INT64")
+    person = next(n for n in populated_graph.get_schema_dict()["nodes"] if n["label"] == "Person")
+    assert {"name": "age", "type": "INT64"} in person["properties"]
+    assert populated_graph.refresh_schema_if_stale(check_catalog=True) is True
+
+
+@pytest.mark.parametrize("case", ["bulk_load", "defer_checkpoint", "external_ddl"])
+def test_schema_after_checkpoint_on_disk(tmp_path: Any, case: str) -> None:
+    # Kuzu resets its catalog version to 0 on every checkpoint
+    db = kuzu.Database(str(tmp_path / "db"))
+    graph = KuzuGraph(db, allow_dangerous_requests=True)
+    if case == "bulk_load":
+        graph.add_graph_documents(_property_documents(), include_source=True, bulk_load=True)
+        graph.query("CHECKPOINT")
+    elif case == "defer_checkpoint":
+        graph.add_graph_documents(
+            _graph_documents(), include_source=True, batch_size=10, defer_checkpoint=True
+        )
+    else:
+        conn = kuzu.Connection(db)
+        conn.execute("CREATE NODE TABLE Event(id STRING PRIMARY KEY)")
+        conn.execute("CHECKPOINT")
+        assert graph.refresh_schema_if_stale(check_catalog=True) is True
+
+    graph.refresh_schema()
+    node_props = graph.structured_schema["node_props"]
+    if case == "bulk_load":
+        assert {"property": "age", "type": "DOUBLE"} in node_props["Person"]
+    elif case == "defer_checkpoint":
+        assert {"Chunk", "Person", "Company", "Location"} <= set(node_props)
+    else:
+        assert "Event" in node_props
+
+
+def test_query_iter(kuzu_db_graph: KuzuGraph) -> None:
+    query = "UNWIND range(1, 5) AS i RETURN i"
+
+    assert list(kuzu_db_graph.query_iter(query)) == kuzu_db_graph.query(query)
+    assert list(kuzu_db_graph.query_iter(query, chunk_size=2)) == [
+        [{"i": 1}, {"i": 2}],
+        [{"i": 3}, {"i": 4}],
+        [{"i": 5}],
+    ]
+    assert list(kuzu_db_graph.query_iter(query, chunk_size=2, max_rows=3)) == [
+        [{"i": 1}, {"i": 2}],
+        [{"i": 3}],
+    ]
+    with pytest.raises(ValueError, match="chunk_size"):
+        next(kuzu_db_graph.query_iter(query, chunk_size=0))
+
+
+def test_query_iter_closes_result_on_early_exit(kuzu_db_graph: KuzuGraph) -> None:
+    from contextlib import closing
+
+    results = []
+    run_query = kuzu_db_graph._run_query
+
+    def track(query: str, params: dict) -> Any:
+        results.append(run_query(query, params))
+        return results[-1]
+
+    with patch.object(kuzu_db_graph, "_run_query", side_effect=track):
+        with closing(kuzu_db_graph.query_iter("UNWIND range(1, 1000) AS i RETURN i")) as rows:
+            assert next(rows) == {"i": 1}
+        assert results[0].is_closed
+
+        assert (
+            len(list(kuzu_db_graph.query_iter("UNWIND range(1, 10) AS i RETURN i", max_rows=3)))
+            == 3
+        )
+        assert results[1].is_closed
+
+
+@pytest.mark.parametrize("result_format", ["arrow", "pandas", "polars"])
+def test_query_columnar_result_formats(kuzu_db_graph: KuzuGraph, result_format: str) -> None:
+    pytest.importorskip({"arrow": "pyarrow"}.get(result_format, result_format))
+    query = "UNWIND range(1, 3) AS i RETURN i, 'n' + CAST(i, 'STRING') AS name"
+
+    result = kuzu_db_graph.query(query, result_format=result_format)  # type: ignore[arg-type]
+
+    if result_format == "arrow":
+        assert result.to_pylist() == kuzu_db_graph.query(query)
+    elif result_format == "pandas":
+        assert result.to_dict("records") == kuzu_db_graph.query(query)
+    else:
+        assert result.to_dicts() == kuzu_db_graph.query(query)
+
+
+def test_query_unknown_result_format(kuzu_db_graph: KuzuGraph) -> None:
+    with pytest.raises(ValueError, match="Unknown result_format"):
+        kuzu_db_graph.query("RETURN 1", result_format="csv")  # type: ignore[arg-type]
+
+
+def test_query_all_returns_every_result_set(kuzu_db_graph: KuzuGraph) -> None:
+    script = """
+        CREATE NODE TABLE Person(id STRING PRIMARY KEY);
+        CREATE (:Person {id: 'alice'});
+        MATCH (p:Person) RETURN p.id AS id;
+        RETURN 42 AS answer;
+    """
+
+    results = kuzu_db_graph.query_all(script)
+
+    assert results[2:] == [[{"id": "alice"}], [{"answer": 42}]]
+    assert len(results) == 4
+    # The DDL in the script invalidates the cached schema
+    assert kuzu_db_graph.refresh_schema_if_stale() is True
+    assert kuzu_db_graph.query("RETURN 1 AS a; RETURN 2 AS a") == [{"a": 1}]
+
+
+def test_query_all_result_format(kuzu_db_graph: KuzuGraph) -> None:
+    pytest.importorskip("pyarrow")
+
+    tables = kuzu_db_graph.query_all("RETURN 1 AS a; RETURN 2 AS b", result_format="arrow")
+
+    assert [table.to_pylist() for table in tables] == [[{"a": 1}], [{"b": 2}]]
+
+
+def test_async_api(kuzu_db_graph: KuzuGraph) -> None:
+    async def run() -> list[Any]:
+        await kuzu_db_graph.aadd_graph_documents(
+            _graph_documents(), include_source=True, batch_size=10
+        )
+        await kuzu_db_graph.arefresh_schema()
+        return await asyncio.gather(
+            *[
+                kuzu_db_graph.aquery(
+                    "MATCH (p:Person) WHERE p.id = $id RETURN p.id AS id", {"id": i}
+                )
+                for i in ["alice", "bob", "alice"]
+            ]
+        )
+
+    results = asyncio.run(run())
+
+    assert results == [[{"id": "alice"}], [], [{"id": "alice"}]]
+    assert "WORKS_AT" in kuzu_db_graph.get_schema
+    assert _graph_counts(kuzu_db_graph)["works_at"] == 1
+
+
+@pytest.mark.parametrize("kuzu_db_graph", [{"max_concurrent_queries": 2}], indirect=True)
+def test_async_jobs_have_exclusive_connections(kuzu_db_graph: KuzuGraph) -> None:
+    lock, in_use, shared = threading.Lock(), set(), []
+    release = threading.Event()
+
+    def job(wait: bool) -> None:
+        conn = kuzu_db_graph._active_conn
+        with lock:
+            shared.append(conn in in_use)
+            in_use.add(conn)
+        release.wait() if wait else kuzu_db_graph.query("RETURN 1")
+        with lock:
+            in_use.discard(conn)
+
+    async def run() -> None:
+        await asyncio.gather(*[kuzu_db_graph._arun(job, False) for _ in range(8)])
+
+        # A cancelled job keeps its connection until it has stopped
+        task = asyncio.ensure_future(kuzu_db_graph._arun(job, True))
+        while kuzu_db_graph._async_pool is None or kuzu_db_graph._async_pool.available == 2:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert kuzu_db_graph._async_pool.available == 1
+        release.set()
+        while kuzu_db_graph._async_pool.available == 1:
+            await asyncio.sleep(0.001)
+
+    asyncio.run(run())
+    assert len(shared) == 9 and not any(shared)
+
+
+def test_connection_pool_timeout() -> None:
+    pool = KuzuConnectionPool(kuzu.Database(":memory:"), size=1, timeout=0.01)
+    with pool.connection():
+        assert pool.available == 0
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+    assert pool.available == 1
+
+    with pytest.raises(ValueError):
+        KuzuConnectionPool(pool.db, size=0)
+
+
+def test_connection_pool_close() -> None:
+    pool = KuzuConnectionPool(kuzu.Database(":memory:"), size=1, timeout=None)
+    borrowed = pool.acquire()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # A thread waiting for a connection is woken up by the close
+        waiting = executor.submit(pool.acquire)
+        time.sleep(0.05)
+        pool.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            waiting.result(timeout=5)
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.acquire()
+
+    # A connection checked out before the close keeps working until it is released
+    assert borrowed.execute("RETURN 1").get_next() == [1]
+    with patch.object(borrowed, "close", wraps=borrowed.close) as close:
+        pool.release(borrowed)
+    close.assert_called_once()
+    assert pool.available == 0
+
+
+@pytest.mark.parametrize(
+    "kuzu_db_graph", [{"pool_size": 2, "max_threads_per_connection": 1}], indirect=True
+)
+def test_pooled_graph_concurrent_queries(kuzu_db_graph: KuzuGraph) -> None:
+    assert kuzu_db_graph.pool is not None
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(
+            executor.map(
+                lambda docs: kuzu_db_graph.add_graph_documents(
+                    docs, include_source=True, batch_size=10
+                ),
+                [_graph_documents()] * 4,
+            )
+        )
+        counts = list(executor.map(lambda _: _graph_counts(kuzu_db_graph), range(8)))
+
+    assert counts == [{"nodes": 5, "mentions": 4, "works_at": 1, "located_in": 1}] * 8
+    assert kuzu_db_graph.pool.available == 2
+
+    # A streaming cursor holds its pooled connection until it is closed
+    rows = kuzu_db_graph.query_iter("MATCH (n) RETURN n.id")
+    next(rows)
+    assert kuzu_db_graph.pool.available == 1
+    rows.close()
+    assert kuzu_db_graph.pool.available == 2
+    # ...without binding it to the consumer's thread
+    assert kuzu_db_graph._active_conn is kuzu_db_graph.conn
+
+
+@pytest.mark.parametrize("kuzu_db_graph", [{"result_cache_max_bytes": 1 << 20}], indirect=True)
+def test_result_cache(populated_graph: KuzuGraph) -> None:
+    query = "MATCH (p:Person) WHERE p.id = $id RETURN p.id AS id"
+
+    first = populated_graph.query(query, {"id": "alice"})
+    first[0]["id"] = "mutated"
+    assert populated_graph.query(query, {"id": "alice"}) == [{"id": "alice"}]
+    assert populated_graph.query(query, {"id": "bob"}) == []
+    info = populated_graph.result_cache_info()
+    assert info is not None
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+    # Writes through the graph invalidate cached results
+    populated_graph.query("CREATE (:Person {id: 'bob'})")
+    assert populated_graph.query(query, {"id": "bob"}) == [{"id": "bob"}]
+    populated_graph.add_graph_documents(_graph_documents(), batch_size=10)
+    info = populated_graph.result_cache_info()
+    assert info is not None
+    assert (info.hits, info.misses, info.invalidations, info.currsize) == (1, 3, 3, 0)
+    assert info.hit_rate == 0.25
+
+
+@pytest.mark.parametrize("kuzu_db_graph", [{"result_cache_max_bytes": 1 << 20}], indirect=True)
+def test_result_cache_skips_literals_and_read_only_calls(populated_graph: KuzuGraph) -> None:
+    query = "MATCH (p:Person) RETURN p.id AS id, [p.id, 'set'] AS tags"
+    populated_graph.query(query)
+    info = populated_graph.result_cache_info()
+    assert info is not None
+    invalidations = info.invalidations
+
+    for read in [
+        "RETURN 'CREATE (:Person)' AS text, \"delete\" AS other",
+        "MATCH (p:Person) // SET p.id = 'x'\nRETURN p.id /* MERGE */",
+        "MATCH (p:Person) RETURN p.id AS `SET`",
+        "CALL SHOW_TABLES() RETURN name",
+        "CALL table_info('Person') RETURN *",
+    ]:
+        populated_graph.query(read)
+    info = populated_graph.result_cache_info()
+    assert info is not None and info.invalidations == invalidations
+
+    # Cached rows are deep-copied
+    rows = populated_graph.query(query)
+    rows[0]["tags"].append("mutated")
+    assert populated_graph.query(query)[0]["tags"] == ["alice", "set"]
+
+    populated_graph.query("CALL threads=2")
+    info = populated_graph.result_cache_info()
+    assert info is not None and info.invalidations == invalidations + 1
+
+
+def test_result_cache_eviction() -> None:
+    rows = [{"id": "x" * 100}]
+    cache = QueryResultCache(max_bytes=2 * estimate_size(rows), ttl=None)
+    for key in "abc":
+        cache.put(key, rows, cache.generation)
+    assert cache.get("a") == (False, None)
+    assert cache.get("c") == (True, rows)
+
+    # Results of queries that raced with an invalidation are not stored
+    generation = cache.generation
+    cache.invalidate()
+    cache.put("d", rows, generation)
+    assert cache.info().currsize == 0
+
+    expiring = QueryResultCache(max_bytes=1 << 20, ttl=0)
+    expiring.put("a", rows, expiring.generation)
+    assert expiring.get("a") == (False, None)
+
+
+def test_validate_query(kuzu_db_graph: KuzuGraph) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), batch_size=10)
+    query = "MATCH (p:Person) RETURN p.id AS id"
+
+    assert kuzu_db_graph.validate_query(query) is None
+    misses = kuzu_db_graph.statement_cache_info().misses
+    assert kuzu_db_graph.query(query) == [{"id": "alice"}]
+    # The statement prepared by the validation is reused
+    assert kuzu_db_graph.statement_cache_info().misses == misses
+
+    error = kuzu_db_graph.validate_query("MATCH (p:Persn) RETURN p.id")
+    assert error is not None and "Persn" in error
+    assert kuzu_db_graph.validate_query("MATCH (p:Person RETURN p") is not None
+
+
+@pytest.mark.parametrize(
+    "kuzu_db_graph",
+    [{"embeddings": DeterministicFakeEmbedding(size=8), "embedding_batch_size": 1}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "ingest_kwargs", [{}, {"batch_size": 10}, {"batch_size": 10, "bulk_load": True}]
+)
+def test_similarity_search(kuzu_db_graph: KuzuGraph, ingest_kwargs: dict) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents(), include_source=True, **ingest_kwargs)
+
+    [chunk] = kuzu_db_graph.similarity_search("Alice works at Acme.", k=1)
+    assert chunk.page_content == "Alice works at Acme."
+    assert chunk.metadata["distance"] == pytest.approx(0.0, abs=1e-5)
+    assert sorted(m["id"] for m in chunk.metadata["mentions"]) == ["acme", "alice"]
+    assert len(kuzu_db_graph.similarity_search("Acme is located in Berlin.", k=2)) == 2
+
+    # Chunks added once the vector index exists are indexed too
+    kuzu_db_graph.add_graph_documents(
+        [
+            GraphDocument(
+                nodes=[],
+                relationships=[],
+                source=Document(page_content="Carol lives in Paris."),
+            )
+        ],
+        include_source=True,
+        **ingest_kwargs,
+    )
+    [chunk] = kuzu_db_graph.similarity_search("Carol lives in Paris.", k=1)
+    assert chunk.page_content == "Carol lives in Paris."
+    assert chunk.metadata["mentions"] == []
+
+
+def test_similarity_search_embeds_existing_chunks(kuzu_db_graph: KuzuGraph) -> None:
+    with pytest.raises(ValueError, match="embeddings"):
+        kuzu_db_graph.similarity_search("Alice")
+
+    kuzu_db_graph.add_graph_documents(_graph_documents()[:1], include_source=True)
+    kuzu_db_graph.embeddings = DeterministicFakeEmbedding(size=8)
+    kuzu_db_graph.add_graph_documents(_graph_documents()[1:], include_source=True)
+    kuzu_db_graph.create_vector_index()
+    # Re-ingesting embeds the chunk stored without embedding, keeping its mentions
+    source_only = GraphDocument(nodes=[], relationships=[], source=_graph_documents()[0].source)
+    kuzu_db_graph.add_graph_documents([source_only], include_source=True)
+    assert _graph_counts(kuzu_db_graph)["mentions"] == 4
+
+    [chunk] = kuzu_db_graph.similarity_search("Alice works at Acme.", k=1)
+    assert chunk.page_content == "Alice works at Acme."
+    assert kuzu_db_graph.query(
+        "MATCH (c:Chunk) WHERE c.embedding IS NULL RETURN count(c) AS c"
+    ) == [{"c": 0}]
+
+
+@pytest.mark.parametrize("kuzu_db_graph", [{"full_text_search": True}], indirect=True)
+def test_keyword_search(populated_graph: KuzuGraph) -> None:
+    indexes = populated_graph.query("CALL SHOW_INDEXES() RETURN table_name, index_type")
+    assert sorted(index["table_name"] for index in indexes) == [
+        "Chunk",
+        "Company",
+        "Location",
+        "Person",
+    ]
+
+    [chunk] = populated_graph.keyword_search("Where is Acme located?", k=1, node_labels=["Chunk"])
+    assert chunk["text"] == "Acme is located in Berlin."
+    assert populated_graph.keyword_search("acme", node_labels=["Company"])[0]["id"] == "acme"
+    assert populated_graph.keyword_search("the") == []
+
+    # Indexes follow later writes, and indexes of new tables are created
+    populated_graph.add_graph_documents(
+        [
+            GraphDocument(
+                nodes=[Node(id="paris", type="City")],
+                relationships=[],
+                source=Document(page_content="Paris"),
+            )
+        ]
+    )
+    assert [match["id"] for match in populated_graph.keyword_search("Paris")] == ["paris"]
+
+
+def test_keyword_search_after_bulk_load_on_disk(tmp_path: Any) -> None:
+    # Bulk loading checkpoints, which resets Kuzu's catalog version
+    graph = KuzuGraph(
+        kuzu.Database(str(tmp_path / "db")),
+        allow_dangerous_requests=True,
+        full_text_search=True,
+    )
+    graph.add_graph_documents(_graph_documents(), include_source=True, bulk_load=True)
+    graph.add_graph_documents(_graph_documents(), include_source=True, bulk_load=True)
+
+    indexes = graph.query("CALL SHOW_INDEXES() RETURN table_name")
+    assert sorted(index["table_name"] for index in indexes) == [
+        "Chunk",
+        "Company",
+        "Location",
+        "Person",
+    ]
+    assert graph.keyword_search("acme", node_labels=["Company"])[0]["id"] == "acme"
+
+
+def test_keyword_search_creates_missing_indexes(kuzu_db_graph: KuzuGraph) -> None:
+    kuzu_db_graph.add_graph_documents(_graph_documents())
+    assert kuzu_db_graph.keyword_search("alice", create_missing_indexes=False) == []
+    assert kuzu_db_graph.query("CALL SHOW_INDEXES() RETURN table_name") == []
+    assert [match["label"] for match in kuzu_db_graph.keyword_search("alice")] == ["Person"]
+    kuzu_db_graph.create_fts_indexes()
+
+
+def _property_documents() -> list[GraphDocument]:
+    alice = Node(
+        id="alice",
+        type="Person",
+        properties={"age": 30, "tags": ["ceo"], "born": datetime.date(1990, 1, 2)},
+    )
+    bob = Node(id="bob", type="Person", properties={"age": 41.5, "address": {"city": "Berlin"}})
+    acme = Node(id="acme", type="Company", properties={"public": True, "id": "ignored"})
+    return [
+        GraphDocument(
+            nodes=[alice, bob, acme],
+            relationships=[
+                Relationship(
+                    source=alice, target=acme, type="WORKS_AT", properties={"since": 2020}
+                ),
+                Relationship(source=bob, target=acme, type="WORKS_AT"),
+            ],
+            source=Document(page_content="Alice and Bob work at Acme."),
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "ingest_kwargs", [{}, {"batch_size": 10}, {"batch_size": 10, "bulk_load": True}]
+)
+def test_add_graph_documents_properties(kuzu_db_graph: KuzuGraph, ingest_kwargs: dict) -> None:
+    kuzu_db_graph.add_graph_documents(_property_documents(), include_source=True, **ingest_kwargs)
+    kuzu_db_graph.refresh_schema()
+
+    node_props = {
+        label: {prop["property"]: prop["type"] for prop in props}
+        for label, props in kuzu_db_graph.get_structured_schema["node_props"].items()
+    }
+    # Types are inferred across the call: ints and floats widen to DOUBLE
+    assert node_props["Person"]["age"] == "DOUBLE"
+    assert node_props["Person"]["tags"] == "STRING[]"
+    assert node_props["Person"]["born"] == "DATE"
+    assert node_props["Company"] == {"id": "STRING", "type": "STRING", "public": "BOOL"}
+    rows = kuzu_db_graph.query(
+        "MATCH (p:Person) RETURN p.id AS id, p.age AS age, p.tags AS tags, p.born AS born, "
+        "p.address AS address ORDER BY id"
+    )
+    assert rows == [
+        {
+            "id": "alice",
+            "age": 30,
+            "tags": ["ceo"],
+            "born": datetime.date(1990, 1, 2),
+            "address": None,
+        },
+        {"id": "bob", "age": 41.5, "tags": None, "born": None, "address": '{"city": "Berlin"}'},
+    ]
+    assert kuzu_db_graph.query(
+        "MATCH (:Person)-[w:WORKS_AT]->(:Company) RETURN w.since AS since ORDER BY since"
+    ) == [
+        {"since": 2020},
+        {"since": None},
+    ]
+
+    # Properties are matched case-insensitively to existing columns, missing
+    # properties leave stored values alone, and values must fit the column type
+    alice = Node(id="alice", type="Person", properties={"Age": 31, "born": None})
+    kuzu_db_graph.add_graph_documents(
+        [GraphDocument(nodes=[alice], relationships=[], source=Document(page_content="x"))],
+        **ingest_kwargs,
+    )
+    assert kuzu_db_graph.query(
+        "MATCH (p:Person {id: 'alice'}) RETURN p.age AS age, p.born AS born"
+    ) == [{"age": 31, "born": datetime.date(1990, 1, 2)}]
+    alice.properties = {"born": "yesterday"}
+    with pytest.raises(ValueError, match="born"):
+        kuzu_db_graph.add_graph_documents(
+            [GraphDocument(nodes=[alice], relationships=[], source=Document(page_content="x"))],
+            **ingest_kwargs,
+        )
+
+
+@pytest.mark.parametrize(
+    "ingest_kwargs", [{}, {"batch_size": 10}, {"batch_size": 10, "bulk_load": True}]
+)
+def test_add_graph_documents_in_transactions(kuzu_db_graph: KuzuGraph, ingest_kwargs: dict) -> None:
+    kuzu_db_graph.add_graph_documents(
+        _graph_documents(), include_source=True, commit_every=1, **ingest_kwargs
+    )
+    assert _graph_counts(kuzu_db_graph) == {
+        "nodes": 5,
+        "mentions": 4,
+        "works_at": 1,
+        "located_in": 1,
+    }
+
+    # A failing transaction is rolled back, including the tables it created
+    valid = GraphDocument(
+        nodes=[Node(id="carol", type="Person", properties={"age": 40})],
+        relationships=[],
+        source=Document(page_content="Carol is 40."),
+    )
+    invalid = GraphDocument(
+        nodes=[
+            Node(id="paris", type="City"),
+            Node(id="dave", type="Person", properties={"age": "unknown"}),
+        ],
+        relationships=[],
+        source=Document(page_content="Dave lives in Paris."),
+    )
+    with pytest.raises(ValueError, match="age"):
+        kuzu_db_graph.add_graph_documents(
+            [valid, invalid], include_source=True, commit_every=1, **ingest_kwargs
+        )
+    ids = kuzu_db_graph.query("MATCH (n) RETURN n.id AS id")
+    assert {"id": "carol"} in ids and {"id": "dave"} not in ids
+    kuzu_db_graph.refresh_schema()
+    assert "City" not in kuzu_db_graph.get_schema
+
+    invalid.nodes[1].properties = {"age": 50}
+    kuzu_db_graph.add_graph_documents(
+        [invalid], include_source=True, commit_every=1, **ingest_kwargs
+    )
+    assert kuzu_db_graph.query("MATCH (c:City) RETURN c.id AS id") == [{"id": "paris"}]
+
+
+def test_add_graph_documents_defer_checkpoint(tmp_path: Any) -> None:
+    graph = KuzuGraph(kuzu.Database(str(tmp_path / "db")), allow_dangerous_requests=True)
+    graph.add_graph_documents(
+        _graph_documents(), include_source=True, commit_every=10, defer_checkpoint=True
+    )
+    assert _graph_counts(graph)["nodes"] == 5
+    assert graph.query("CALL current_setting('auto_checkpoint') RETURN *") == [
+        {"auto_checkpoint": "True"}
+    ]
+
+
+def _document_stream(num_documents: int, pulled: list[int]) -> Any:
+    for i in range(num_documents):
+        pulled[0] += 1
+        person = Node(id=f"person_{i}", type="Person", properties={"rank": i})
+        city = Node(id=f"city_{i % 3}", type="City")
+        yield GraphDocument(
+            nodes=[person, city],
+            relationships=[Relationship(source=person, target=city, type="LIVES_IN")],
+            source=Document(page_content=f"Person {i} lives in city {i % 3}."),
+        )
+
+
+@pytest.mark.parametrize("bulk_load", [False, True])
+def test_add_graph_document_stream(kuzu_db_graph: KuzuGraph, bulk_load: bool) -> None:
+    pulled = [0]
+    written: list[int] = []
+    write_batch = kuzu_db_graph._write_stream_batch
+
+    def record_write(*args: Any) -> None:
+        written.append(pulled[0])
+        write_batch(*args)
+
+    kuzu_db_graph._write_stream_batch = record_write  # type: ignore[method-assign]
+    num_documents = kuzu_db_graph.add_graph_document_stream(
+        _document_stream(100, pulled),
+        include_source=True,
+        bulk_load=bulk_load,
+        micro_batch_size=10,
+        max_pending_batches=1,
+    )
+
+    assert num_documents == 100
+    counts = kuzu_db_graph.query(
+        "MATCH (p:Person)-[:LIVES_IN]->(c:City) RETURN count(DISTINCT p) AS p, count(DISTINCT c) AS c"
+    )
+    assert counts == [{"p": 100, "c": 3}]
+    assert kuzu_db_graph.query("MATCH ()-[m:MENTIONS]->() RETURN count(m) AS c") == [{"c": 200}]
+    # Backpressure: the input is read at most a few micro-batches ahead of the writes
+    assert len(written) == 10
+    assert all(pulled_before <= 10 * i + 40 for i, pulled_before in enumerate(written))
+
+
+def test_add_graph_document_stream_failure(kuzu_db_graph: KuzuGraph) -> None:
+    def failing_stream() -> Any:
+        yield from _document_stream(25, [0])
+        raise RuntimeError("extraction failed")
+
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        kuzu_db_graph.add_graph_document_stream(failing_stream(), micro_batch_size=10)
+    # Complete micro-batches were committed
+    assert kuzu_db_graph.query("MATCH (p:Person) RETURN count(p) AS c") == [{"c": 20}]
+
+
+def test_aadd_graph_document_stream(kuzu_db_graph: KuzuGraph) -> None:
+    async def stream() -> Any:
+        for document in _document_stream(25, [0]):
+            await asyncio.sleep(0)
+            yield document
+
+    num_documents = asyncio.run(
+        kuzu_db_graph.aadd_graph_document_stream(
+            stream(), include_source=True, micro_batch_size=10, defer_checkpoint=True
+        )
+    )
+
+    assert num_documents == 25
+    assert kuzu_db_graph.query("MATCH (p:Person) RETURN count(p) AS c") == [{"c": 25}]
+    assert kuzu_db_graph.query("CALL current_setting('auto_checkpoint') RETURN *") == [
+        {"auto_checkpoint": "True"}
+    ]
+
+
+@pytest.mark.parametrize("ingest_kwargs", [{}, {"bulk_load": True}, {"commit_every": 1}])
+def test_add_graph_documents_incremental(kuzu_db_graph: KuzuGraph, ingest_kwargs: dict) -> None:
+    summary = kuzu_db_graph.add_graph_documents_incremental(_graph_documents(), **ingest_kwargs)
+    assert len(summary.added) == 2 and not summary.updated and not summary.skipped
+    assert _graph_counts(kuzu_db_graph) == {
+        "nodes": 5,
+        "mentions": 4,
+        "works_at": 1,
+        "located_in": 1,
+    }
+
+    # Unchanged documents are not written again
+    with patch.object(kuzu_db_graph, "_add_graph_documents") as add:
+        summary = kuzu_db_graph.add_graph_documents_incremental(_graph_documents())
+    add.assert_not_called()
+    assert len(summary.skipped) == 2
+    assert not summary.added and not summary.updated
+
+
+def test_add_graph_documents_incremental_updates_changed_chunks(
+    kuzu_db_graph: KuzuGraph,
+) -> None:
+    alice = Node(id="alice", type="Person")
+    acme = Node(id="acme", type="Company")
+    globex = Node(id="globex", type="Company")
+
+    def document(text: str, company: Node) -> GraphDocument:
+        return GraphDocument(
+            nodes=[alice, company],
+            relationships=[Relationship(source=alice, target=company, type="WORKS_AT")],
+            source=Document(page_content=text, metadata={"id": "doc-1"}),
+        )
+
+    # A chunk ingested without a manifest entry is treated as changed
+    kuzu_db_graph.add_graph_documents([document("Alice works at Acme.", acme)], True)
+    summary = kuzu_db_graph.add_graph_documents_incremental(
+        [document("Alice works at Acme.", acme)]
+    )
+    assert summary.updated == ["doc-1"]
+
+    summary = kuzu_db_graph.add_graph_documents_incremental(
+        [document("Alice works at Globex.", globex), *_graph_documents()]
+    )
+    assert summary.updated == ["doc-1"] and len(summary.added) == 2
+    mentioned = kuzu_db_graph.query(
+        "MATCH (c:Chunk {id: 'doc-1'})-[:MENTIONS]->(n) RETURN n.id AS id ORDER BY id"
+    )
+    assert mentioned == [{"id": "alice"}, {"id": "globex"}]
+    assert kuzu_db_graph.query("MATCH (c:Chunk {id: 'doc-1'}) RETURN c.text AS text") == [
+        {"text": "Alice works at Globex."}
+    ]
+
+
+def test_embedded_chunks_on_disk(tmp_path: Any) -> None:
+    class CountingEmbeddings(DeterministicFakeEmbedding):
+        embedded: list[str] = []
+
+        def embed_documents(self, texts: list[str]) -> list[list[float]]:
+            self.embedded.extend(texts)
+            return super().embed_documents(texts)
+
+    def document(text: str) -> GraphDocument:
+        return GraphDocument(
+            nodes=[Node(id="alice", type="Person")],
+            relationships=[],
+            source=Document(page_content=text, metadata={"id": "doc-1"}),
+        )
+
+    embeddings = CountingEmbeddings(size=8)
+    graph = KuzuGraph(kuzu.Database(str(tmp_path / "db")), allow_dangerous_requests=True)
+    graph.add_graph_documents_incremental([document("Alice works at Acme.")])
+    graph.embeddings = embeddings
+
+    # Bulk loads checkpoint, which resets the catalog version; unchanged chunks
+    # are not embedded again
+    for _ in range(2):
+        graph.add_graph_documents(
+            _graph_documents(), include_source=True, bulk_load=True, commit_every=1
+        )
+    assert len(embeddings.embedded) == 2
+    graph.create_vector_index()
+
+    # Re-creating the chunk stored without embedding keeps its content hash
+    graph.add_graph_documents([document("Alice works at Acme.")], True, bulk_load=True)
+    summary = graph.add_graph_documents_incremental(
+        [document("Alice works at Acme.")], bulk_load=True
+    )
+    assert summary.skipped == ["doc-1"]
+
+    # A changed text is embedded again
+    graph.add_graph_documents_incremental([document("Alice works at Globex.")], bulk_load=True)
+    assert embeddings.embedded[3:] == ["Alice works at Globex."]
+    [chunk] = graph.similarity_search("Alice works at Globex.", k=1)
+    assert chunk.metadata["id"] == "doc-1"
+    assert chunk.metadata["distance"] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_metrics_registry() -> None:
+    registry = MetricsRegistry(buckets=(0.01, 0.1), max_templates=1)
+    registry.record_query(QueryMetrics('RETURN "a"', 0.005, 0.05, 0.5, 3))
+    registry.record_query(QueryMetrics('RETURN "a"', 0.005, 0.005, 0.0, 2))
+    registry.record_query(QueryMetrics("RETURN 2", 0.0, 0.0, 0.0, 0, "Binder exception"))
+    registry.record_ingestion_phase(IngestionPhaseMetrics("nodes", 100, 0.05))
+
+    execution = registry.histogram("kuzu_query_execution_seconds", template='RETURN "a"')
+    assert execution is not None
+    assert execution.buckets == [(0.01, 1), (0.1, 2), (float("inf"), 2)]
+    assert execution.num_observations == 2
+    assert registry.counter("kuzu_query_rows", template='RETURN "a"') == 5
+    # Templates past `max_templates` share a label
+    assert registry.counter("kuzu_query_errors", template=OTHER_TEMPLATE) == 1
+    assert registry.counter("kuzu_ingestion_rows", phase="nodes") == 100
+
+    text = registry.render()
+    assert 'kuzu_query_execution_seconds_bucket{template="RETURN \\"a\\"",le="+Inf"} 2' in text
+    assert 'kuzu_ingestion_phase_seconds_count{phase="nodes"} 1' in text
+    assert 'kuzu_query_errors_total{template="__other__"} 1' in text
+    assert text.endswith("# EOF\n")
+
+    registry.reset()
+    assert registry.render() == "# EOF\n"
+
+
+@pytest.mark.parametrize("ingest_kwargs", [{}, {"batch_size": 10}, {"bulk_load": True}])
+def test_graph_metrics(ingest_kwargs: dict) -> None:
+    class EventCollector(BaseCallbackHandler):
+        def __init__(self) -> None:
+            self.events: list[tuple[str, Any]] = []
+
+        def on_custom_event(self, name: str, data: Any, **kwargs: Any) -> None:
+            self.events.append((name, data))
+
+    registry = MetricsRegistry()
+    collector = EventCollector()
+    graph = KuzuGraph(
+        kuzu.Database(":memory:"),
+        allow_dangerous_requests=True,
+        metrics=registry,
+        callbacks=[collector],
+    )
+    start = time.perf_counter()
+    graph.add_graph_documents(_graph_documents(), include_source=True, **ingest_kwargs)
+    elapsed = time.perf_counter() - start
+
+    phases = [data for name, data in collector.events if name == "kuzu_ingestion_phase"]
+    assert {data["phase"] for data in phases} == {
+        "ddl",
+        "chunks",
+        "nodes",
+        "mentions",
+        "relationships",
+    }
+    # DDL runs within the other phases, but is not counted twice
+    assert sum(data["duration"] for data in phases) <= elapsed
+    # Row by row, the node shared by both documents is merged twice
+    assert registry.counter("kuzu_ingestion_rows", phase="nodes") == (3 if ingest_kwargs else 4)
+    assert registry.counter("kuzu_ingestion_rows", phase="mentions") == 4
+
+    collector.events.clear()
+    assert graph.query("MATCH (p:Person)\n  RETURN p.id") == [{"p.id": "alice"}]
+    [(name, data)] = collector.events
+    assert name == "kuzu_query"
+    assert data["template"] == "MATCH (p:Person) RETURN p.id"
+    assert data["num_rows"] == 1 and data["error"] is None
+    assert data["compiling_time"] > 0 and data["materialization_time"] > 0
+    histogram = registry.histogram(
+        "kuzu_query_materialization_seconds", template="MATCH (p:Person) RETURN p.id"
+    )
+    assert histogram is not None and histogram.num_observations == 1
+
+    with pytest.raises(RuntimeError):
+        graph.query("MATCH (x:Missing) RETURN x")
+    assert registry.counter("kuzu_query_errors", template="MATCH (x:Missing) RETURN x") == 1
+
+    registry.reset()
+    with graph._ingestion_phase("nodes", 1):
+        time.sleep(0.01)
+        with graph._ingestion_phase("ddl", 1):
+            time.sleep(0.05)
+    nodes = registry.histogram("kuzu_ingestion_phase_seconds", phase="nodes")
+    ddl = registry.histogram("kuzu_ingestion_phase_seconds", phase="ddl")
+    assert nodes is not None and ddl is not None
+    assert nodes.sum < 0.05 <= ddl.sum